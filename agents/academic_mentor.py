@@ -1,7 +1,4 @@
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-import os
-import streamlit as st
+from agents.base_mentor import BaseMentor
 
 ACADEMIC_MENTOR_SYSTEM_PROMPT = """
 You are John, an experienced Academic Mentor specializing in educational guidance and student development.
@@ -28,17 +25,12 @@ DISCUSSION RULES:
 Remember: Exactly 2 sentences every time. Stay in character as an academic mentor but avoid any unverifiable claims.
 """
 
-class AcademicMentor:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model="google/gemini-2.5-flash-preview-05-20",
-            openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-            openai_api_base="https://openrouter.ai/api/v1"
-        )
+class AcademicMentor(BaseMentor):
+    name = "Academic Mentor"
+    opening_message = "Begin academic discussion."
 
-    def chat(self, history, student_data, context_chunks, user_message=None):
-        system_prompt = (
+    def system_prompt(self, student_data, context_chunks):
+        return (
             f"{ACADEMIC_MENTOR_SYSTEM_PROMPT}\n\n"
             f"STUDENT PROFILE: {student_data}\n"
             f"AVAILABLE CONTEXT: {context_chunks}\n\n"
@@ -46,17 +38,4 @@ class AcademicMentor:
             "First sentence should reference the previous mentor's point or the student's academic situation. "
             "Second sentence should give one specific, actionable study strategy or academic advice. "
             "Do not exceed 2 sentences under any circumstances."
-        )
-        messages = [SystemMessage(content=system_prompt)]
-        if user_message:
-            messages.append(HumanMessage(content=user_message))
-        elif history:
-            messages.append(HumanMessage(content=history[-1]['content']))
-        else:
-            messages.append(HumanMessage(content="Begin academic discussion."))
-        response = self.llm.invoke(messages)
-        return response.content
-
-# ---- SESSION STATE ----
-if 'current_agent' not in st.session_state:
-    st.session_state.current_agent = "Academic Mentor"  # Changed from "Academic Advisor"
\ No newline at end of file
+        )
\ No newline at end of file
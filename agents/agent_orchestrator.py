@@ -1,36 +1,33 @@
-import os
-from langchain_community.chat_models import ChatOpenAI
+import time
+
 from langchain.schema import HumanMessage, SystemMessage
 
-from agents.academic_mentor import AcademicMentor
-from agents.career_guide import CareerGuide
-from agents.tech_innovator import TechInnovator
-from agents.wellness_coach import WellnessCoach
-from agents.life_skills_mentor import LifeSkillsMentor
-from agents.creative_mentor import CreativeMentor
-from agents.leadership_coach import LeadershipCoach
-from agents.financial_advisor import FinancialAdvisor
-from agents.communication_expert import CommunicationExpert
-from agents.global_perspective_mentor import GlobalPerspectiveMentor
-from agents.report_generator import ReportGenerator
+from agents.mentor_registry import AGENT_CLASSES, SessionAgents, mentor_registry
+from core.cancellation import GenerationCancelled
+from core.conversation_memory import ConversationMemory
+from core.session_state import AgentCounter
+from utils.circuit_breaker import CircuitOpenError
+from utils.json_output import extract_json_object
+from utils.tracing import tracer
+
+PANEL_BATCH_PROMPT = """You are writing the next {count} contributions to a roundtable where mentors discuss a student with each other.
+
+MENTORS, IN SPEAKING ORDER:
+{speakers}
+
+Each mentor speaks in their own voice and from their own expertise, building on the mentor who spoke just before them.
 
+STUDENT PROFILE: {student_data}
+AVAILABLE CONTEXT: {context}
+
+Respond with a JSON object only, one entry per mentor in the order above, using the mentor names exactly as listed:
+{{"messages": [{{"mentor": "<mentor name>", "message": "<exactly 2 sentences>"}}]}}"""
 
 
 class AgentOrchestrator:
     def __init__(self, vectordb=None):
-        self.agents = {
-            "Academic Mentor": AcademicMentor(),
-            "Career Guide": CareerGuide(),
-            "Tech Innovator": TechInnovator(),
-            "Wellness Coach": WellnessCoach(),
-            "Life Skills Mentor": LifeSkillsMentor(),
-            "Creative Mentor": CreativeMentor(),
-            "Leadership Coach": LeadershipCoach(),
-            "Financial Advisor": FinancialAdvisor(),
-            "Communication Expert": CommunicationExpert(),
-            "Global Perspective Mentor": GlobalPerspectiveMentor(),
-            "Report Generator": ReportGenerator()
-        }
+        # Shared agent instances, constructed the first time this or any other session needs them
+        self.agents = SessionAgents(AGENT_CLASSES)
         
         # Improved agent ordering with natural conversation flow
         self.agent_order = [
@@ -43,19 +40,23 @@ class AgentOrchestrator:
         self.conversation_state = {
             "phase": "opening",  # opening, development, synthesis, conclusion
             "rounds_completed": 0,
-            "agent_participation": {agent: 0 for agent in self.agent_order},
+            "agent_participation": AgentCounter(self.agent_order),
             "last_three_agents": [],
             "topic_coverage": set(),
             "interaction_quality": []
         }
         
+        # Rolling summary so prompts stay bounded on long sessions
+        self.memory = ConversationMemory()
+        
         self.vectordb = vectordb
-        self.llm = ChatOpenAI(
-            temperature=0.3,  # Slightly more creative for better flow decisions
-            model="google/gemini-2.5-flash-preview-05-20",
-            openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-            openai_api_base="https://openrouter.ai/api/v1"
-        )
+        # Shared by all sessions, like the agents
+        self.llm = mentor_registry.selection_llm()
+
+    def downgrade_models(self, model):
+        """Switch the orchestrator and every remote mentor to a cheaper model, keeping their temperatures"""
+        self.llm = mentor_registry.selection_llm(model)
+        self.agents.model = model
 
     def update_conversation_state(self, agent_name, message_content):
         """Update conversation tracking for better flow management"""
@@ -177,14 +178,11 @@ class AgentOrchestrator:
             f"Reply with ONLY the mentor's exact name from the candidate list."
         )
         
-        # Get recent context for better decisions
-        recent_history = "\n".join(
-            f"{m.get('role', 'Unknown')}: {m.get('content', '')[:100]}..." 
-            for m in chat_history[-4:] if m.get('content')
-        ) if chat_history else "No prior conversation"
+        # Summary plus recent window keeps the prompt size fixed
+        recent_history = self.memory.render(chat_history)
         
         prompt = (
-            f"Recent conversation:\n{recent_history}\n\n"
+            f"Conversation so far:\n{recent_history}\n\n"
             f"Current topic/message: {user_message}\n\n"
             f"Available mentors: {candidates_str}\n"
             f"Select the most appropriate mentor:"
@@ -196,7 +194,8 @@ class AgentOrchestrator:
         ]
         
         try:
-            resp = self.llm.invoke(messages)
+            with tracer.span("agent_selection.llm", candidates=len(candidate_agents)):
+                resp = self.llm.invoke(messages)
             response_text = resp.content.strip()
             
             # Find exact match
@@ -313,7 +312,7 @@ class AgentOrchestrator:
         return {
             "phase": self.conversation_state["phase"],
             "total_messages": sum(self.conversation_state["agent_participation"].values()),
-            "agent_participation": self.conversation_state["agent_participation"],
+            "agent_participation": self.conversation_state["agent_participation"].to_dict(),
             "topics_covered": list(self.conversation_state["topic_coverage"]),
             "recent_speakers": self.conversation_state["last_three_agents"]
         }
@@ -328,23 +327,25 @@ class AgentOrchestrator:
             # Analyze conversation for repetition prevention
             recent_content = self._extract_recent_themes(history)
             
+            # Fold older messages into the running summary in the background
+            self.memory.maybe_schedule_update(history, self.llm)
+            
             # Create enhanced context (simplified)
             enhanced_context = self._create_simple_enhanced_context(
-                agent_name, phase_info, recent_content, context_chunks
+                agent_name, phase_info, recent_content, context_chunks, history
             )
             
-            # Get agent response directly without method modification
-            agent = self.agents[agent_name]
-            content = agent.chat(history, student_data, enhanced_context, user_message)
+            # Stream the agent response; the caller may close this generator to abandon it
+            content = ""
+            for token in self._agent_tokens(agent_name, history, student_data, enhanced_context, user_message):
+                content += token
+                yield token
             
-            # Update conversation state
+            # Update conversation state once the reply completed
             self.update_conversation_state(agent_name, content)
-            
-            # Simple word-by-word streaming
-            words = content.split()
-            for word in words:
-                yield word + " "
                     
+        except (CircuitOpenError, GenerationCancelled):
+            raise  # the caller serves a degraded-mode reply, or drops the turn, instead
         except Exception as e:
             # Fallback to basic response
             yield f"I'm here to help with this discussion. Let me share my perspective on the student's situation. "
@@ -352,17 +353,82 @@ class AgentOrchestrator:
     def simple_stream_agent_message(self, agent_name, history, student_data, context_chunks, user_message=None):
         """Fallback simple streaming method if enhanced version fails"""
         try:
-            agent = self.agents[agent_name]
-            content = agent.chat(history, student_data, context_chunks, user_message)
-            
-            # Basic streaming
-            words = content.split()
-            for word in words:
-                yield word + " "
+            yield from self._agent_tokens(agent_name, history, student_data, context_chunks, user_message, fallback=True)
                 
+        except (CircuitOpenError, GenerationCancelled):
+            raise
         except Exception as e:
             yield f"I'm ready to contribute to this discussion about the student's development. "
 
+    def _agent_tokens(self, agent_name, history, student_data, context_chunks, user_message=None, **span_attributes):
+        """Yield the agent's reply as the provider streams it, falling back to word-splitting a full reply"""
+        agent = self.agents[agent_name]
+        start = time.perf_counter()
+        completed = False
+        try:
+            if hasattr(agent, 'stream_chat'):
+                yield from agent.stream_chat(history, student_data, context_chunks, user_message)
+            else:
+                content = agent.chat(history, student_data, context_chunks, user_message)
+                for word in content.split():
+                    yield word + " "
+            completed = True
+        finally:
+            # Recorded rather than held open as a span, since the consumer runs between yields
+            tracer.record(
+                "mentor_llm",
+                duration_ms=(time.perf_counter() - start) * 1000,
+                agent=agent_name,
+                aborted=not completed,
+                **span_attributes
+            )
+
+    def panel_speakers(self, first_agent, count):
+        """``first_agent`` followed by the mentors to speak after them in a batched round, least heard first"""
+        recent = self.conversation_state["last_three_agents"][-2:]
+        participation = self.conversation_state["agent_participation"]
+        others = [agent for agent in self.agent_order if agent != first_agent and agent not in recent]
+        others.sort(key=lambda agent: participation.get(agent, 0))
+        return [first_agent] + others[:count - 1]
+
+    def generate_panel_batch(self, speakers, history, student_data, context_chunks):
+        """The next contributions of ``speakers`` from a single JSON-mode call, as (agent, message) pairs.
+
+        The shared preamble (profile, context, memory, phase guidance) is sent once instead of once
+        per mentor. Parsing stops at the first entry that is missing, out of order or empty, since
+        every later message builds on it.
+        """
+        phase_info = self.get_conversation_phase_instructions()
+        recent_content = self._extract_recent_themes(history)
+        self.memory.maybe_schedule_update(history, self.llm)
+        enhanced_context = self._create_simple_enhanced_context(
+            None, phase_info, recent_content, context_chunks, history
+        )
+
+        prompt = PANEL_BATCH_PROMPT.format(
+            count=len(speakers),
+            speakers="\n".join(f"- {agent}: {self.agents[agent].persona()}" for agent in speakers),
+            student_data=student_data,
+            context=enhanced_context
+        )
+        messages = [
+            SystemMessage(content=prompt),
+            HumanMessage(content=history[-1]['content'] if history else "Begin discussion.")
+        ]
+        response = self.agents[speakers[0]].llm.invoke(messages, response_format={"type": "json_object"})
+
+        data = extract_json_object(response.content) or {}
+        entries = data.get("messages")
+        batch = []
+        for agent, entry in zip(speakers, entries if isinstance(entries, list) else []):
+            if not isinstance(entry, dict) or agent.lower() not in str(entry.get("mentor", "")).lower():
+                break
+            message = entry.get("message")
+            if not isinstance(message, str) or not message.strip():
+                break
+            batch.append((agent, message.strip()))
+        return batch
+
     def get_safe_next_agent(self, chat_history, user_message=None):
         """Safe agent selection with fallback to simple round-robin"""
         try:
@@ -388,12 +454,16 @@ class AgentOrchestrator:
             
             return self.agent_order[0]
 
-    def _create_simple_enhanced_context(self, agent_name, phase_info, recent_themes, context_chunks):
+    def _create_simple_enhanced_context(self, agent_name, phase_info, recent_themes, context_chunks, history=None):
         """Create simplified enhanced context that won't break the system"""
         
         # Base context
         enhanced_context = context_chunks
         
+        # Conversation memory (summary of older turns plus recent window)
+        if history:
+            enhanced_context += f"\n\nCONVERSATION SO FAR:\n{self.memory.render(history)}"
+        
         # Add phase guidance
         enhanced_context += f"\n\nCONVERSATION PHASE: {self.conversation_state['phase'].upper()}"
         enhanced_context += f"\nGUIDANCE: {phase_info['instruction']}"
@@ -0,0 +1,46 @@
+from langchain.schema import HumanMessage, SystemMessage
+from utils.llm import create_chat_llm, llm_backend
+
+
+class BaseMentor:
+    """Shared chat plumbing for the roundtable mentors.
+
+    Subclasses provide ``name``, ``system_prompt`` and ``opening_message``; ``chat`` returns the whole
+    reply while ``stream_chat`` yields it as the provider streams it, so callers can stop
+    a bad generation early by closing the generator.
+    """
+
+    name = None
+    temperature = 0.7
+    opening_message = "Begin discussion."
+
+    def __init__(self):
+        self.llm = create_chat_llm(temperature=self.temperature, hedged=True, backend=llm_backend(self.name))
+
+    def system_prompt(self, student_data, context_chunks):
+        raise NotImplementedError
+
+    def persona(self):
+        """One-line description of the mentor, e.g. for prompts that voice several mentors at once"""
+        first_line = self.system_prompt({}, "").strip().splitlines()[0]
+        return first_line[len("You are "):] if first_line.startswith("You are ") else first_line
+
+    def build_messages(self, history, student_data, context_chunks, user_message=None):
+        messages = [SystemMessage(content=self.system_prompt(student_data, context_chunks))]
+        if user_message:
+            messages.append(HumanMessage(content=user_message))
+        elif history:
+            messages.append(HumanMessage(content=history[-1]['content']))
+        else:
+            messages.append(HumanMessage(content=self.opening_message))
+        return messages
+
+    def chat(self, history, student_data, context_chunks, user_message=None):
+        response = self.llm.invoke(self.build_messages(history, student_data, context_chunks, user_message))
+        return response.content
+
+    def stream_chat(self, history, student_data, context_chunks, user_message=None):
+        """Yield reply text as it arrives; closing the generator abandons the request"""
+        for chunk in self.llm.stream(self.build_messages(history, student_data, context_chunks, user_message)):
+            if chunk.content:
+                yield chunk.content
@@ -1,6 +1,4 @@
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-import os
+from agents.base_mentor import BaseMentor
 
 CAREER_GUIDE_SYSTEM_PROMPT = """
 You are Angela, an experienced Career Guide specializing in professional development and career strategy.
@@ -27,17 +25,12 @@ DISCUSSION RULES:
 Remember: Exactly 2 sentences every time. Stay in character as a career guide but avoid any unverifiable claims.
 """
 
-class CareerGuide:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model="google/gemini-2.5-flash-preview-05-20",
-            openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-            openai_api_base="https://openrouter.ai/api/v1"
-        )
+class CareerGuide(BaseMentor):
+    name = "Career Guide"
+    opening_message = "Begin career discussion."
 
-    def chat(self, history, student_data, context_chunks, user_message=None):
-        system_prompt = (
+    def system_prompt(self, student_data, context_chunks):
+        return (
             f"{CAREER_GUIDE_SYSTEM_PROMPT}\n\n"
             f"STUDENT PROFILE: {student_data}\n"
             f"AVAILABLE CONTEXT: {context_chunks}\n\n"
@@ -45,13 +38,4 @@ class CareerGuide:
             "First sentence should reference the previous mentor's point or the student's career situation. "
             "Second sentence should give one specific, actionable career development strategy or professional advice. "
             "Do not exceed 2 sentences under any circumstances."
-        )
-        messages = [SystemMessage(content=system_prompt)]
-        if user_message:
-            messages.append(HumanMessage(content=user_message))
-        elif history:
-            messages.append(HumanMessage(content=history[-1]['content']))
-        else:
-            messages.append(HumanMessage(content="Begin career discussion."))
-        response = self.llm.invoke(messages)
-        return response.content
\ No newline at end of file
+        )
\ No newline at end of file
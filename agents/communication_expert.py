@@ -1,6 +1,4 @@
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-import os
+from agents.base_mentor import BaseMentor
 
 COMMUNICATION_EXPERT_SYSTEM_PROMPT = """
 You are Lisa, an experienced Communication Expert specializing in presentation skills and interpersonal effectiveness.
@@ -35,17 +33,12 @@ EXPERTISE FOCUS AREAS:
 Remember: Exactly 2 sentences every time. Stay in character as a communication expert but avoid any unverifiable claims.
 """
 
-class CommunicationExpert:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model="google/gemini-2.5-flash-preview-05-20",
-            openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-            openai_api_base="https://openrouter.ai/api/v1"
-        )
+class CommunicationExpert(BaseMentor):
+    name = "Communication Expert"
+    opening_message = "Begin communication discussion."
 
-    def chat(self, history, student_data, context_chunks, user_message=None):
-        system_prompt = (
+    def system_prompt(self, student_data, context_chunks):
+        return (
             f"{COMMUNICATION_EXPERT_SYSTEM_PROMPT}\nHere is company context:\n{context_chunks}\n"
             f"Student data: {student_data}\n"
             "You are in a roundtable with 9 other mentors including Academic Mentor, Career Guide, Tech Innovator, Wellness Coach, Life Skills Mentor, Creative Mentor, Leadership Coach, Financial Advisor, and Global Perspective Mentor. "
@@ -56,13 +49,4 @@ class CommunicationExpert:
             "CRITICAL: Respond with exactly 2 sentences only - no more, no less. "
             "Keep your response focused, articulate, and collaborative. "
             "Do not mention specific courses, programs, or external resources."
-        )
-        messages = [SystemMessage(content=system_prompt)]
-        if user_message:
-            messages.append(HumanMessage(content=user_message))
-        elif history:
-            messages.append(HumanMessage(content=history[-1]['content']))
-        else:
-            messages.append(HumanMessage(content="Begin communication discussion."))
-        response = self.llm.invoke(messages)
-        return response.content
\ No newline at end of file
+        )
\ No newline at end of file
@@ -1,6 +1,4 @@
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-import os
+from agents.base_mentor import BaseMentor
 
 CREATIVE_MENTOR_SYSTEM_PROMPT = """
 You are David, an experienced Creative Mentor specializing in artistic development and innovative thinking.
@@ -35,17 +33,13 @@ EXPERTISE FOCUS AREAS:
 Remember: Exactly 2 sentences every time. Stay in character as a creative mentor but avoid any unverifiable claims.
 """
 
-class CreativeMentor:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            temperature=0.8,
-            model="google/gemini-2.5-flash-preview-05-20",
-            openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-            openai_api_base="https://openrouter.ai/api/v1"
-        )
+class CreativeMentor(BaseMentor):
+    name = "Creative Mentor"
+    temperature = 0.8
+    opening_message = "Begin creative discussion."
 
-    def chat(self, history, student_data, context_chunks, user_message=None):
-        system_prompt = (
+    def system_prompt(self, student_data, context_chunks):
+        return (
             f"{CREATIVE_MENTOR_SYSTEM_PROMPT}\nHere is company context:\n{context_chunks}\n"
             f"Student data: {student_data}\n"
             "You are in a roundtable with Academic Mentor, Career Guide, Tech Innovator, Wellness Coach, and Life Skills Mentor. "
@@ -56,13 +50,4 @@ class CreativeMentor:
             "CRITICAL: Respond with exactly 2 sentences only - no more, no less. "
             "Keep your response focused, inspiring, and collaborative. "
             "Do not mention specific programs, institutions, or external resources."
-        )
-        messages = [SystemMessage(content=system_prompt)]
-        if user_message:
-            messages.append(HumanMessage(content=user_message))
-        elif history:
-            messages.append(HumanMessage(content=history[-1]['content']))
-        else:
-            messages.append(HumanMessage(content="Begin creative discussion."))
-        response = self.llm.invoke(messages)
-        return response.content
\ No newline at end of file
+        )
\ No newline at end of file
@@ -1,6 +1,4 @@
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-import os
+from agents.base_mentor import BaseMentor
 
 FINANCIAL_ADVISOR_SYSTEM_PROMPT = """
 You are Robert, an experienced Financial Advisor specializing in personal finance education and money management.
@@ -35,17 +33,12 @@ EXPERTISE FOCUS AREAS:
 Remember: Exactly 2 sentences every time. Stay in character as a financial advisor but avoid any unverifiable claims.
 """
 
-class FinancialAdvisor:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model="google/gemini-2.5-flash-preview-05-20",
-            openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-            openai_api_base="https://openrouter.ai/api/v1"
-        )
+class FinancialAdvisor(BaseMentor):
+    name = "Financial Advisor"
+    opening_message = "Begin financial discussion."
 
-    def chat(self, history, student_data, context_chunks, user_message=None):
-        system_prompt = (
+    def system_prompt(self, student_data, context_chunks):
+        return (
             f"{FINANCIAL_ADVISOR_SYSTEM_PROMPT}\nHere is company context:\n{context_chunks}\n"
             f"Student data: {student_data}\n"
             "You are in a roundtable with 9 other mentors including Academic Mentor, Career Guide, Tech Innovator, Wellness Coach, Life Skills Mentor, Creative Mentor, Leadership Coach, Communication Expert, and Global Perspective Mentor. "
@@ -56,13 +49,4 @@ class FinancialAdvisor:
             "CRITICAL: Respond with exactly 2 sentences only - no more, no less. "
             "Keep your response focused, practical, and collaborative. "
             "Do not mention specific companies, investment products, or external resources."
-        )
-        messages = [SystemMessage(content=system_prompt)]
-        if user_message:
-            messages.append(HumanMessage(content=user_message))
-        elif history:
-            messages.append(HumanMessage(content=history[-1]['content']))
-        else:
-            messages.append(HumanMessage(content="Begin financial discussion."))
-        response = self.llm.invoke(messages)
-        return response.content
\ No newline at end of file
+        )
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Process-wide registry of the roundtable agents, built on first use and shared by all sessions.
+
+The agents hold no conversation state (that lives on each session's ``AgentOrchestrator``), only
+their model clients, so one instance per agent serves every connected user. The orchestrators'
+speaker-selection model is shared the same way. Sessions that were switched to a cheaper model by
+their token budget share a second set of instances for that model.
+"""
+import threading
+from collections.abc import Mapping
+
+from agents.academic_mentor import AcademicMentor
+from agents.career_guide import CareerGuide
+from agents.tech_innovator import TechInnovator
+from agents.wellness_coach import WellnessCoach
+from agents.life_skills_mentor import LifeSkillsMentor
+from agents.creative_mentor import CreativeMentor
+from agents.leadership_coach import LeadershipCoach
+from agents.financial_advisor import FinancialAdvisor
+from agents.communication_expert import CommunicationExpert
+from agents.global_perspective_mentor import GlobalPerspectiveMentor
+from agents.report_generator import ReportGenerator
+from utils.llm import create_chat_llm, llm_backend
+
+AGENT_CLASSES = {
+    "Academic Mentor": AcademicMentor,
+    "Career Guide": CareerGuide,
+    "Tech Innovator": TechInnovator,
+    "Wellness Coach": WellnessCoach,
+    "Life Skills Mentor": LifeSkillsMentor,
+    "Creative Mentor": CreativeMentor,
+    "Leadership Coach": LeadershipCoach,
+    "Financial Advisor": FinancialAdvisor,
+    "Communication Expert": CommunicationExpert,
+    "Global Perspective Mentor": GlobalPerspectiveMentor,
+    "Report Generator": ReportGenerator
+}
+
+
+class MentorRegistry:
+    """Builds each agent the first time any session asks for it"""
+
+    def __init__(self, classes=AGENT_CLASSES):
+        self.classes = dict(classes)
+        self._instances = {}  # (name, model override or None) -> agent
+        self._selection_llms = {}  # model override or None -> orchestrator model
+        self._lock = threading.Lock()
+
+    def get(self, name, model=None):
+        """The shared instance of agent ``name``, on ``model`` instead of its default when given"""
+        if name not in self.classes:
+            raise KeyError(name)
+        with self._lock:
+            agent = self._instances.get((name, None))
+            if agent is None:
+                agent = self._instances[(name, None)] = self.classes[name]()
+            # Local-model agents cost nothing, so a budget downgrade leaves them alone
+            if model is None or getattr(getattr(agent, 'llm', None), 'local', False):
+                return agent
+            downgraded = self._instances.get((name, model))
+            if downgraded is None:
+                downgraded = self._instances[(name, model)] = self._on_model(self.classes[name](), model)
+            return downgraded
+
+    def selection_llm(self, model=None):
+        """The speaker-selection model every orchestrator shares, on ``model`` instead of its default when given"""
+        with self._lock:
+            llm = self._selection_llms.get(None)
+            if llm is None:
+                # Slightly more creative for better flow decisions
+                llm = self._selection_llms[None] = create_chat_llm(
+                    temperature=0.3, hedged=True, backend=llm_backend("Orchestrator")
+                )
+            if model is None or getattr(llm, 'local', False):
+                return llm
+            downgraded = self._selection_llms.get(model)
+            if downgraded is None:
+                downgraded = self._selection_llms[model] = create_chat_llm(
+                    temperature=llm.temperature, model=model, hedged=getattr(llm, 'hedged', False)
+                )
+            return downgraded
+
+    @staticmethod
+    def _on_model(agent, model):
+        """Switch a fresh agent to ``model``, keeping its temperature and hedging"""
+        if hasattr(agent, 'llm'):
+            agent.llm = create_chat_llm(
+                temperature=agent.llm.temperature, model=model, hedged=getattr(agent.llm, 'hedged', False)
+            )
+        if getattr(agent, 'json_llm', None) is not None:
+            agent.json_llm = agent.llm.bind(response_format={"type": "json_object"})
+        return agent
+
+    def built(self):
+        """Names of the agents constructed so far, for diagnostics"""
+        with self._lock:
+            return sorted({name for name, _ in self._instances})
+
+
+mentor_registry = MentorRegistry()
+
+
+class SessionAgents(Mapping):
+    """One orchestrator's view of the registry: agent name -> shared agent, built on first access"""
+
+    def __init__(self, names, registry=mentor_registry):
+        self.names = list(names)
+        self.registry = registry
+        self.model = None  # set by a budget downgrade
+
+    def __getitem__(self, name):
+        if name not in self.names:
+            raise KeyError(name)
+        return self.registry.get(name, self.model)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
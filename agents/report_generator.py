@@ -1,38 +1,63 @@
-from langchain_community.chat_models import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
-import os
 from datetime import datetime
-import pdfkit
-import tempfile
 import json
+import logging
+from config.settings import (
+    MAX_CHAT_HISTORY_FOR_REPORT,
+    REPORT_MODE,
+    REPORT_MAP_CHUNK_SIZE,
+    REPORT_MAP_CONCURRENCY,
+    REPORT_STUDENT_MESSAGES,
+    REPORT_SECTION_PARALLEL,
+    REPORT_SECTION_CONCURRENCY,
+    REPORT_SECTION_RETRIES,
+    REPORT_JSON_MODE,
+    REPORT_HTML_USE_LLM
+)
+from agents.report_sections import (
+    REPORT_SECTIONS,
+    CONTENT_REPORT_SECTIONS,
+    SECTION_INPUT_LABELS,
+    schema_keys_description,
+    validate_report,
+    coerce_section_value,
+    build_section_messages,
+    validate_section,
+    hash_text,
+    hash_transcript,
+    student_cache_key,
+    section_cache,
+    chunk_summary_cache
+)
+from utils.llm import create_chat_llm
+from utils.tracing import tracer
+from utils.json_output import extract_json_object, normalize_keys
+from utils.pdf_renderer import pdf_renderer
+from utils.artifact_cache import report_artifact_cache
+from agents.report_templates import (
+    REPORT_TEMPLATE_VERSION,
+    render_document,
+    render_comprehensive_report,
+    render_content_report
+)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SUMMARY_PROMPT = """You are a mentorship analyst at Growth Valley Community reviewing one segment of a long AI mentor roundtable about a student.
+Summarize this segment in at most 120 words of plain prose. Capture: what the student asked or revealed about themselves,
+how they communicated (initiative, clarity, curiosity), the mentors' key recommendations, and any change compared to earlier behaviour.
+Do not quote the transcript. Do not use bullet symbols."""
 
 class ReportGenerator:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model="google/gemini-2.5-flash-preview-05-20",
-            openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-            openai_api_base="https://openrouter.ai/api/v1"
-        )
-        self.wkhtmltopdf_path = self._find_wkhtmltopdf()
-
-    def _find_wkhtmltopdf(self):
-        custom = os.getenv("WKHTMLTOPDF_PATH")
-        if custom and os.path.exists(custom):
-            return custom
-        common_paths = [
-            r"C:/Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe",
-            "/usr/local/bin/wkhtmltopdf",
-            "/usr/bin/wkhtmltopdf"
-        ]
-        for path in common_paths:
-            if os.path.exists(path):
-                return path
-        return None
+        self.llm = create_chat_llm(temperature=0.7)
+        # Provider-side JSON mode; falls back to the plain model if unsupported
+        self.json_llm = self.llm.bind(response_format={"type": "json_object"}) if REPORT_JSON_MODE else None
+        self.wkhtmltopdf_path = pdf_renderer.wkhtmltopdf_path
 
-    def generate_report_content(self, chat_history, student_data, context_chunks):
+    def generate_report_content(self, chat_history, student_data, context_chunks, memory=None, mode=REPORT_MODE):
         """Generate comprehensive report content based on roundtable discussion"""
-        system_prompt = """You are a PhD in psychology, master educator, and expert mentorship analyst at Growth Valley Community. 
+        system_prompt = f"""You are a PhD in psychology, master educator, and expert mentorship analyst at Growth Valley Community. 
         
         Analyze the provided chat history, student data, and company context to create a comprehensive, professional growth-focused report.
         
@@ -58,12 +83,12 @@ class ReportGenerator:
         For the Improvements Over Time section, provide realistic scores in this format:
         - Skill Name: Current score (X), Potential score (Y) - Brief explanation
         
-        Format the response as a JSON object with these sections as keys.
+        Respond with a single JSON object and nothing else, using exactly these keys: {schema_keys_description(CONTENT_REPORT_SECTIONS)}.
         Keep the tone professional but warm, suitable for parents and mentors.
         Focus on growth potential and practical insights."""
         
         # Prepare context for analysis
-        discussion_summary = self._analyze_discussion(chat_history)
+        discussion_summary = self._build_discussion_analysis(chat_history, memory, mode)
         student_context = self._format_student_context(student_data)
         
         messages = [
@@ -80,28 +105,60 @@ class ReportGenerator:
             """)
         ]
         
-        response = self.llm.invoke(messages)
+        return self._generate_structured_report(
+            messages, CONTENT_REPORT_SECTIONS, student_context, context_chunks, {"discussion": discussion_summary}
+        )
+    
+    def _invoke_json(self, messages):
+        """Invoke the model in JSON mode when the provider supports it"""
+        with tracer.span("report.llm", json_mode=self.json_llm is not None) as span:
+            if self.json_llm is not None:
+                try:
+                    return self.json_llm.invoke(messages)
+                except Exception as e:
+                    logger.warning(f"JSON mode request failed, retrying without response_format: {e}")
+                    span.add("retries")
+            return self.llm.invoke(messages)
+    
+    def _generate_structured_report(self, messages, sections, student_context, context_chunks, section_inputs):
+        """Single JSON call validated against the schema; only missing or invalid fields are re-requested"""
         try:
-            json_report = json.loads(response.content)
-        except Exception:
-            # Fallback structure if JSON parsing fails
-            json_report = {
-                "executive_summary": response.content,
-                "highlights": "Student showed strong engagement and demonstrated excellent communication skills in the roundtable discussion.",
-                "skill_feedback": "The student demonstrated excellent analytical thinking and communication abilities throughout the discussion.",
-                "improvements_over_time": "Leadership Initiative: Current score (35), Potential score (70) - Shows natural leadership qualities. Problem-Solving Application: Current score (40), Potential score (75) - Demonstrates strong analytical thinking. Collaborative Influence: Current score (45), Potential score (80) - Works well in team environments.",
-                "growth_areas": "1. Initiative Taking: Encourage more proactive project leadership. 2. Public Speaking: Practice formal presentation skills. 3. Technical Skills: Continue developing programming and analytical capabilities.",
-                "next_goals": "Focus on leadership development, enhance technical skills, and build confidence in public speaking situations.",
-                "action_plan": ["Schedule regular mentor check-ins", "Join leadership activities", "Practice technical presentations", "Work on identified growth areas"],
-                "conclusion": "The student shows tremendous potential for growth and success with continued mentorship and focused development in key areas."
-            }
-        return json_report
+            response = self._invoke_json(messages)
+            parsed = normalize_keys(extract_json_object(response.content))
+        except Exception as e:
+            logger.warning(f"Report generation call failed: {e}")
+            parsed = {}
+        
+        report, failed = validate_report(parsed, sections)
+        if failed:
+            logger.info(f"Re-requesting report fields individually: {', '.join(failed)}")
+            try:
+                report.update(self._generate_sections(
+                    failed, student_context, context_chunks, section_inputs, sections
+                ))
+            except Exception as e:
+                logger.warning(f"Field regeneration failed: {e}")
+        
+        # Canned text only for fields that still failed
+        return {
+            name: report[name] if name in report else spec["fallback"]
+            for name, spec in sections.items()
+        }
     
-    def _analyze_discussion(self, chat_history):
+    def _analyze_discussion(self, chat_history, memory=None):
         """Analyze the chat history to extract key insights"""
         if not chat_history:
             return "No discussion history available."
         
+        return f"""
+        {self._discussion_statistics(chat_history)}
+        
+        Recent Discussion Context:
+        {self._get_recent_context(chat_history, memory)}
+        """
+    
+    def _discussion_statistics(self, chat_history):
+        """Summarize participation statistics for the discussion"""
         user_messages = [msg for msg in chat_history if msg.get('role') == 'User']
         agent_messages = [msg for msg in chat_history if msg.get('role') not in ['User', 'System']]
         
@@ -110,21 +167,126 @@ class ReportGenerator:
             "user_participation": len(user_messages),
             "mentor_responses": len(agent_messages),
             "topics_discussed": self._extract_topics(user_messages),
-            "engagement_level": "High" if len(user_messages) > 3 else "Moderate" if len(user_messages) > 1 else "Initial"
+            "engagement_level": self._engagement_level(user_messages)
         }
         
-        return f"""
-        Discussion Statistics:
+        return f"""Discussion Statistics:
         - Total messages: {analysis['total_messages']}
         - Student messages: {analysis['user_participation']}  
         - Mentor responses: {analysis['mentor_responses']}
         - Engagement level: {analysis['engagement_level']}
-        - Topics explored: {', '.join(analysis['topics_discussed'])}
+        - Topics explored: {', '.join(analysis['topics_discussed'])}"""
+    
+    @staticmethod
+    def _engagement_level(user_messages):
+        return "High" if len(user_messages) > 3 else "Moderate" if len(user_messages) > 1 else "Initial"
+    
+    def _discussion_digest(self, chat_history):
+        """Mentors, topics and engagement of the discussion; most new messages leave it unchanged"""
+        user_messages = [msg for msg in chat_history if msg.get('role') == 'User']
+        mentors = sorted({msg.get('role') for msg in chat_history if msg.get('role') not in ('User', 'System', None)})
+        return (
+            f"Mentors who took part: {', '.join(mentors) or 'none yet'}\n"
+            f"Topics discussed: {', '.join(sorted(self._extract_topics(chat_history)))}\n"
+            f"Student engagement: {self._engagement_level(user_messages)}"
+        )
+    
+    def _student_contributions(self, chat_history):
+        """The student's latest messages, which change only when the student speaks"""
+        user_messages = [msg.get('content', '') for msg in chat_history if msg.get('role') == 'User']
+        if not user_messages:
+            return "The student has not written in the discussion yet."
+        return "\n".join(f"- {content[:300]}" for content in user_messages[-REPORT_STUDENT_MESSAGES:])
+    
+    def _section_inputs(self, chat_history, memory=None, mode=REPORT_MODE, kinds=tuple(SECTION_INPUT_LABELS)):
+        """Transcript-derived section inputs by name (see SECTION_INPUT_LABELS), building only ``kinds``"""
+        builders = {
+            "discussion": lambda: self._build_discussion_analysis(chat_history, memory, mode),
+            "student_turns": lambda: self._student_contributions(chat_history),
+            "digest": lambda: self._discussion_digest(chat_history),
+        }
+        return {kind: builders[kind]() for kind in kinds}
+    
+    def _should_map_reduce(self, chat_history, mode):
+        """Decide whether the transcript is long enough to need map-reduce"""
+        if mode == "map_reduce":
+            return bool(chat_history)
+        if mode == "single":
+            return False
+        return len(chat_history or []) > MAX_CHAT_HISTORY_FOR_REPORT
+    
+    def _chunk_transcript(self, chat_history, chunk_size=REPORT_MAP_CHUNK_SIZE):
+        """Split the transcript into consecutive chunks of chunk_size messages"""
+        return [chat_history[i:i + chunk_size] for i in range(0, len(chat_history), chunk_size)]
+    
+    def _summarize_chunks(self, chunks):
+        """Map step: summarize every transcript chunk in parallel"""
+        total = len(chunks)
+        summaries = [None] * total
+        pending = []
+        batch_inputs = []
+        for index, chunk in enumerate(chunks):
+            # Unchanged chunks keep their summary across regenerations
+            chunk_key = hash_transcript(chunk)
+            cached = chunk_summary_cache.get(chunk_key)
+            if cached is not None:
+                summaries[index] = cached
+                continue
+            
+            transcript = "\n".join(
+                f"{msg.get('role', 'Unknown')}: {msg.get('content', '')}"
+                for msg in chunk if msg.get('content')
+            )
+            pending.append((index, chunk_key))
+            batch_inputs.append([
+                SystemMessage(content=CHUNK_SUMMARY_PROMPT),
+                HumanMessage(content=f"Segment {index + 1} of {total}:\n{transcript}")
+            ])
+        
+        with tracer.span("report.map", chunks=total, cache_hits=total - len(pending)):
+            responses = self.llm.batch(
+                batch_inputs,
+                config={"max_concurrency": REPORT_MAP_CONCURRENCY},
+                return_exceptions=True
+            ) if batch_inputs else []
+        
+        for (index, chunk_key), response in zip(pending, responses):
+            if isinstance(response, Exception):
+                logger.warning(f"Chunk {index + 1}/{total} summary failed: {response}")
+                # Keep the segment represented with its truncated raw text
+                summaries[index] = self._get_recent_context(chunks[index])
+            else:
+                summaries[index] = response.content.strip()
+                chunk_summary_cache.put(chunk_key, summaries[index])
+        return summaries
+    
+    def _map_reduce_discussion(self, chat_history):
+        """Build the discussion analysis from parallel chunk summaries of the full transcript"""
+        chunks = self._chunk_transcript(chat_history)
+        summaries = self._summarize_chunks(chunks)
+        
+        timeline = "\n\n".join(
+            f"Segment {index + 1} (messages {index * REPORT_MAP_CHUNK_SIZE + 1}-"
+            f"{min((index + 1) * REPORT_MAP_CHUNK_SIZE, len(chat_history))}): {summary}"
+            for index, summary in enumerate(summaries)
+        )
         
-        Recent Discussion Context:
-        {self._get_recent_context(chat_history)}
+        return f"""
+        {self._discussion_statistics(chat_history)}
+        
+        Full Discussion Timeline (segment summaries, oldest first):
+        {timeline}
         """
     
+    def _build_discussion_analysis(self, chat_history, memory=None, mode=REPORT_MODE):
+        """Discussion analysis for the report prompt, map-reducing long transcripts"""
+        if self._should_map_reduce(chat_history, mode):
+            try:
+                return self._map_reduce_discussion(chat_history)
+            except Exception as e:
+                logger.warning(f"Map-reduce discussion analysis failed, using single pass: {e}")
+        return self._analyze_discussion(chat_history, memory)
+    
     def _extract_topics(self, user_messages):
         """Extract key topics from user messages"""
         topics = []
@@ -140,8 +302,12 @@ class ReportGenerator:
                 topics.append('Skill Development')
         return list(set(topics)) if topics else ['General Discussion']
     
-    def _get_recent_context(self, chat_history):
+    def _get_recent_context(self, chat_history, memory=None):
         """Get recent conversation context for analysis"""
+        # Rolling summary covers the whole session at a fixed size
+        if memory is not None:
+            return memory.render(chat_history)
+        
         recent_messages = chat_history[-6:] if len(chat_history) > 6 else chat_history
         context = []
         for msg in recent_messages:
@@ -162,7 +328,15 @@ class ReportGenerator:
         
         return "\n".join(context_items) if context_items else "Basic student profile available."
 
+    def create_html_report(self, student_data, report_content):
+        """Render generate_report_content output with the precompiled template (no LLM call)"""
+        return render_content_report(student_data, report_content)
+
     def create_html_report_with_llm(self, student_data, report_content):
+        """Legacy LLM formatting pass; uses the template renderer unless REPORT_HTML_USE_LLM is set"""
+        if not REPORT_HTML_USE_LLM:
+            return self.create_html_report(student_data, report_content)
+
         prompt = f"""
         You are a skilled academic editor at Growth Valley Community. Create a professional student report based on the provided content.
         
@@ -225,362 +399,20 @@ class ReportGenerator:
     
     def _create_complete_html(self, student_data, html_body):
         """Create complete HTML document with professional PDF-optimized styling"""
-        student_name = student_data.get('name', 'Student')
-        
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Student Insight Report - {student_name}</title>
-    <link href="https://fonts.googleapis.com/css2?family=Dancing+Script:wght@400;600;700&family=Playfair+Display:wght@400;700&family=Great+Vibes&family=Cormorant+Garamond:wght@400;600&family=Crimson+Text:wght@400;600&family=Libre+Baskerville:wght@400;700&family=Cambria:wght@400;700&family=Georgia:wght@400;700&display=swap" rel="stylesheet">
-    <style>
-        @page {{
-            size: A4;
-            margin: 8mm;
-        }}
-        
-        body {{
-            font-family: 'Crimson Text', 'Libre Baskerville', 'Cambria', 'Georgia', serif;
-            background-color: #ffffff;
-            color: #2c3e50;
-            line-height: 1.7;
-            margin: 0;
-            padding: 0;
-            font-size: 13pt;
-        }}
-        
-        .report-container {{
-            width: 100%;
-            min-height: 100vh;
-            background-color: #ffffff;
-            padding: 25px 30px;
-            box-sizing: border-box;
-            margin: 0;
-            position: relative;
-            border: 1px solid #e0e0e0;
-        }}
-        
-        .logo-container {{
-            position: relative;
-            width: 100%;
-            height: 80px;
-            margin-bottom: 20px;
-            padding: 5px 0;
-            border-bottom: 1px solid #e0e0e0;
-        }}
-        
-        .main-title {{
-            font-family: 'Cambria', 'Georgia', serif;
-            font-size: 24pt;
-            text-align: center;
-            margin: 20px 0 10px 0;
-            color: #000000;
-            font-weight: 600;
-            letter-spacing: 0.5px;
-            page-break-after: avoid;
-            border-bottom: 2px solid #000000;
-            padding-bottom: 8px;
-        }}
-        
-        h1 {{
-            font-family: 'Great Vibes', 'Dancing Script', 'Playfair Display', cursive;
-            font-size: 22pt;
-            text-align: center;
-            margin: 15px 0 25px 0;
-            color: #1976D2;
-            font-weight: 400;
-            border-bottom: 2px solid #1976D2;
-            padding-bottom: 10px;
-            page-break-after: avoid;
-            text-shadow: 1px 1px 2px rgba(25, 118, 210, 0.1);
-        }}
-        
-        h2 {{
-            font-family: 'Playfair Display', 'Dancing Script', 'Great Vibes', serif;
-            font-size: 17pt;
-            color: #1976D2;
-            margin-top: 25px;
-            margin-bottom: 15px;
-            font-weight: 600;
-            border-bottom: 2px solid #1976D2;
-            padding-bottom: 6px;
-            page-break-after: avoid;
-            text-shadow: 1px 1px 2px rgba(25, 118, 210, 0.1);
-            letter-spacing: 0.3px;
-        }}
-        
-        h3 {{
-            font-family: 'Cormorant Garamond', 'Playfair Display', serif;
-            font-size: 14pt;
-            color: #2c3e50;
-            margin-top: 20px;
-            margin-bottom: 10px;
-            font-weight: 600;
-            border-left: 3px solid #1976D2;
-            padding-left: 10px;
-        }}
-        
-        p {{
-            margin-bottom: 14px;
-            text-align: justify;
-            orphans: 2;
-            widows: 2;
-            font-family: 'Crimson Text', 'Libre Baskerville', 'Cambria', 'Georgia', serif;
-            font-size: 13pt;
-            line-height: 1.7;
-            color: #2c3e50;
-        }}
-        
-        ul {{
-            list-style-type: disc;
-            margin-left: 25px;
-            margin-bottom: 14px;
-            page-break-inside: avoid;
-        }}
-        
-        li {{
-            margin-bottom: 8px;
-            orphans: 2;
-            widows: 2;
-            font-family: 'Crimson Text', 'Libre Baskerville', 'Cambria', 'Georgia', serif;
-            font-size: 13pt;
-            line-height: 1.6;
-            color: #2c3e50;
-        }}
-        
-        .info-box {{
-            background-color: #E3F2FD;
-            border: 1px solid #1976D2;
-            border-left: 4px solid #1976D2;
-            padding: 15px;
-            margin-bottom: 20px;
-            border-radius: 6px;
-            page-break-inside: avoid;
-            font-size: 12pt;
-        }}
-        
-        .highlight-text {{
-            color: #D32F2F;
-            font-weight: 600;
-            background-color: #FFE5E5;
-            padding: 2px 4px;
-            border-radius: 3px;
-            border: 1px solid #FFCDD2;
-        }}
-        
-        .section-header {{
-            background-color: #F0F4C3;
-            padding: 8px 12px;
-            border-radius: 5px;
-            margin-top: 18px;
-            margin-bottom: 12px;
-            font-weight: 600;
-            color: #33691E;
-            font-family: 'Georgia', 'Cambria', serif;
-            page-break-after: avoid;
-            border-left: 3px solid #8BC34A;
-        }}
-        
-        .score-box {{
-            background: linear-gradient(135deg, #E8F5E8, #F0F8F0);
-            border: 2px solid #4CAF50;
-            padding: 8px 12px;
-            margin: 5px 3px;
-            border-radius: 6px;
-            display: inline-block;
-            min-width: 120px;
-            text-align: center;
-            font-weight: 600;
-            color: #2E7D32;
-            font-size: 11pt;
-            box-shadow: 0 2px 4px rgba(76, 175, 80, 0.2);
-        }}
-        
-        .current-score {{
-            background: linear-gradient(135deg, #FFF3E0, #FFE0B2);
-            border: 2px solid #FF9800;
-            padding: 6px 10px;
-            margin: 3px 2px;
-            border-radius: 6px;
-            display: inline-block;
-            min-width: 100px;
-            text-align: center;
-            font-weight: 600;
-            color: #E65100;
-            font-size: 11pt;
-            box-shadow: 0 2px 4px rgba(255, 152, 0, 0.2);
-        }}
-        
-        .potential-score {{
-            background: linear-gradient(135deg, #E8F5E8, #C8E6C9);
-            border: 2px solid #4CAF50;
-            padding: 6px 10px;
-            margin: 3px 2px;
-            border-radius: 6px;
-            display: inline-block;
-            min-width: 100px;
-            text-align: center;
-            font-weight: 600;
-            color: #1B5E20;
-            font-size: 11pt;
-            box-shadow: 0 2px 4px rgba(76, 175, 80, 0.2);
-        }}
-        
-        .page-break {{
-            page-break-before: always;
-        }}
-        
-        .keep-together {{
-            page-break-inside: avoid;
-        }}
-        
-        strong {{
-            color: #1976D2;
-            font-weight: 600;
-        }}
-        
-        .elegant-border {{
-            border: 1px solid #dee2e6;
-            border-radius: 4px;
-            padding: 15px;
-            margin: 12px 0;
-            background-color: #ffffff;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-        }}
-        
-        .section-divider {{
-            border-top: 1px solid #e0e0e0;
-            margin: 20px 0;
-            padding-top: 15px;
-        }}
-        
-        .recommendation-box {{
-            background-color: #F3E5F5;
-            border-left: 4px solid #9C27B0;
-            padding: 12px;
-            margin: 10px 0;
-            border-radius: 4px;
-            page-break-inside: avoid;
-        }}
-        
-        .insight-box {{
-            background-color: #E8F5E8;
-            border-left: 4px solid #4CAF50;
-            padding: 12px;
-            margin: 10px 0;
-            border-radius: 4px;
-            page-break-inside: avoid;
-        }}
-        
-        .skills-grid {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 15px;
-            margin: 15px 0;
-        }}
-        
-        .skill-item {{
-            background: #f8f9fa;
-            padding: 10px;
-            border-radius: 5px;
-            border-left: 3px solid #007bff;
-        }}
-        
-        /* Academic spacing */
-        .report-container > * {{
-            margin-bottom: 14px;
-        }}
-        
-        /* Professional table styling */
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 15px 0;
-            font-size: 11pt;
-        }}
-        
-        th, td {{
-            border: 1px solid #dee2e6;
-            padding: 8px 12px;
-            text-align: left;
-        }}
-        
-        th {{
-            background-color: #f8f9fa;
-            font-weight: 600;
-            color: #1a365d;
-        }}
-    </style>
-</head>
-<body>
-    <div class="report-container">
-        <div class="main-title">Growth Valley Community</div>
-        <h1>AI Mentor Roundtable Report</h1>
-        
-        {html_body}
-    </div>
-</body>
-</html>"""
+        return render_document(student_data, html_body)
 
     def generate_pdf(self, html_content):
-        """Generate PDF with professional formatting options"""
-        options = {
-            'page-size': 'A4',
-            'margin-top': '8mm',
-            'margin-right': '8mm',
-            'margin-bottom': '8mm',
-            'margin-left': '8mm',
-            'encoding': "UTF-8",
-            'no-outline': None,
-            'enable-local-file-access': None,
-            'print-media-type': None,
-            'disable-smart-shrinking': None,
-            'load-error-handling': 'ignore',
-            'load-media-error-handling': 'ignore',
-            'javascript-delay': 1000,
-            'no-stop-slow-scripts': None,
-            'debug-javascript': None
-        }
-        
-        config = pdfkit.configuration(wkhtmltopdf=self.wkhtmltopdf_path) if self.wkhtmltopdf_path else None
-        
+        """Generate PDF through the shared render service"""
         try:
-            with tempfile.NamedTemporaryFile(suffix='.html', delete=False) as html_file:
-                html_file.write(html_content.encode('utf-8'))
-                html_path = html_file.name
-            
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
-                pdf_path = pdf_file.name
-            
-            # Generate PDF with enhanced options
-            pdfkit.from_file(html_path, pdf_path, options=options, configuration=config)
-            
-            with open(pdf_path, 'rb') as f:
-                pdf_content = f.read()
-            
-            # Clean up temporary files
-            os.unlink(html_path)
-            os.unlink(pdf_path)
-            
-            return pdf_content
-            
+            return pdf_renderer.render(html_content)
         except Exception as e:
-            # Clean up files if they exist
-            try:
-                if 'html_path' in locals():
-                    os.unlink(html_path)
-                if 'pdf_path' in locals():
-                    os.unlink(pdf_path)
-            except:
-                pass
             raise Exception(f"PDF generation failed: {str(e)}")
     
-    def generate_comprehensive_report(self, chat_history, student_data, context_chunks):
+    def generate_comprehensive_report(self, chat_history, student_data, context_chunks, memory=None, mode=REPORT_MODE):
         """Generate a comprehensive report similar to CSV report generator with enhanced formatting"""
         
         # Enhanced system prompt for comprehensive report generation
-        system_prompt = """You are a PhD in psychology, master educator, tech genius, and best entrepreneurship mentor at Growth Valley Community.
+        system_prompt = f"""You are a PhD in psychology, master educator, tech genius, and best entrepreneurship mentor at Growth Valley Community.
         
         Write a detailed mentor-style report that is very honest, to the point, very factual with 3 improvement suggestions for the student in GVC's tone and format.
         
@@ -613,10 +445,11 @@ class ReportGenerator:
         Include research facts about how GVC helps future leaders and entrepreneurs.
         Make parents feel good about their investment in their child's development.
         
-        Format as JSON with section names as keys."""
+        Respond with a single JSON object and nothing else, using exactly these keys: {schema_keys_description(REPORT_SECTIONS)}."""
         
         # Prepare enhanced context
-        discussion_summary = self._analyze_discussion(chat_history)
+        section_inputs = self._section_inputs(chat_history, memory, mode)
+        discussion_summary = section_inputs["discussion"]
         student_context = self._format_student_context(student_data)
         
         messages = [
@@ -633,182 +466,172 @@ class ReportGenerator:
             """)
         ]
         
-        response = self.llm.invoke(messages)
+        return self._generate_structured_report(
+            messages, REPORT_SECTIONS, student_context, context_chunks, section_inputs
+        )
+    
+    def generate_sectioned_report(self, chat_history, student_data, context_chunks, memory=None, mode=REPORT_MODE):
+        """Generate the comprehensive report section by section, concurrently and with caching.
         
-        try:
-            json_report = json.loads(response.content)
-        except Exception:
-            # Enhanced fallback structure
-            json_report = {
-                "highlights": "Student demonstrated excellent engagement and thoughtful participation in the AI mentor roundtable discussion, showing strong analytical thinking and genuine curiosity about their future development.",
-                "skill_feedback": "The student exhibited strong communication abilities, asking insightful questions and actively engaging with multiple mentors. Their responses showed depth of thinking and genuine interest in personal growth.",
-                "improvements_over_time": "Leadership Initiative: Current 65, Potential 85. Problem Solving Application: Current 70, Potential 90. Collaborative Influence: Current 60, Potential 82.",
-                "next_goals": "Focus on developing leadership confidence through project management opportunities. Enhance technical skills through hands-on programming projects. Build public speaking abilities through presentation practice.",
-                "closing_note": "This student shows tremendous potential for growth and success with their natural curiosity and commitment to learning. Their engagement in the roundtable discussion demonstrates readiness for advanced mentorship.",
-                "summary_insight": "The student's participation in GVC's AI mentor roundtable has revealed strong foundations for future success. This kind of personalized, interactive learning environment helps develop critical thinking and leadership skills that traditional classroom settings cannot provide. Research from Stanford University shows that mentorship-based learning significantly improves student outcomes and career preparation.",
-                "recommended_resources": "TED Talk: 'How to Build Your Creative Confidence' by David Kelley. Book: 'Mindset: The New Psychology of Success' by Carol Dweck. Article: 'The Power of Growth Mindset in Education' from Harvard Business Review.",
-                "parent_feedback_prompt": "Ask your child about their favorite insight from the mentor discussion and how they plan to apply it in their daily life.",
-                "mentor_final_thought": "This student doesn't just absorb knowledge; they transform it into wisdom through thoughtful application and genuine curiosity."
-            }
-        
-        return json_report
+        Each section is cached on the profile and the transcript-derived inputs it declares, so a
+        new mentor message regenerates only the sections given the full discussion analysis.
+        """
+        student_context = self._format_student_context(student_data)
+        student_key = student_cache_key(student_data)
+        profile_hash = hash_text(student_context, context_chunks)
+        # Built up front (chunk summaries come from their cache) so sections are keyed on the
+        # exact text they are given rather than on the raw transcript
+        kinds = [
+            kind for kind in SECTION_INPUT_LABELS
+            if any(kind in spec["inputs"] for spec in REPORT_SECTIONS.values())
+        ]
+        section_inputs = self._section_inputs(chat_history, memory, mode, kinds)
+        
+        report = {}
+        pending = {}
+        for name, spec in REPORT_SECTIONS.items():
+            input_hash = hash_text(profile_hash, *(section_inputs[kind] for kind in kinds if kind in spec["inputs"]))
+            cache_key = (student_key, name, input_hash)
+            cached = section_cache.get(cache_key)
+            if cached is not None:
+                report[name] = cached
+            else:
+                pending[name] = cache_key
+        
+        if pending:
+            logger.info(f"Generating {len(pending)} of {len(REPORT_SECTIONS)} report sections")
+            generated = self._generate_sections(
+                list(pending), student_context, context_chunks, section_inputs
+            )
+            for name, value in generated.items():
+                report[name] = value
+                section_cache.put(pending.pop(name), value)
+            
+            for name in pending:
+                report[name] = REPORT_SECTIONS[name]["fallback"]
+        
+        return {name: report[name] for name in REPORT_SECTIONS}
+    
+    def _generate_sections(self, section_names, student_context, context_chunks, section_inputs,
+                           sections=REPORT_SECTIONS):
+        """Generate the named sections concurrently, retrying only the ones that fail validation"""
+        generated = {}
+        pending = list(section_names)
+        attempt = 0
+        while pending and attempt <= REPORT_SECTION_RETRIES:
+            batch_inputs = []
+            for name in pending:
+                system_prompt, user_prompt = build_section_messages(
+                    name, student_context, context_chunks, section_inputs, sections
+                )
+                batch_inputs.append([SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)])
+            
+            with tracer.span("report.sections", sections=len(pending), retries=attempt):
+                responses = self.llm.batch(
+                    batch_inputs,
+                    config={"max_concurrency": REPORT_SECTION_CONCURRENCY},
+                    return_exceptions=True
+                )
+            
+            failed = []
+            for name, response in zip(pending, responses):
+                if isinstance(response, Exception):
+                    logger.warning(f"Section '{name}' generation failed: {response}")
+                    failed.append(name)
+                    continue
+                value = coerce_section_value(response.content, sections[name].get("type", str))
+                is_valid, reason = validate_section(name, value, sections)
+                if is_valid:
+                    generated[name] = value
+                else:
+                    logger.info(f"Section '{name}' failed validation: {reason}")
+                    failed.append(name)
+            pending = failed
+            attempt += 1
+        
+        return generated
     
     def create_enhanced_html_report(self, student_data, comprehensive_report):
         """Create enhanced HTML report with professional formatting similar to CSV generator"""
-        
-        # Extract student information
-        student_name = student_data.get('name', 'Student')
-        gvc_id = student_data.get('gvc_id', 'GVC001')
-        grade = student_data.get('grade_level', 'N/A')
-        school = student_data.get('school', 'School Name')
-        city = student_data.get('city', 'City')
-        
-        # Parse improvements over time for score boxes
-        improvements_text = comprehensive_report.get('improvements_over_time', '')
-        score_boxes_html = self._create_score_boxes(improvements_text)
-        
-        html_body = f"""
-<div class="info-box">
-    <p><strong>Student Name:</strong> {student_name}</p>
-    <p><strong>GVC ID:</strong> {gvc_id}</p>
-    <p><strong>Class:</strong> {grade}</p>
-    <p><strong>School:</strong> {school}</p>
-    <p><strong>City:</strong> {city}</p>
-</div>
-
-<h2>Highlights</h2>
-<p>{comprehensive_report.get('highlights', 'Student showed excellent engagement in the roundtable discussion.')}</p>
-
-<h2>Skill Feedback</h2>
-<p>{comprehensive_report.get('skill_feedback', 'The student demonstrated strong communication and analytical abilities.')}</p>
-
-<h2>Improvements Over Time</h2>
-<p>The student has shown wonderful growth in key areas during the AI mentor roundtable session:</p>
-{score_boxes_html}
-
-<h2>Next Goals</h2>
-<div class="recommendation-box">
-    <p>{comprehensive_report.get('next_goals', 'Continue developing leadership, technical, and communication skills through structured practice and mentorship.')}</p>
-</div>
-
-<h2>Closing Note</h2>
-<p>{comprehensive_report.get('closing_note', 'This student shows tremendous potential for continued growth and success.')}</p>
+        return render_comprehensive_report(student_data, comprehensive_report)
+    
+    def report_cache_key(self, chat_history, student_data, mode=REPORT_MODE, sectioned=REPORT_SECTION_PARALLEL):
+        """Content address of a finished report: profile, transcript, template version and generation mode"""
+        profile = json.dumps(student_data or {}, sort_keys=True, default=str)
+        return hash_text(profile, hash_transcript(chat_history), REPORT_TEMPLATE_VERSION, mode, sectioned)
+    
+    def _cached_result(self, cache_key):
+        cached = report_artifact_cache.get(cache_key)
+        if cached is None:
+            return None
+        cached['cached'] = True
+        cached['message'] = 'Report loaded from cache - profile and discussion unchanged'
+        return cached
+    
+    def get_cached_report(self, chat_history, student_data, mode=REPORT_MODE, sectioned=REPORT_SECTION_PARALLEL):
+        """Previously generated report for this exact profile and transcript, or None"""
+        return self._cached_result(self.report_cache_key(chat_history, student_data, mode, sectioned))
+    
+    def generate_csv_style_report(self, chat_history, student_data, context_chunks, memory=None,
+                                  mode=REPORT_MODE, sectioned=REPORT_SECTION_PARALLEL, progress_callback=None):
+        """Generate a complete report with CSV-style professional formatting and features
 
-<h2>Summary Insight</h2>
-<div class="insight-box">
-    <p>{comprehensive_report.get('summary_insight', 'The student engagement with GVC AI mentor roundtable demonstrates readiness for advanced learning and leadership development.')}</p>
-</div>
+        progress_callback, if given, is called with the stage name ("analysis", "html", "pdf")
+        as each stage starts.
+        """
+        with tracer.span("report", messages=len(chat_history or []), sectioned=sectioned) as span:
+            return self._generate_csv_style_report(
+                chat_history, student_data, context_chunks, memory, mode, sectioned, progress_callback, span
+            )
 
-<h2>Recommended Resources</h2>
-<p>Here are some resources to inspire continued growth:</p>
-<div class="elegant-border">
-    {self._format_resources(comprehensive_report.get('recommended_resources', ''))}
-</div>
+    def _generate_csv_style_report(self, chat_history, student_data, context_chunks, memory,
+                                   mode, sectioned, progress_callback, span):
+        def report_progress(stage):
+            if progress_callback is not None:
+                progress_callback(stage)
 
-<h2>Parent Feedback Prompt</h2>
-<div class="recommendation-box">
-    <p>{comprehensive_report.get('parent_feedback_prompt', 'Please discuss with your child their key takeaways from the mentor session.')}</p>
-</div>
+        # Same profile, transcript and template -> same report
+        cache_key = self.report_cache_key(chat_history, student_data, mode, sectioned)
+        cached = self._cached_result(cache_key)
+        if cached is not None:
+            span.add("cache_hits")
+            return cached
 
-<h2>Mentor Final Thought</h2>
-<div class="insight-box">
-    <p><em>"{comprehensive_report.get('mentor_final_thought', 'This student demonstrates exceptional potential for future success.')}"</em></p>
-</div>
-"""
-        
-        return self._create_complete_html(student_data, html_body)
-    
-    def _create_score_boxes(self, improvements_text):
-        """Create HTML score boxes from improvements text"""
-        if not improvements_text:
-            return '<p>Skill development metrics will be available after continued engagement.</p>'
-        
-        score_boxes = []
-        lines = improvements_text.split('.')
-        
-        for line in lines:
-            if 'Current' in line and 'Potential' in line:
-                # Parse skill name and scores
-                parts = line.strip().split(':')
-                if len(parts) >= 2:
-                    skill_name = parts[0].strip()
-                    score_part = parts[1].strip()
-                    
-                    # Extract current and potential scores
-                    if 'Current' in score_part and 'Potential' in score_part:
-                        try:
-                            current_match = score_part.split('Current')[1].split(',')[0].strip()
-                            potential_match = score_part.split('Potential')[1].strip()
-                            
-                            current_score = ''.join(filter(str.isdigit, current_match))
-                            potential_score = ''.join(filter(str.isdigit, potential_match))
-                            
-                            if current_score and potential_score:
-                                score_boxes.append(f"""
-<div class="keep-together" style="margin: 10px 0;">
-    <strong>{skill_name}:</strong>
-    <span class="current-score">Current: {current_score}</span>
-    <span style="margin: 0 5px;">→</span>
-    <span class="potential-score">Target: {potential_score}</span>
-</div>""")
-                        except:
-                            pass
-        
-        if not score_boxes:
-            return '<p>Leadership, problem-solving, and collaboration skills show strong potential for growth through continued mentorship.</p>'
-        
-        return ''.join(score_boxes)
-    
-    def _format_resources(self, resources_text):
-        """Format recommended resources as HTML list"""
-        if not resources_text:
-            return """
-            <ul>
-                <li><strong>TED Talk:</strong> "How to Build Your Creative Confidence" by David Kelley</li>
-                <li><strong>Book:</strong> "Mindset: The New Psychology of Success" by Carol Dweck</li>
-                <li><strong>Article:</strong> "The Future of Learning" from Harvard Business Review</li>
-            </ul>
-            """
-        
-        # Try to parse the resources text
-        resources_html = "<ul>\n"
-        lines = resources_text.split('.')
-        
-        for line in lines:
-            line = line.strip()
-            if any(keyword in line.lower() for keyword in ['ted talk', 'book', 'article']):
-                if line and not line.endswith('.'):
-                    line += '.'
-                resources_html += f"<li>{line}</li>\n"
-        
-        resources_html += "</ul>"
-        
-        # If no resources found, use default
-        if resources_html == "<ul>\n</ul>":
-            return self._format_resources("")
-        
-        return resources_html
-    
-    def generate_csv_style_report(self, chat_history, student_data, context_chunks):
-        """Generate a complete report with CSV-style professional formatting and features"""
         try:
             # Generate comprehensive report content
-            comprehensive_report = self.generate_comprehensive_report(chat_history, student_data, context_chunks)
+            report_progress("analysis")
+            with tracer.span("report.analysis"):
+                if sectioned:
+                    comprehensive_report = self.generate_sectioned_report(
+                        chat_history, student_data, context_chunks, memory, mode
+                    )
+                else:
+                    comprehensive_report = self.generate_comprehensive_report(
+                        chat_history, student_data, context_chunks, memory, mode
+                    )
             
             # Create enhanced HTML with professional styling
-            html_report = self.create_enhanced_html_report(student_data, comprehensive_report)
+            report_progress("html")
+            with tracer.span("report.html"):
+                html_report = self.create_enhanced_html_report(student_data, comprehensive_report)
             
             # Generate PDF
+            report_progress("pdf")
             try:
-                pdf_content = self.generate_pdf(html_report)
-                return {
+                with tracer.span("report.pdf"):
+                    pdf_content = self.generate_pdf(html_report)
+                result = {
+                    'report': comprehensive_report,
                     'html': html_report,
                     'pdf': pdf_content,
                     'success': True,
                     'message': 'Professional report generated successfully with CSV-style formatting'
                 }
+                report_artifact_cache.put(cache_key, result)
+                return result
             except Exception as pdf_error:
                 return {
+                    'report': comprehensive_report,
                     'html': html_report,
                     'pdf': None,
                     'success': False,
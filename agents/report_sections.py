@@ -0,0 +1,295 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from config.settings import REPORT_SECTION_CACHE_SIZE
+
+SECTION_SYSTEM_PROMPT = """You are a PhD in psychology, master educator, tech genius, and best entrepreneurship mentor at Growth Valley Community.
+You are writing ONE section of a mentor-style report about a student who took part in an AI mentor roundtable.
+
+CRITICAL REQUIREMENTS:
+- Be very honest, to the point and factual, in GVC's encouraging tone
+- DO NOT USE "-" AND "*" ANYWHERE
+- Do not add a heading or the section name, write only the section text
+- Should not look AI generated
+- Use the student's background, interests, and discussion context"""
+
+# Section name -> focused instruction, inputs it depends on, value type and fallback.
+# Inputs besides "profile" are texts built from the transcript (see SECTION_INPUT_LABELS) and
+# cached sections are keyed on exactly the inputs they are given. Only the sections that need
+# the full "discussion" analysis change with every new message; "student_turns" changes when
+# the student speaks, and "digest" (mentors, topics, engagement level) when one of those does.
+# These tables double as the typed schema for the single-call JSON reports.
+REPORT_SECTIONS = OrderedDict([
+    ("highlights", {
+        "title": "Highlights",
+        "instruction": "Key strengths and observations from the roundtable discussion, 2 to 3 sentences.",
+        "inputs": ("profile", "discussion"),
+        "fallback": "Student demonstrated excellent engagement and thoughtful participation in the AI mentor roundtable discussion, showing strong analytical thinking and genuine curiosity about their future development."
+    }),
+    ("skill_feedback", {
+        "title": "Skill Feedback",
+        "instruction": "Assessment of communication, analytical thinking and collaboration, 2 to 4 sentences.",
+        "inputs": ("profile", "student_turns"),
+        "fallback": "The student exhibited strong communication abilities, asking insightful questions and actively engaging with multiple mentors. Their responses showed depth of thinking and genuine interest in personal growth."
+    }),
+    ("improvements_over_time", {
+        "title": "Improvements Over Time",
+        "instruction": (
+            "Exactly 3 specific skill areas with a current score (50-80) and potential score (70-95), "
+            "one per line in this exact format: Leadership Initiative: Current 65, Potential 85"
+        ),
+        "inputs": ("profile", "discussion"),
+        "fallback": "Leadership Initiative: Current 65, Potential 85. Problem Solving Application: Current 70, Potential 90. Collaborative Influence: Current 60, Potential 82."
+    }),
+    ("next_goals", {
+        "title": "Next Goals",
+        "instruction": "3 specific focus areas for development, written as 3 short sentences.",
+        "inputs": ("profile", "discussion"),
+        "fallback": "Focus on developing leadership confidence through project management opportunities. Enhance technical skills through hands-on programming projects. Build public speaking abilities through presentation practice."
+    }),
+    ("closing_note", {
+        "title": "Closing Note",
+        "instruction": "Encouraging summary about the student's potential, 2 sentences.",
+        "inputs": ("profile", "digest"),
+        "fallback": "This student shows tremendous potential for growth and success with their natural curiosity and commitment to learning. Their engagement in the roundtable discussion demonstrates readiness for advanced mentorship."
+    }),
+    ("summary_insight", {
+        "title": "Summary Insight",
+        "instruction": "How this growth will benefit the student, praising the parents for enrolling them in GVC, 2 to 3 sentences.",
+        "inputs": ("profile", "digest"),
+        "fallback": "The student's participation in GVC's AI mentor roundtable has revealed strong foundations for future success. This kind of personalized, interactive learning environment helps develop critical thinking and leadership skills that traditional classroom settings cannot provide."
+    }),
+    ("recommended_resources", {
+        "title": "Recommended Resources",
+        "instruction": "1 TED talk, 1 book and 1 article suited to the student's needs, formatted as: TED Talk: ... Book: ... Article: ...",
+        "inputs": ("profile",),
+        "fallback": "TED Talk: 'How to Build Your Creative Confidence' by David Kelley. Book: 'Mindset: The New Psychology of Success' by Carol Dweck. Article: 'The Power of Growth Mindset in Education' from Harvard Business Review."
+    }),
+    ("parent_feedback_prompt", {
+        "title": "Parent Feedback Prompt",
+        "instruction": "One question parents should ask the student about the discussion, 1 sentence.",
+        "inputs": ("profile", "digest"),
+        "fallback": "Ask your child about their favorite insight from the mentor discussion and how they plan to apply it in their daily life."
+    }),
+    ("mentor_final_thought", {
+        "title": "Mentor Final Thought",
+        "instruction": "One inspiring quote-style sentence about the student, without quotation marks.",
+        "inputs": ("profile", "digest"),
+        "fallback": "This student doesn't just absorb knowledge; they transform it into wisdom through thoughtful application and genuine curiosity."
+    }),
+])
+
+# Prompt label of each transcript-derived section input
+SECTION_INPUT_LABELS = OrderedDict([
+    ("discussion", "Discussion Analysis"),
+    ("student_turns", "Student's Own Messages"),
+    ("digest", "Discussion Overview"),
+])
+
+# Schema of ReportGenerator.generate_report_content
+CONTENT_REPORT_SECTIONS = OrderedDict([
+    ("executive_summary", {
+        "title": "Executive Summary",
+        "instruction": "Brief overview of the student's engagement and key insights, 3 to 4 sentences.",
+        "inputs": ("profile", "discussion"),
+        "fallback": "The student engaged thoughtfully with the AI mentor roundtable and showed clear interest in their own growth."
+    }),
+    ("highlights", {
+        "title": "Highlights",
+        "instruction": "Key strengths and remarkable observations from the discussion, 2 to 3 sentences.",
+        "inputs": ("profile", "discussion"),
+        "fallback": "Student showed strong engagement and demonstrated excellent communication skills in the roundtable discussion."
+    }),
+    ("skill_feedback", {
+        "title": "Skill Feedback",
+        "instruction": "Assessment of communication, analytical thinking, collaboration and technical skills, 2 to 4 sentences.",
+        "inputs": ("profile", "discussion"),
+        "fallback": "The student demonstrated excellent analytical thinking and communication abilities throughout the discussion."
+    }),
+    ("improvements_over_time", {
+        "title": "Improvements Over Time",
+        "instruction": (
+            "3 specific skill areas, one per line in this exact format: "
+            "Skill Name: Current score (X), Potential score (Y) - Brief explanation"
+        ),
+        "inputs": ("profile", "discussion"),
+        "fallback": "Leadership Initiative: Current score (35), Potential score (70) - Shows natural leadership qualities. Problem-Solving Application: Current score (40), Potential score (75) - Demonstrates strong analytical thinking. Collaborative Influence: Current score (45), Potential score (80) - Works well in team environments."
+    }),
+    ("growth_areas", {
+        "title": "Growth Areas",
+        "instruction": "3 specific areas for improvement, each with an actionable step.",
+        "inputs": ("profile", "discussion"),
+        "fallback": "1. Initiative Taking: Encourage more proactive project leadership. 2. Public Speaking: Practice formal presentation skills. 3. Technical Skills: Continue developing programming and analytical capabilities."
+    }),
+    ("next_goals", {
+        "title": "Next Goals",
+        "instruction": "Concrete recommendations and development targets, 2 to 3 sentences.",
+        "inputs": ("profile", "discussion"),
+        "fallback": "Focus on leadership development, enhance technical skills, and build confidence in public speaking situations."
+    }),
+    ("action_plan", {
+        "title": "Action Plan",
+        "instruction": "3 to 5 specific next steps with timelines, one step per line.",
+        "inputs": ("profile", "discussion"),
+        "type": list,
+        "fallback": ["Schedule regular mentor check-ins", "Join leadership activities", "Practice technical presentations", "Work on identified growth areas"]
+    }),
+    ("conclusion", {
+        "title": "Conclusion",
+        "instruction": "Encouraging summary with future outlook, 2 sentences.",
+        "inputs": ("profile", "discussion"),
+        "fallback": "The student shows tremendous potential for growth and success with continued mentorship and focused development in key areas."
+    }),
+])
+
+SCORE_LINE_PATTERN = re.compile(
+    r"[A-Za-z][^:\n]*:\s*Current(?:\s+score)?\s*\(?\d{1,3}\)?\s*,\s*Potential(?:\s+score)?\s*\(?\d{1,3}\)?",
+    re.IGNORECASE
+)
+
+
+def hash_text(*parts):
+    """Stable short hash of the given text parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:32]
+
+
+def hash_transcript(chat_history):
+    """Hash of the roles and contents of a transcript"""
+    return hash_text(*(
+        f"{msg.get('role', '')}\x01{msg.get('content', '')}" for msg in (chat_history or [])
+    ))
+
+
+def student_cache_key(student_data):
+    """Identify a student for cache keys"""
+    if not student_data:
+        return "anonymous"
+    return str(student_data.get('gvc_id') or student_data.get('name') or hash_text(student_data))
+
+
+def schema_keys_description(sections=REPORT_SECTIONS):
+    """Describe the expected JSON keys and value types for a report prompt"""
+    return ", ".join(
+        f'"{name}" ({"array of strings" if spec.get("type", str) is list else "string"})'
+        for name, spec in sections.items()
+    )
+
+
+def build_section_messages(section_name, student_context, context_chunks, section_inputs, sections=REPORT_SECTIONS):
+    """Small focused prompt for a single report section, given only the inputs it declares.
+
+    ``section_inputs`` maps SECTION_INPUT_LABELS names to their text.
+    """
+    spec = sections[section_name]
+    user_prompt = f"Student Profile: {student_context}\n\nCompany Context: {context_chunks}\n\n"
+    for kind, label in SECTION_INPUT_LABELS.items():
+        if kind in spec["inputs"]:
+            user_prompt += f"{label}: {section_inputs[kind]}\n\n"
+    user_prompt += f"Write the {spec['title']} section: {spec['instruction']}"
+    return SECTION_SYSTEM_PROMPT, user_prompt
+
+
+def clean_section_text(text):
+    """Strip headings, bullets and wrapping quotes the model may add"""
+    if not isinstance(text, str):
+        return ""
+    lines = []
+    for line in text.strip().splitlines():
+        line = line.strip().lstrip("-*• ").strip()
+        if line:
+            lines.append(line)
+    cleaned = "\n".join(lines).strip().strip('"').strip()
+    return cleaned
+
+
+def coerce_section_value(value, expected_type=str):
+    """Convert a parsed or generated value to the section's declared type"""
+    if expected_type is list:
+        if isinstance(value, list):
+            items = [clean_section_text(str(item)) for item in value]
+        elif isinstance(value, str):
+            items = [re.sub(r"^\d+[.)]\s*", "", line) for line in clean_section_text(value).splitlines()]
+        else:
+            return []
+        return [item for item in items if item]
+
+    if isinstance(value, list):
+        value = " ".join(str(item) for item in value)
+    elif isinstance(value, dict):
+        value = " ".join(f"{key}: {item}" for key, item in value.items())
+    elif value is None:
+        return ""
+    return clean_section_text(str(value))
+
+
+def validate_section(section_name, text, sections=REPORT_SECTIONS):
+    """Check a generated section against its expected shape"""
+    if sections[section_name].get("type", str) is list:
+        if not isinstance(text, list) or not text:
+            return False, "Expected a non-empty list"
+        return True, "Valid"
+
+    if not isinstance(text, str) or len(text.strip()) < 20:
+        return False, "Section too short"
+    if len(text) > 1500:
+        return False, "Section too long"
+    if section_name == "improvements_over_time" and len(SCORE_LINE_PATTERN.findall(text)) < 3:
+        return False, "Expected 3 'Skill: Current N, Potential M' entries"
+    if section_name == "recommended_resources":
+        lowered = text.lower()
+        if not all(keyword in lowered for keyword in ("ted", "book", "article")):
+            return False, "Expected a TED talk, a book and an article"
+    return True, "Valid"
+
+
+def validate_report(data, sections=REPORT_SECTIONS):
+    """Coerce a parsed report to the schema; returns (report, names of missing or invalid fields)"""
+    report = {}
+    failed = []
+    data = data if isinstance(data, dict) else {}
+    for name, spec in sections.items():
+        value = coerce_section_value(data.get(name), spec.get("type", str))
+        is_valid, _ = validate_section(name, value, sections)
+        if is_valid:
+            report[name] = value
+        else:
+            failed.append(name)
+    return report, failed
+
+
+class SectionCache:
+    """Thread-safe LRU of generated sections keyed by (student, section, input hash)"""
+
+    def __init__(self, max_entries=REPORT_SECTION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared across sessions - entries are keyed by student and content hash
+section_cache = SectionCache()
+chunk_summary_cache = SectionCache()
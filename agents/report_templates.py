@@ -0,0 +1,519 @@
+import re
+
+from jinja2 import DictLoader, Environment, select_autoescape
+from markupsafe import Markup
+
+from agents.report_sections import REPORT_SECTIONS, CONTENT_REPORT_SECTIONS
+
+# Bump when the layout changes so cached artifacts are re-rendered
+REPORT_TEMPLATE_VERSION = "1"
+
+REPORT_CSS = """
+    @page {
+        size: A4;
+        margin: 8mm;
+    }
+
+    body {
+        font-family: 'Crimson Text', 'Libre Baskerville', 'Cambria', 'Georgia', serif;
+        background-color: #ffffff;
+        color: #2c3e50;
+        line-height: 1.7;
+        margin: 0;
+        padding: 0;
+        font-size: 13pt;
+    }
+
+    .report-container {
+        width: 100%;
+        min-height: 100vh;
+        background-color: #ffffff;
+        padding: 25px 30px;
+        box-sizing: border-box;
+        margin: 0;
+        position: relative;
+        border: 1px solid #e0e0e0;
+    }
+
+    .logo-container {
+        position: relative;
+        width: 100%;
+        height: 80px;
+        margin-bottom: 20px;
+        padding: 5px 0;
+        border-bottom: 1px solid #e0e0e0;
+    }
+
+    .main-title {
+        font-family: 'Cambria', 'Georgia', serif;
+        font-size: 24pt;
+        text-align: center;
+        margin: 20px 0 10px 0;
+        color: #000000;
+        font-weight: 600;
+        letter-spacing: 0.5px;
+        page-break-after: avoid;
+        border-bottom: 2px solid #000000;
+        padding-bottom: 8px;
+    }
+
+    h1 {
+        font-family: 'Great Vibes', 'Dancing Script', 'Playfair Display', cursive;
+        font-size: 22pt;
+        text-align: center;
+        margin: 15px 0 25px 0;
+        color: #1976D2;
+        font-weight: 400;
+        border-bottom: 2px solid #1976D2;
+        padding-bottom: 10px;
+        page-break-after: avoid;
+        text-shadow: 1px 1px 2px rgba(25, 118, 210, 0.1);
+    }
+
+    h2 {
+        font-family: 'Playfair Display', 'Dancing Script', 'Great Vibes', serif;
+        font-size: 17pt;
+        color: #1976D2;
+        margin-top: 25px;
+        margin-bottom: 15px;
+        font-weight: 600;
+        border-bottom: 2px solid #1976D2;
+        padding-bottom: 6px;
+        page-break-after: avoid;
+        text-shadow: 1px 1px 2px rgba(25, 118, 210, 0.1);
+        letter-spacing: 0.3px;
+    }
+
+    h3 {
+        font-family: 'Cormorant Garamond', 'Playfair Display', serif;
+        font-size: 14pt;
+        color: #2c3e50;
+        margin-top: 20px;
+        margin-bottom: 10px;
+        font-weight: 600;
+        border-left: 3px solid #1976D2;
+        padding-left: 10px;
+    }
+
+    p {
+        margin-bottom: 14px;
+        text-align: justify;
+        orphans: 2;
+        widows: 2;
+        font-family: 'Crimson Text', 'Libre Baskerville', 'Cambria', 'Georgia', serif;
+        font-size: 13pt;
+        line-height: 1.7;
+        color: #2c3e50;
+    }
+
+    ul {
+        list-style-type: disc;
+        margin-left: 25px;
+        margin-bottom: 14px;
+        page-break-inside: avoid;
+    }
+
+    li {
+        margin-bottom: 8px;
+        orphans: 2;
+        widows: 2;
+        font-family: 'Crimson Text', 'Libre Baskerville', 'Cambria', 'Georgia', serif;
+        font-size: 13pt;
+        line-height: 1.6;
+        color: #2c3e50;
+    }
+
+    .info-box {
+        background-color: #E3F2FD;
+        border: 1px solid #1976D2;
+        border-left: 4px solid #1976D2;
+        padding: 15px;
+        margin-bottom: 20px;
+        border-radius: 6px;
+        page-break-inside: avoid;
+        font-size: 12pt;
+    }
+
+    .highlight-text {
+        color: #D32F2F;
+        font-weight: 600;
+        background-color: #FFE5E5;
+        padding: 2px 4px;
+        border-radius: 3px;
+        border: 1px solid #FFCDD2;
+    }
+
+    .section-header {
+        background-color: #F0F4C3;
+        padding: 8px 12px;
+        border-radius: 5px;
+        margin-top: 18px;
+        margin-bottom: 12px;
+        font-weight: 600;
+        color: #33691E;
+        font-family: 'Georgia', 'Cambria', serif;
+        page-break-after: avoid;
+        border-left: 3px solid #8BC34A;
+    }
+
+    .score-box {
+        background: linear-gradient(135deg, #E8F5E8, #F0F8F0);
+        border: 2px solid #4CAF50;
+        padding: 8px 12px;
+        margin: 5px 3px;
+        border-radius: 6px;
+        display: inline-block;
+        min-width: 120px;
+        text-align: center;
+        font-weight: 600;
+        color: #2E7D32;
+        font-size: 11pt;
+        box-shadow: 0 2px 4px rgba(76, 175, 80, 0.2);
+    }
+
+    .current-score {
+        background: linear-gradient(135deg, #FFF3E0, #FFE0B2);
+        border: 2px solid #FF9800;
+        padding: 6px 10px;
+        margin: 3px 2px;
+        border-radius: 6px;
+        display: inline-block;
+        min-width: 100px;
+        text-align: center;
+        font-weight: 600;
+        color: #E65100;
+        font-size: 11pt;
+        box-shadow: 0 2px 4px rgba(255, 152, 0, 0.2);
+    }
+
+    .potential-score {
+        background: linear-gradient(135deg, #E8F5E8, #C8E6C9);
+        border: 2px solid #4CAF50;
+        padding: 6px 10px;
+        margin: 3px 2px;
+        border-radius: 6px;
+        display: inline-block;
+        min-width: 100px;
+        text-align: center;
+        font-weight: 600;
+        color: #1B5E20;
+        font-size: 11pt;
+        box-shadow: 0 2px 4px rgba(76, 175, 80, 0.2);
+    }
+
+    .page-break {
+        page-break-before: always;
+    }
+
+    .keep-together {
+        page-break-inside: avoid;
+    }
+
+    strong {
+        color: #1976D2;
+        font-weight: 600;
+    }
+
+    .elegant-border {
+        border: 1px solid #dee2e6;
+        border-radius: 4px;
+        padding: 15px;
+        margin: 12px 0;
+        background-color: #ffffff;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+    }
+
+    .section-divider {
+        border-top: 1px solid #e0e0e0;
+        margin: 20px 0;
+        padding-top: 15px;
+    }
+
+    .recommendation-box {
+        background-color: #F3E5F5;
+        border-left: 4px solid #9C27B0;
+        padding: 12px;
+        margin: 10px 0;
+        border-radius: 4px;
+        page-break-inside: avoid;
+    }
+
+    .insight-box {
+        background-color: #E8F5E8;
+        border-left: 4px solid #4CAF50;
+        padding: 12px;
+        margin: 10px 0;
+        border-radius: 4px;
+        page-break-inside: avoid;
+    }
+
+    .skills-grid {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 15px;
+        margin: 15px 0;
+    }
+
+    .skill-item {
+        background: #f8f9fa;
+        padding: 10px;
+        border-radius: 5px;
+        border-left: 3px solid #007bff;
+    }
+
+    /* Academic spacing */
+    .report-container > * {
+        margin-bottom: 14px;
+    }
+
+    /* Professional table styling */
+    table {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 15px 0;
+        font-size: 11pt;
+    }
+
+    th, td {
+        border: 1px solid #dee2e6;
+        padding: 8px 12px;
+        text-align: left;
+    }
+
+    th {
+        background-color: #f8f9fa;
+        font-weight: 600;
+        color: #1a365d;
+    }
+"""
+
+_TEMPLATES = {
+    "document.html": """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Student Insight Report - {{ student_name }}</title>
+    <link href="https://fonts.googleapis.com/css2?family=Dancing+Script:wght@400;600;700&family=Playfair+Display:wght@400;700&family=Great+Vibes&family=Cormorant+Garamond:wght@400;600&family=Crimson+Text:wght@400;600&family=Libre+Baskerville:wght@400;700&family=Cambria:wght@400;700&family=Georgia:wght@400;700&display=swap" rel="stylesheet">
+    <style>{{ css }}</style>
+</head>
+<body>
+    <div class="report-container">
+        <div class="main-title">Growth Valley Community</div>
+        <h1>AI Mentor Roundtable Report</h1>
+
+        {{ body }}
+    </div>
+</body>
+</html>""",
+
+    "macros.html": """
+{% macro info_box(student) -%}
+<div class="info-box">
+    <p><strong>Student Name:</strong> {{ student.name }}</p>
+    <p><strong>GVC ID:</strong> {{ student.gvc_id }}</p>
+    <p><strong>Class:</strong> {{ student.grade }}</p>
+    <p><strong>School:</strong> {{ student.school }}</p>
+    <p><strong>City:</strong> {{ student.city }}</p>
+</div>
+{%- endmacro %}
+
+{% macro score_boxes(scores, empty_text) -%}
+{% for score in scores %}
+<div class="keep-together" style="margin: 10px 0;">
+    <strong>{{ score.skill }}:</strong>
+    <span class="current-score">Current: {{ score.current }}</span>
+    <span style="margin: 0 5px;">→</span>
+    <span class="potential-score">Target: {{ score.potential }}</span>
+</div>
+{% else %}
+<p>{{ empty_text }}</p>
+{% endfor %}
+{%- endmacro %}
+""",
+
+    "comprehensive.html": """{% import "macros.html" as m %}
+{{ m.info_box(student) }}
+
+<h2>Highlights</h2>
+<p>{{ report.highlights }}</p>
+
+<h2>Skill Feedback</h2>
+<p>{{ report.skill_feedback }}</p>
+
+<h2>Improvements Over Time</h2>
+<p>The student has shown wonderful growth in key areas during the AI mentor roundtable session:</p>
+{{ m.score_boxes(scores, "Leadership, problem-solving, and collaboration skills show strong potential for growth through continued mentorship.") }}
+
+<h2>Next Goals</h2>
+<div class="recommendation-box">
+    <p>{{ report.next_goals }}</p>
+</div>
+
+<h2>Closing Note</h2>
+<p>{{ report.closing_note }}</p>
+
+<h2>Summary Insight</h2>
+<div class="insight-box">
+    <p>{{ report.summary_insight }}</p>
+</div>
+
+<h2>Recommended Resources</h2>
+<p>Here are some resources to inspire continued growth:</p>
+<div class="elegant-border">
+    <ul>
+    {% for label, text in resources %}
+        <li>{% if label %}<strong>{{ label }}:</strong> {% endif %}{{ text }}</li>
+    {% endfor %}
+    </ul>
+</div>
+
+<h2>Parent Feedback Prompt</h2>
+<div class="recommendation-box">
+    <p>{{ report.parent_feedback_prompt }}</p>
+</div>
+
+<h2>Mentor Final Thought</h2>
+<div class="insight-box">
+    <p><em>"{{ report.mentor_final_thought }}"</em></p>
+</div>
+""",
+
+    "content.html": """{% import "macros.html" as m %}
+{{ m.info_box(student) }}
+
+<h2>Executive Summary</h2>
+<div class="insight-box">
+    <p>{{ report.executive_summary }}</p>
+</div>
+
+<h2>Highlights</h2>
+<p>{{ report.highlights }}</p>
+
+<h2>Skill Feedback</h2>
+<p>{{ report.skill_feedback }}</p>
+
+<h2>Improvements Over Time</h2>
+{{ m.score_boxes(scores, report.improvements_over_time) }}
+
+<h2>Growth Areas</h2>
+<p>{{ report.growth_areas }}</p>
+
+<h2>Next Goals</h2>
+<div class="recommendation-box">
+    <p>{{ report.next_goals }}</p>
+</div>
+
+<h2>Action Plan</h2>
+<ul>
+{% for step in report.action_plan %}
+    <li>{{ step }}</li>
+{% endfor %}
+</ul>
+
+<h2>Conclusion</h2>
+<div class="insight-box">
+    <p>{{ report.conclusion }}</p>
+</div>
+""",
+}
+
+# Parsed and compiled once at import; autoescape keeps model text from injecting markup
+_environment = Environment(
+    loader=DictLoader(_TEMPLATES),
+    autoescape=select_autoescape(default=True, default_for_string=True),
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+DOCUMENT_TEMPLATE = _environment.get_template("document.html")
+COMPREHENSIVE_TEMPLATE = _environment.get_template("comprehensive.html")
+CONTENT_TEMPLATE = _environment.get_template("content.html")
+
+_SCORE_PATTERN = re.compile(
+    r"([A-Za-z][^:\n.]*):\s*Current(?:\s+score)?\s*\(?(\d{1,3})\)?\s*,\s*Potential(?:\s+score)?\s*\(?(\d{1,3})\)?",
+    re.IGNORECASE
+)
+_RESOURCE_LABELS = ("TED Talk", "Book", "Article")
+
+DEFAULT_RESOURCES = [
+    ("TED Talk", '"How to Build Your Creative Confidence" by David Kelley'),
+    ("Book", '"Mindset: The New Psychology of Success" by Carol Dweck'),
+    ("Article", '"The Future of Learning" from Harvard Business Review'),
+]
+
+
+def student_fields(student_data):
+    """Info box values with the report's display defaults"""
+    student_data = student_data or {}
+    return {
+        "name": student_data.get('name', 'Student'),
+        "gvc_id": student_data.get('gvc_id', 'GVC001'),
+        "grade": student_data.get('grade_level', 'N/A'),
+        "school": student_data.get('school', 'School Name'),
+        "city": student_data.get('city', 'City'),
+    }
+
+
+def parse_scores(improvements_text):
+    """Extract (skill, current, potential) rows from 'Skill: Current 65, Potential 85' text"""
+    if not isinstance(improvements_text, str):
+        return []
+    return [
+        {"skill": skill.strip(), "current": current, "potential": potential}
+        for skill, current, potential in _SCORE_PATTERN.findall(improvements_text)
+    ]
+
+
+def parse_resources(resources_text):
+    """Split 'TED Talk: ... Book: ... Article: ...' into (label, text) pairs"""
+    if not isinstance(resources_text, str) or not resources_text.strip():
+        return DEFAULT_RESOURCES
+
+    labels = "|".join(re.escape(label) for label in _RESOURCE_LABELS)
+    parts = re.split(rf"({labels})\s*:", resources_text, flags=re.IGNORECASE)
+    resources = []
+    for index in range(1, len(parts) - 1, 2):
+        text = parts[index + 1].strip().strip(".").strip()
+        if text:
+            resources.append((parts[index].strip(), text + "."))
+    return resources or DEFAULT_RESOURCES
+
+
+def _with_fallbacks(report, sections):
+    """Fill missing or empty fields from the section schema"""
+    report = report if isinstance(report, dict) else {}
+    return {name: report.get(name) or spec["fallback"] for name, spec in sections.items()}
+
+
+def render_document(student_data, body_html):
+    """Wrap an already-rendered (trusted) body in the styled document"""
+    return DOCUMENT_TEMPLATE.render(
+        student_name=student_fields(student_data)["name"],
+        css=Markup(REPORT_CSS),
+        body=Markup(body_html)
+    )
+
+
+def render_comprehensive_report(student_data, report):
+    """Styled HTML for a generate_comprehensive_report / sectioned report"""
+    report = _with_fallbacks(report, REPORT_SECTIONS)
+    body = COMPREHENSIVE_TEMPLATE.render(
+        student=student_fields(student_data),
+        report=report,
+        scores=parse_scores(report["improvements_over_time"]),
+        resources=parse_resources(report["recommended_resources"])
+    )
+    return render_document(student_data, body)
+
+
+def render_content_report(student_data, report):
+    """Styled HTML for a generate_report_content report"""
+    report = _with_fallbacks(report, CONTENT_REPORT_SECTIONS)
+    if isinstance(report["action_plan"], str):
+        report["action_plan"] = [report["action_plan"]]
+    body = CONTENT_TEMPLATE.render(
+        student=student_fields(student_data),
+        report=report,
+        scores=parse_scores(report["improvements_over_time"])
+    )
+    return render_document(student_data, body)
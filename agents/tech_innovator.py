@@ -1,6 +1,4 @@
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-import os
+from agents.base_mentor import BaseMentor
 
 TECH_INNOVATOR_SYSTEM_PROMPT = """
 You are Greg, the Tech Innovator - a passionate technology expert and mentor focused on helping students develop digital skills and innovative thinking.
@@ -29,17 +27,12 @@ EXPERTISE FOCUS AREAS:
 Stay authentic to your tech innovator persona while keeping all advice grounded in verifiable, practical guidance.
 """
 
-class TechInnovator:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model="google/gemini-2.5-flash-preview-05-20",
-            openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-            openai_api_base="https://openrouter.ai/api/v1"
-        )
+class TechInnovator(BaseMentor):
+    name = "Tech Innovator"
+    opening_message = "Begin tech discussion."
 
-    def chat(self, history, student_data, context_chunks, user_message=None):
-        system_prompt = (
+    def system_prompt(self, student_data, context_chunks):
+        return (
             f"{TECH_INNOVATOR_SYSTEM_PROMPT}\n"
             f"Here is company context:\n{context_chunks}\n"
             f"Student data: {student_data}\n"
@@ -51,13 +44,4 @@ class TechInnovator:
             "Stay short, concise and give actionable advise only. "
             "Keep your response focused, forward-thinking, and collaborative. DO NOT EXCEED 2-3 LINES. "
             "Do not give links, timestamps or platform names in the outputs."
-        )
-        messages = [SystemMessage(content=system_prompt)]
-        if user_message:
-            messages.append(HumanMessage(content=user_message))
-        elif history:
-            messages.append(HumanMessage(content=history[-1]['content']))
-        else:
-            messages.append(HumanMessage(content="Begin tech discussion."))
-        response = self.llm.invoke(messages)
-        return response.content
\ No newline at end of file
+        )
\ No newline at end of file
@@ -1,6 +1,4 @@
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-import os
+from agents.base_mentor import BaseMentor
 
 WELLNESS_COACH_SYSTEM_PROMPT = """
 You are Ana, an experienced Wellness Coach specializing in student mental health and holistic development.
@@ -35,17 +33,12 @@ EXPERTISE FOCUS AREAS:
 Remember: Exactly 2 sentences every time. Stay in character as a wellness coach but avoid any unverifiable claims.
 """
 
-class WellnessCoach:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model="google/gemini-2.5-flash-preview-05-20",
-            openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-            openai_api_base="https://openrouter.ai/api/v1"
-        )
+class WellnessCoach(BaseMentor):
+    name = "Wellness Coach"
+    opening_message = "Begin wellness discussion."
 
-    def chat(self, history, student_data, context_chunks, user_message=None):
-        system_prompt = (
+    def system_prompt(self, student_data, context_chunks):
+        return (
             f"{WELLNESS_COACH_SYSTEM_PROMPT}\n"
             f"Here is company context:\n{context_chunks}\n"
             f"Student data: {student_data}\n"
@@ -57,13 +50,4 @@ class WellnessCoach:
             "CRITICAL: Respond with exactly 2 sentences only - no more, no less. "
             "Keep your response focused, supportive, and collaborative. "
             "Do not mention specific therapy techniques, programs, or external resources."
-        )
-        messages = [SystemMessage(content=system_prompt)]
-        if user_message:
-            messages.append(HumanMessage(content=user_message))
-        elif history:
-            messages.append(HumanMessage(content=history[-1]['content']))
-        else:
-            messages.append(HumanMessage(content="Begin wellness discussion."))
-        response = self.llm.invoke(messages)
-        return response.content
\ No newline at end of file
+        )
\ No newline at end of file
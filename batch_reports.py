@@ -0,0 +1,245 @@
+"""Headless cohort report generation.
+
+Generates roundtable reports for many students at once, without the Streamlit UI:
+
+    python batch_reports.py --all --transcripts-dir transcripts/ --output-dir reports/term1
+    python batch_reports.py --ids GVC001770 GVC001772 --concurrency 4
+
+LLM work runs in threads bounded by an asyncio semaphore; PDF rendering is spread over a
+process pool. Progress is recorded in <output-dir>/manifest.json after every student, so an
+interrupted run picks up where it stopped.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents.report_generator import ReportGenerator
+from config.settings import DEFAULT_REPORT_CHUNKS, REPORT_MODE, REPORT_SECTION_PARALLEL
+from utils.pdf_renderer import render_pdf
+from utils.rate_limit import llm_priority
+from utils.usage import usage_scope
+
+logger = logging.getLogger("batch_reports")
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_CONTEXT = "GVC AI Mentor Roundtable Discussion Context"
+
+
+def load_roster(csv_path):
+    """Read the student roster as {gvc_id: student_data}"""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return {row["gvc_id"]: row for row in csv.DictReader(f) if row.get("gvc_id")}
+
+
+def load_transcript(transcripts_dir, gvc_id):
+    """Chat history saved as <transcripts_dir>/<gvc_id>.json (a list or {"chat_history": [...]})"""
+    path = os.path.join(transcripts_dir, f"{gvc_id}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("chat_history", []) if isinstance(data, dict) else data
+
+
+class Manifest:
+    """Per-student status of a batch run, rewritten atomically after each update"""
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f).get("students", {})
+
+    def is_done(self, gvc_id, input_key):
+        entry = self.entries.get(gvc_id)
+        return bool(entry) and entry.get("status") == "done" and entry.get("input_key") == input_key
+
+    def update(self, gvc_id, **entry):
+        self.entries[gvc_id] = entry
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"updated_at": time.time(), "students": self.entries}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class ProgressBar:
+    """Single-line text progress bar on stderr"""
+
+    def __init__(self, total, width=30):
+        self.total = max(total, 1)
+        self.width = width
+        self.done = 0
+        self.failed = 0
+        self.started = time.time()
+
+    def advance(self, failed=False):
+        self.done += 1
+        self.failed += int(failed)
+        self.render()
+
+    def render(self):
+        filled = int(self.width * self.done / self.total)
+        elapsed = time.time() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0
+        eta = (self.total - self.done) / rate if rate else 0
+        sys.stderr.write(
+            f"\r[{'#' * filled}{'.' * (self.width - filled)}] {self.done}/{self.total}"
+            f" failed {self.failed} | {elapsed:.0f}s elapsed, eta {eta:.0f}s "
+        )
+        sys.stderr.flush()
+
+    def close(self):
+        sys.stderr.write("\n")
+        sys.stderr.flush()
+
+
+def build_context(student_data, use_context):
+    """Company context for one student, using the same query as the roundtable page"""
+    if not use_context:
+        return DEFAULT_CONTEXT
+    try:
+        from utils.vector_store import get_context_chunks
+        query = f"student development education mentoring {student_data.get('interests', '')} {student_data.get('goals', '')}"
+        return get_context_chunks(query, k=DEFAULT_REPORT_CHUNKS)
+    except Exception as e:
+        logger.warning(f"Context retrieval unavailable: {e}")
+        return DEFAULT_CONTEXT
+
+
+def generate_report_content(generator, chat_history, student_data, use_context, sectioned):
+    """LLM part of one report (runs in a worker thread)"""
+    context_chunks = build_context(student_data, use_context)
+    with usage_scope(session_id="batch-reports", gvc_id=student_data.get("gvc_id"), agent="Report Generator"), \
+            llm_priority("batch"):
+        if sectioned:
+            report = generator.generate_sectioned_report(chat_history, student_data, context_chunks)
+        else:
+            report = generator.generate_comprehensive_report(chat_history, student_data, context_chunks)
+    return report, generator.create_enhanced_html_report(student_data, report)
+
+
+async def process_student(gvc_id, student_data, chat_history, args, generator,
+                          llm_semaphore, pdf_pool, manifest, progress):
+    input_key = generator.report_cache_key(chat_history, student_data, REPORT_MODE, args.sectioned)
+    base_path = os.path.join(args.output_dir, gvc_id)
+    loop = asyncio.get_running_loop()
+
+    try:
+        async with llm_semaphore:
+            report, html = await asyncio.to_thread(
+                generate_report_content, generator, chat_history, student_data,
+                not args.no_context, args.sectioned
+            )
+
+        files = {"json": base_path + ".json", "html": base_path + ".html"}
+        with open(files["json"], "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        with open(files["html"], "w", encoding="utf-8") as f:
+            f.write(html)
+
+        if pdf_pool is not None:
+            pdf_bytes = await loop.run_in_executor(pdf_pool, render_pdf, html)
+            files["pdf"] = base_path + ".pdf"
+            with open(files["pdf"], "wb") as f:
+                f.write(pdf_bytes)
+
+        manifest.update(gvc_id, status="done", input_key=input_key,
+                        messages=len(chat_history), files=files, finished_at=time.time())
+        progress.advance()
+    except Exception as e:
+        logger.error(f"{gvc_id}: report failed: {e}")
+        manifest.update(gvc_id, status="failed", input_key=input_key, error=str(e), finished_at=time.time())
+        progress.advance(failed=True)
+
+
+async def run_batch(args):
+    roster = load_roster(args.students)
+    gvc_ids = sorted(roster) if args.all else args.ids
+    unknown = [gvc_id for gvc_id in gvc_ids if gvc_id not in roster]
+    if unknown:
+        logger.warning(f"Unknown GVC IDs skipped: {', '.join(unknown)}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = Manifest(args.output_dir)
+    generator = ReportGenerator()
+
+    jobs = []
+    skipped = 0
+    for gvc_id in gvc_ids:
+        if gvc_id not in roster:
+            continue
+        student_data = roster[gvc_id]
+        chat_history = []
+        if args.transcripts_dir:
+            chat_history = load_transcript(args.transcripts_dir, gvc_id)
+            if chat_history is None:
+                logger.info(f"{gvc_id}: no transcript, skipped")
+                skipped += 1
+                continue
+        input_key = generator.report_cache_key(chat_history, student_data, REPORT_MODE, args.sectioned)
+        if not args.force and manifest.is_done(gvc_id, input_key):
+            skipped += 1
+            continue
+        jobs.append((gvc_id, student_data, chat_history))
+
+    print(f"{len(jobs)} reports to generate, {skipped} skipped (done or no transcript)", file=sys.stderr)
+    if not jobs:
+        return 0
+
+    llm_semaphore = asyncio.Semaphore(args.concurrency)
+    progress = ProgressBar(len(jobs))
+    progress.render()
+    pdf_pool = None if args.no_pdf else ProcessPoolExecutor(max_workers=args.pdf_workers)
+    try:
+        await asyncio.gather(*(
+            process_student(gvc_id, student_data, chat_history, args, generator,
+                            llm_semaphore, pdf_pool, manifest, progress)
+            for gvc_id, student_data, chat_history in jobs
+        ))
+    finally:
+        progress.close()
+        if pdf_pool is not None:
+            pdf_pool.shutdown()
+
+    print(f"Finished: {progress.done - progress.failed} generated, {progress.failed} failed. "
+          f"Manifest: {manifest.path}", file=sys.stderr)
+    return 1 if progress.failed else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate roundtable reports for a cohort of students")
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--ids", nargs="+", help="GVC IDs to generate reports for")
+    selection.add_argument("--all", action="store_true", help="generate reports for every student in the roster")
+    parser.add_argument("--students", default="data/students.csv", help="student roster CSV")
+    parser.add_argument("--transcripts-dir", help="directory of <gvc_id>.json chat histories; students without one are skipped")
+    parser.add_argument("--output-dir", default="reports", help="where reports and manifest.json are written")
+    parser.add_argument("--concurrency", type=int, default=8, help="maximum reports in the LLM stage at once")
+    parser.add_argument("--pdf-workers", type=int, default=os.cpu_count() or 2, help="processes used for PDF rendering")
+    parser.add_argument("--sectioned", action="store_true", default=REPORT_SECTION_PARALLEL,
+                        help="generate each report section with its own prompt")
+    parser.add_argument("--no-pdf", action="store_true", help="write JSON and HTML only")
+    parser.add_argument("--no-context", action="store_true", help="skip vector store retrieval")
+    parser.add_argument("--force", action="store_true", help="regenerate reports already marked done")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    return asyncio.run(run_batch(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
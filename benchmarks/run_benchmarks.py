@@ -0,0 +1,388 @@
+"""Benchmarks for the roundtable hot paths.
+
+Runs against the local stub LLM server (started in-process unless LLM_API_BASE is already set)
+and writes timings to JSON for regression comparison:
+
+    python -m benchmarks.run_benchmarks --output benchmarks/results/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/baseline.json --only selection
+    python -m benchmarks.run_benchmarks --quick
+
+Benchmarks whose dependencies are missing are reported as skipped rather than failing the run.
+"""
+import argparse
+import csv
+import fnmatch
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger("benchmarks")
+
+BENCHMARKS = []
+
+MENTOR_LINES = [
+    "The student's curiosity about coding is a strength worth building on with a small weekly project.",
+    "Their stress around exams suggests a simple study schedule and short mindfulness breaks would help.",
+    "Leading a school club would give them practical experience in communication and teamwork.",
+    "Budgeting a small allowance is a practical way to start building financial habits early.",
+    "Exploring internships or job shadowing would make their career interests much more concrete.",
+    "Creative hobbies like design can complement their academic goals and build a portfolio.",
+]
+
+
+def benchmark(name, params=(None,), group=None):
+    """Register ``setup(param, ctx) -> callable``; the callable is what gets timed"""
+    def register(setup):
+        for param in params:
+            BENCHMARKS.append({
+                "name": name if param is None else f"{name}[{param}]",
+                "group": group or name.split(".")[0],
+                "param": param,
+                "setup": setup,
+            })
+        return setup
+    return register
+
+
+def measure(fn, rounds, warmup=1, max_seconds=None):
+    """Time ``fn`` over several rounds and summarize in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+        if max_seconds and time.perf_counter() - started > max_seconds:
+            break
+    timings.sort()
+    return {
+        "rounds": len(timings),
+        "min_ms": timings[0],
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.fmean(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "max_ms": timings[-1],
+    }
+
+
+# ----------------------------------------------------------------------
+# Synthetic data
+# ----------------------------------------------------------------------
+
+def synthetic_student(i=0):
+    return {
+        "gvc_id": f"GVC{i:06d}",
+        "name": f"Student {i}",
+        "age": 14 + i % 5,
+        "grade_level": f"Grade {9 + i % 4}",
+        "email": f"student{i}@school.edu",
+        "interests": random.choice(["coding, robotics", "art, design", "biology, sustainability", "music, writing"]),
+        "goals": "Study engineering and start a community project",
+        "challenges": "Time management and exam stress",
+        "strengths": "Curiosity, teamwork",
+    }
+
+
+def synthetic_history(length, agent_order):
+    history = []
+    for i in range(length):
+        if i % 6 == 5:
+            history.append({"role": "User", "content": "How should I balance my studies with my side projects?"})
+        else:
+            history.append({"role": agent_order[i % len(agent_order)], "content": random.choice(MENTOR_LINES)})
+    return history
+
+
+def write_roster(path, rows):
+    students = [synthetic_student(i) for i in range(rows)]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(students[0]))
+        writer.writeheader()
+        writer.writerows(students)
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+def _orchestrator(ctx):
+    if "orchestrator" not in ctx:
+        from agents.agent_orchestrator import AgentOrchestrator
+        ctx["orchestrator"] = AgentOrchestrator()
+    return ctx["orchestrator"]
+
+
+def _engine(ctx, history_length=0):
+    from core.roundtable_engine import RoundtableEngine
+    from core.session_state import SessionState
+    orchestrator = _orchestrator(ctx)
+    state = SessionState(
+        student_data=synthetic_student(),
+        chat_history=synthetic_history(history_length, orchestrator.agent_order)
+    )
+    return RoundtableEngine(orchestrator, state=state, context_fn=lambda query, k=3: "Synthetic company context.")
+
+
+@benchmark("turn.take_turn", group="turn")
+def bench_take_turn(param, ctx):
+    """Full agent turn (what process_agent_turn drives): selection, context, generation, completion"""
+    engine = _engine(ctx)
+
+    def run():
+        engine.state.chat_running = True
+        engine.state.consecutive_agent_turns = 0
+        engine.take_turn()
+    return run
+
+
+@benchmark("turn.generate_message", group="turn")
+def bench_generate_message(param, ctx):
+    """Message generation alone (what generate_enhanced_agent_message wraps)"""
+    engine = _engine(ctx, history_length=12)
+
+    def run():
+        engine.state.current_agent = engine.select_agent()
+        engine.generate_message("Synthetic company context.")
+    return run
+
+
+@benchmark("selection.intelligent_agent_selection", params=(10, 100, 1000), group="selection")
+def bench_agent_selection(history_length, ctx):
+    orchestrator = _orchestrator(ctx)
+    history = synthetic_history(history_length, orchestrator.agent_order)
+    return lambda: orchestrator.intelligent_agent_selection(history)
+
+
+@benchmark("selection.intelligent_agent_selection_llm", params=(10, 100), group="selection")
+def bench_agent_selection_llm(history_length, ctx):
+    """Selection for a student message, which asks the LLM to pick among candidates"""
+    orchestrator = _orchestrator(ctx)
+    history = synthetic_history(history_length, orchestrator.agent_order)
+    return lambda: orchestrator.intelligent_agent_selection(history, "What should I focus on this term?")
+
+
+@benchmark("selection.relevance_score", params=(10, 100, 1000), group="selection")
+def bench_relevance_score(history_length, ctx):
+    orchestrator = _orchestrator(ctx)
+    content = " ".join(random.choice(MENTOR_LINES) for _ in range(history_length))
+    return lambda: [orchestrator._calculate_relevance_score(agent, content) for agent in orchestrator.agent_order]
+
+
+@benchmark("similarity.check_message_similarity", params=(3, 30, 300), group="similarity")
+def bench_similarity(history_size, ctx):
+    from core.roundtable_engine import RoundtableEngine
+    from core.session_state import SessionState
+    state = SessionState()
+    state.agent_message_history["Career Guide"] = [random.choice(MENTOR_LINES) + f" ({i})" for i in range(history_size)]
+    engine = RoundtableEngine(None, state=state)
+    message = "Completely different advice about learning a new instrument with friends every weekend."
+    return lambda: engine.check_message_similarity(message, "Career Guide")
+
+
+@benchmark("context.get_context_chunks", params=(1000, 10000), group="context")
+def bench_context_chunks(documents, ctx):
+    """Retrieval from a synthetic in-memory Chroma collection with deterministic embeddings"""
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+    from langchain_community.vectorstores import Chroma
+    from utils.vector_store import get_context_chunks
+
+    texts = [f"{random.choice(MENTOR_LINES)} Policy note {i}." for i in range(documents)]
+    vectordb = Chroma.from_texts(
+        texts, DeterministicFakeEmbedding(size=384), collection_name=f"bench_{documents}_{int(time.time())}"
+    )
+    return lambda: get_context_chunks("student development education mentoring coding", k=3, vectordb=vectordb)
+
+
+@benchmark("students.lookup", params=(1000, 10000, 100000), group="students")
+def bench_student_lookup(rows, ctx):
+    manager = _student_manager(rows, ctx)
+    target = f"GVC{rows // 2:06d}"
+    return lambda: manager.get_student_by_gvc_id(target)
+
+
+@benchmark("students.search", params=(1000, 10000, 100000), group="students")
+def bench_student_search(rows, ctx):
+    manager = _student_manager(rows, ctx)
+    return lambda: manager.search_students("Student 12")
+
+
+def _student_manager(rows, ctx):
+    from backend.data_manager import StudentDataManager
+    path = os.path.join(ctx["tmpdir"], f"students_{rows}.csv")
+    if not os.path.exists(path):
+        write_roster(path, rows)
+    # load_students_data is cached without regard to the instance, so reset it for each roster size
+    StudentDataManager.load_students_data.clear()
+    manager = StudentDataManager(csv_path=path)
+    manager.load_students_data()
+    return manager
+
+
+@benchmark("avatars.roundtable_html", group="avatars")
+def bench_avatar_html(param, ctx):
+    from config.settings import AGENTS_INFO
+    from core.avatar_manager import create_roundtable_avatar_html
+    names = [agent["name"] for agent in AGENTS_INFO]
+    return lambda: [create_roundtable_avatar_html(name, (i * 10, i * 10), is_active=i == 0) for i, name in enumerate(names)]
+
+
+@benchmark("report.html", group="report")
+def bench_report_html(param, ctx):
+    from agents.report_generator import ReportGenerator
+    from agents.report_sections import REPORT_SECTIONS
+    generator = ReportGenerator()
+    report = {name: spec["fallback"] for name, spec in REPORT_SECTIONS.items()}
+    student = synthetic_student()
+    ctx["report_html"] = generator.create_enhanced_html_report(student, report)
+    return lambda: generator.create_enhanced_html_report(student, report)
+
+
+@benchmark("report.pdf", group="report")
+def bench_report_pdf(param, ctx):
+    from agents.report_generator import ReportGenerator
+    from agents.report_sections import REPORT_SECTIONS
+    generator = ReportGenerator()
+    report = {name: spec["fallback"] for name, spec in REPORT_SECTIONS.items()}
+    html = generator.create_enhanced_html_report(synthetic_student(), report)
+    return lambda: generator.generate_pdf(html)
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def start_stub_server(args):
+    """Run stub_llm_server in a background thread and point the app at it"""
+    from stub_llm_server import LatencyModel, StubConfig, make_server
+    config = StubConfig(
+        latency=LatencyModel(args.stub_latency),
+        tokens_per_sec=args.stub_tokens_per_sec,
+        error_rate=0.0,
+        error_codes=[500],
+    )
+    server = make_server("127.0.0.1", 0, config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["LLM_API_BASE"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ.setdefault("LLM_API_KEY", "stub")
+    # Time the code paths, not the production provider's quota: no local rate limit (120 rpm would
+    # throttle the loops), no hedge model racing each call, and no breaker tripping on stub errors
+    os.environ["LLM_REQUESTS_PER_MINUTE"] = "0"
+    os.environ["LLM_TOKENS_PER_MINUTE"] = "0"
+    os.environ["LLM_HEDGE_MODEL"] = ""
+    os.environ["LLM_CIRCUIT_BREAKER"] = "0"
+    return server
+
+
+def run_benchmarks(selected, args):
+    results = {}
+    ctx = {"tmpdir": tempfile.mkdtemp(prefix="gvc_bench_")}
+    for bench in selected:
+        name = bench["name"]
+        sys.stderr.write(f"{name:<55}")
+        sys.stderr.flush()
+        try:
+            fn = bench["setup"](bench["param"], ctx)
+            stats = measure(fn, rounds=args.rounds, warmup=args.warmup, max_seconds=args.max_seconds)
+            results[name] = {"group": bench["group"], "status": "ok", **stats}
+            sys.stderr.write(f"median {stats['median_ms']:10.3f} ms  p95 {stats['p95_ms']:10.3f} ms\n")
+        except ImportError as e:
+            results[name] = {"group": bench["group"], "status": "skipped", "reason": str(e)}
+            sys.stderr.write(f"skipped ({e})\n")
+        except Exception as e:
+            logger.debug("Benchmark failed", exc_info=True)
+            results[name] = {"group": bench["group"], "status": "error", "reason": f"{type(e).__name__}: {e}"}
+            sys.stderr.write(f"error ({type(e).__name__}: {e})\n")
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print median changes against a previous run; returns names that regressed past threshold"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    print(f"\n{'benchmark':<55}{'baseline':>12}{'current':>12}{'change':>10}", file=sys.stderr)
+    for name, current in results.items():
+        previous = baseline.get(name, {})
+        if current.get("status") != "ok" or previous.get("status") != "ok":
+            continue
+        change = (current["median_ms"] - previous["median_ms"]) / previous["median_ms"] if previous["median_ms"] else 0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<55}{previous['median_ms']:>10.3f}ms{current['median_ms']:>10.3f}ms{change:>+9.1%}{flag}",
+              file=sys.stderr)
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the roundtable hot paths")
+    parser.add_argument("--output", default="benchmarks/results/latest.json", help="where timings are written")
+    parser.add_argument("--compare", help="previous results JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="median slowdown reported as a regression")
+    parser.add_argument("--only", nargs="+", help="glob patterns or groups to run, e.g. selection 'students.*'")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--max-seconds", type=float, default=20.0, help="time budget per benchmark")
+    parser.add_argument("--quick", action="store_true", help="3 rounds, smallest sizes only")
+    parser.add_argument("--stub-latency", default="fixed:0", help="stub server time-to-first-token distribution")
+    parser.add_argument("--stub-tokens-per-sec", type=float, default=100000.0, help="stub server generation speed")
+    parser.add_argument("--seed", type=int, default=1234)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    random.seed(args.seed)
+    if args.quick:
+        args.rounds, args.warmup = 3, 1
+
+    selected = BENCHMARKS
+    if args.only:
+        selected = [b for b in selected if any(
+            b["group"] == pattern or fnmatch.fnmatch(b["name"], pattern) for pattern in args.only
+        )]
+    if args.quick:
+        first_params = {}
+        for b in selected:
+            first_params.setdefault(b["setup"], b["param"])
+        selected = [b for b in selected if b["param"] == first_params[b["setup"]]]
+
+    server = None if os.getenv("LLM_API_BASE") else start_stub_server(args)
+    try:
+        results = run_benchmarks(selected, args)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "created_at": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "llm_api_base": os.getenv("LLM_API_BASE"),
+            "rounds": args.rounds,
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
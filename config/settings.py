@@ -35,6 +35,32 @@ ROUNDTABLE_CENTER = (150, 150)
 AVATAR_SIZE_ROUNDTABLE = (40, 40)
 AVATAR_SIZE_CHAT = (60, 60)
 
+# LLM provider (any OpenAI-compatible endpoint; LLM_API_BASE / LLM_MODEL / LLM_API_KEY env vars override)
+LLM_API_BASE = "https://openrouter.ai/api/v1"
+LLM_MODEL = "google/gemini-2.5-flash-preview-05-20"
+LLM_REQUEST_TIMEOUT = 60  # seconds; hard cap on any single HTTP request
+
+# Local CPU backend: llama.cpp with a quantized GGUF model (optional: pip install llama-cpp-python).
+# Agents listed here (or in the LLM_LOCAL_AGENTS env var, comma-separated, "*" for all) are served
+# locally; everyone else uses the remote provider. "Orchestrator" covers speaker selection.
+LLM_BACKENDS = {}  # e.g. {"Wellness Coach": "local", "Orchestrator": "local"}
+LOCAL_MODEL_PATH = "models/qwen2.5-1.5b-instruct-q4_k_m.gguf"
+LOCAL_MODEL_CONTEXT = 4096
+LOCAL_MODEL_THREADS = None  # None lets llama.cpp use every physical core
+LOCAL_MODEL_MAX_TOKENS = 160  # mentor replies are two sentences
+
+# Hedged requests: when the primary model is slow to start answering, the same request also goes
+# to the hedge model (optionally on another provider) and the first to answer wins
+LLM_HEDGE_MODEL = "google/gemini-2.0-flash-lite-001"  # None disables hedging
+LLM_HEDGE_API_BASE = None  # None uses LLM_API_BASE
+LLM_HEDGE_PERCENTILE = 0.9  # hedge once the primary is slower than this share of its recent calls
+LLM_HEDGE_MIN_SAMPLES = 20  # calls observed before the percentile is trusted
+LLM_HEDGE_DEFAULT_DELAY = 4.0  # seconds, used until then
+LLM_DEADLINES = {  # seconds each call site allows a model to start answering
+    "mentor_reply": 15.0,
+    "agent_selection": 5.0,
+}
+
 # File paths and data settings
 VECTOR_STORE_PATH = "company_knowledge"
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
@@ -44,10 +70,87 @@ SIMILARITY_THRESHOLD = 0.7
 MAX_MESSAGE_ATTEMPTS = 3
 STREAMING_DELAY = 0.05  # seconds between words during streaming
 AGENT_TURN_DELAY = 1.0  # seconds between agent turns
+TURN_TIMEOUT = 30  # seconds a generating turn may run before the roundtable stops waiting on it
+CANCEL_PROBE_INTERVAL = 0.25  # seconds between checks whether a generation's requester is still there
+STREAM_VALIDATION = True  # check mentor replies while they stream and stop bad ones early
+STREAM_MAX_SENTENCES = 2  # replies are cut at the end of this many sentences
+STREAM_SIMILARITY_PREFIX_WORDS = 8  # opening words compared against the agent's earlier messages
+PANEL_BATCH_MODE = False  # autonomous rounds write the next few mentors' replies in one LLM call
+PANEL_BATCH_SIZE = 3  # mentors per batched call
+
+# Conversation memory settings
+SUMMARY_INTERVAL = 6  # fold older messages into the running summary every N messages
+SUMMARY_RECENT_WINDOW = 6  # most recent messages always passed verbatim
+SUMMARY_MAX_WORDS = 150
+SUMMARY_MESSAGE_CHARS = 300  # per-message cap inside the recent window
 
 # Report settings
 DEFAULT_REPORT_CHUNKS = 5
-MAX_CHAT_HISTORY_FOR_REPORT = 50
+MAX_CHAT_HISTORY_FOR_REPORT = 50  # longer transcripts are summarized map-reduce style
+REPORT_MODE = "auto"  # "auto", "single" or "map_reduce"
+REPORT_MAP_CHUNK_SIZE = 20  # messages per map-step chunk
+REPORT_MAP_CONCURRENCY = 8  # parallel chunk summaries
+REPORT_STUDENT_MESSAGES = 20  # latest student messages given to the sections that assess the student
+REPORT_SECTION_PARALLEL = False  # generate each report section with its own small prompt
+REPORT_SECTION_CONCURRENCY = 9
+REPORT_SECTION_RETRIES = 1  # extra attempts for sections that fail validation
+REPORT_SECTION_CACHE_SIZE = 512
+REPORT_JSON_MODE = True  # request response_format=json_object from the provider
+REPORT_HTML_USE_LLM = False  # legacy LLM HTML-formatting pass; templates are used otherwise
+
+# PDF rendering
+PDF_RENDER_WORKERS = 2  # concurrent wkhtmltopdf renders across all sessions
+PDF_RENDER_TIMEOUT = 60  # seconds
+REPORT_FONT_FILES = {  # family -> {weight: file}; local copies of the report template's Google Fonts
+    "Crimson Text": {400: "assets/fonts/CrimsonText-Regular.ttf", 600: "assets/fonts/CrimsonText-SemiBold.ttf"},
+    "Libre Baskerville": {400: "assets/fonts/LibreBaskerville-Regular.ttf", 700: "assets/fonts/LibreBaskerville-Bold.ttf"},
+    "Great Vibes": {400: "assets/fonts/GreatVibes-Regular.ttf"},
+    "Dancing Script": {400: "assets/fonts/DancingScript-Regular.ttf", 600: "assets/fonts/DancingScript-SemiBold.ttf"},
+    "Playfair Display": {400: "assets/fonts/PlayfairDisplay-Regular.ttf", 700: "assets/fonts/PlayfairDisplay-Bold.ttf"},
+    "Cormorant Garamond": {400: "assets/fonts/CormorantGaramond-Regular.ttf", 600: "assets/fonts/CormorantGaramond-SemiBold.ttf"},
+}
+
+# Background report jobs
+REPORT_JOB_WORKERS = 4  # reports generated concurrently across all sessions
+REPORT_JOB_HISTORY = 200  # finished jobs kept for polling
+REPORT_JOB_POLL_SECONDS = 1.0
+REPORT_ARTIFACTS_PER_SESSION = 5  # finished reports kept in each session
+REPORT_ARTIFACT_CACHE_BYTES = 200 * 1024 * 1024  # report JSON/HTML/PDF cache shared across sessions
+
+# Session persistence
+SESSION_STORE_DIR = "sessions"  # append-only transcript per session; None keeps transcripts in memory only
+SESSION_FSYNC_INTERVAL = 1.0  # seconds between batched fsyncs of transcript writes
+SESSION_MAX_OPEN_FILES = 64  # transcript files kept open for appending
+SESSION_RESUME_MESSAGES = 100  # most recent messages held in memory; older ones stay on disk
+SESSION_ARCHIVE_DAYS = 14  # transcripts idle this long are compacted and gzipped into the archive
+
+# Tracing
+TRACING_ENABLED = True
+TRACE_BUFFER_SIZE = 5000  # most recent spans kept in memory across all sessions
+TRACE_EXPORT_PATH = None  # e.g. "logs/traces.jsonl" to append every finished span
+SHOW_PERFORMANCE_PANEL = True  # per-stage latency panel in the roundtable sidebar
+
+# Token usage and budgets
+USAGE_LOG_PATH = "logs/usage.jsonl"  # every LLM call appended here; None disables the log
+MODEL_PRICES = {  # USD per million (prompt, completion) tokens
+    "google/gemini-2.5-flash-preview-05-20": (0.15, 0.60),
+    "google/gemini-2.0-flash-lite-001": (0.075, 0.30),
+}
+SESSION_TOKEN_BUDGET = 300_000  # per session; None disables budgets
+BUDGET_RETRY_CUTOFF = 0.8  # fraction of the budget after which similarity retries are skipped
+BUDGET_FALLBACK_MODEL = "google/gemini-2.0-flash-lite-001"  # used once a session exceeds its budget
+
+# Outbound LLM rate limiting, per provider (shared by every session in the process; None disables a limit)
+LLM_REQUESTS_PER_MINUTE = 120
+LLM_TOKENS_PER_MINUTE = 400_000
+LLM_RATE_BURST_SECONDS = 10  # bucket size, in seconds of the per-minute rate
+LLM_EXPECTED_COMPLETION_TOKENS = 200  # reserved per call until actual usage is known
+LLM_QUEUE_TIMEOUT = 120  # seconds a call may wait for capacity before failing
+
+# Circuit breaker per LLM provider
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive provider failures that open the circuit
+CIRCUIT_COOLDOWN = 15  # seconds between recovery probes while open
+CIRCUIT_PROBE_TIMEOUT = 5  # seconds
 
 # Student data default values
 DEFAULT_STUDENT_NAME = "Ajay"
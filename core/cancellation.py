@@ -0,0 +1,91 @@
+"""Cancellation of a session's in-flight mentor generations.
+
+Each generation runs under a ``CancellationToken`` registered for its session. Pause, stop and
+student interrupts cancel the session's token. The token is a call guard of the generation's LLM
+requests (see ``utils.rate_limit.llm_call_guard``), so a cancelled request is never sent and one
+waiting in the rate-limit queue or for its first token raises ``GenerationCancelled``; once
+tokens flow, the generation loop checks it between them and closes the stream, which closes the
+underlying HTTP response instead of letting the reply finish and be thrown away.
+
+A token can also carry an ``alive`` probe, so a generation notices on its own when the Streamlit
+run that started it has been superseded or the browser tab is gone.
+"""
+import logging
+import threading
+import time
+
+from config.settings import CANCEL_PROBE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationCancelled(Exception):
+    """Raised inside a generation whose token was cancelled"""
+
+
+class CancellationToken:
+    def __init__(self, alive=None, probe_interval=CANCEL_PROBE_INTERVAL):
+        self.reason = None
+        self._event = threading.Event()
+        self._alive = alive
+        self._probe_interval = probe_interval
+        self._last_probe = 0.0
+
+    def cancel(self, reason="cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self):
+        if self._event.is_set():
+            return True
+        if self._alive is not None:
+            now = time.monotonic()
+            if now - self._last_probe >= self._probe_interval:
+                self._last_probe = now
+                if not self._alive():
+                    self.cancel("session_gone")
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise GenerationCancelled(self.reason)
+
+
+class CancellationRegistry:
+    """Process-wide map of session id -> token of its current generation"""
+
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def begin(self, session_id, alive=None):
+        """Token for a new generation; a generation still registered for the session is superseded"""
+        token = CancellationToken(alive)
+        if session_id is None:
+            return token
+        with self._lock:
+            previous = self._tokens.get(session_id)
+            self._tokens[session_id] = token
+        if previous is not None:
+            previous.cancel("superseded")
+        return token
+
+    def finish(self, session_id, token):
+        with self._lock:
+            if self._tokens.get(session_id) is token:
+                del self._tokens[session_id]
+
+    def cancel(self, session_id, reason="cancelled"):
+        """Cancel the session's in-flight generation; returns True if there was one"""
+        with self._lock:
+            token = self._tokens.pop(session_id, None)
+        if token is None:
+            return False
+        token.cancel(reason)
+        logger.info(f"Cancelled generation for session {session_id}: {reason}")
+        return True
+
+
+cancellations = CancellationRegistry()
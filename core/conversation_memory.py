@@ -0,0 +1,156 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.schema import HumanMessage, SystemMessage
+
+from config.settings import (
+    SUMMARY_INTERVAL,
+    SUMMARY_RECENT_WINDOW,
+    SUMMARY_MAX_WORDS,
+    SUMMARY_MESSAGE_CHARS
+)
+from utils.rate_limit import detached_call_guards, llm_priority
+
+logger = logging.getLogger(__name__)
+
+# Shared across sessions - summaries are short, infrequent calls
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="conversation-summary")
+
+SUMMARY_SYSTEM_PROMPT = f"""You maintain the running summary of a mentor roundtable about a student.
+Merge the previous summary with the new messages into one compact summary of at most {SUMMARY_MAX_WORDS} words.
+Keep: the student's questions and concerns, each mentor's key recommendation, agreements, open threads.
+Drop: greetings, repetition, filler. Write plain prose, no bullet symbols, no headings."""
+
+
+class ConversationMemory:
+    """Rolling summary of older messages plus a fixed window of recent ones.
+
+    Older messages are compressed in the background every ``interval`` messages,
+    so prompts built from ``render`` stay the same size however long the session runs.
+    Positions are counted from the start of the session; when the caller drops messages from the
+    front of its history it reports them to ``dropped_front`` so the two stay aligned.
+    """
+
+    def __init__(self, interval=SUMMARY_INTERVAL, recent_window=SUMMARY_RECENT_WINDOW):
+        self.interval = interval
+        self.recent_window = recent_window
+        self.summary = ""
+        self.summarized_count = 0  # number of leading messages folded into the summary
+        self.dropped_count = 0  # leading messages no longer in the caller's history
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget the summary, e.g. after the chat is cleared"""
+        with self._lock:
+            self.summary = ""
+            self.summarized_count = 0
+            self.dropped_count = 0
+            self._pending = None
+
+    def dropped_front(self, count):
+        """``count`` more messages were removed from the front of the history (kept in the session store)"""
+        with self._lock:
+            self.dropped_count += count
+
+    def _summarized_index(self, chat_history):
+        """Index in ``chat_history`` of the first message not folded into the summary, or None if
+        the history no longer lines up with it (it was cleared)"""
+        if len(chat_history) + self.dropped_count < self.summarized_count:
+            return None
+        return max(0, self.summarized_count - self.dropped_count)
+
+    def maybe_schedule_update(self, chat_history, llm):
+        """Start a background summary update once enough messages fell out of the recent window"""
+        if not chat_history:
+            return False
+
+        with self._lock:
+            # History was cleared underneath us - start over
+            if self._summarized_index(chat_history) is None:
+                self.summary = ""
+                self.summarized_count = 0
+                self.dropped_count = 0
+
+            if self._pending is not None and not self._pending.done():
+                return False
+
+            cutoff = len(chat_history) - self.recent_window
+            start = self._summarized_index(chat_history)
+            if cutoff - start < self.interval:
+                return False
+
+            new_messages = list(chat_history[start:cutoff])
+            # Carry the caller's usage attribution into the worker thread
+            context = contextvars.copy_context()
+            self._pending = _summary_executor.submit(
+                context.run, self._summarize, llm, self.summary, new_messages, self.summarized_count,
+                cutoff + self.dropped_count
+            )
+            return True
+
+    def _summarize(self, llm, previous_summary, new_messages, start, cutoff):
+        """Compress new_messages into the running summary (runs on the executor)"""
+        transcript = "\n".join(
+            f"{m.get('role', 'Unknown')}: {m.get('content', '')}"
+            for m in new_messages if m.get('content')
+        )
+        messages = [
+            SystemMessage(content=SUMMARY_SYSTEM_PROMPT),
+            HumanMessage(content=(
+                f"Previous summary:\n{previous_summary or 'None yet.'}\n\n"
+                f"New messages:\n{transcript}\n\n"
+                "Updated summary:"
+            ))
+        ]
+
+        try:
+            # Background upkeep never holds up a mentor reply, and outlives one that is cancelled
+            with llm_priority("batch"), detached_call_guards():
+                response = llm.invoke(messages)
+            summary = response.content.strip()
+        except Exception as e:
+            logger.warning(f"Conversation summary update failed: {e}")
+            return
+
+        with self._lock:
+            # Ignore results that a reset made stale
+            if self.summarized_count != start:
+                return
+            self.summary = summary
+            self.summarized_count = cutoff
+            logger.info(f"Conversation summary now covers {cutoff} messages")
+
+    def get_recent_window(self, chat_history):
+        """Messages not covered by the summary, bounded so prompt size stays fixed"""
+        if not chat_history:
+            return []
+        summarized = self._summarized_index(chat_history) or 0
+        max_window = self.recent_window + self.interval
+        start = max(summarized, len(chat_history) - max_window)
+        return chat_history[start:]
+
+    def render(self, chat_history, message_chars=SUMMARY_MESSAGE_CHARS):
+        """Format summary plus recent window for inclusion in a prompt"""
+        if not chat_history:
+            return "No prior conversation"
+
+        parts = []
+        if self.summary and self._summarized_index(chat_history) is not None:
+            parts.append(f"Earlier discussion (summary): {self.summary}")
+
+        recent_lines = []
+        for msg in self.get_recent_window(chat_history):
+            content = msg.get('content', '')
+            if not content:
+                continue
+            if len(content) > message_chars:
+                content = content[:message_chars] + "..."
+            recent_lines.append(f"{msg.get('role', 'Unknown')}: {content}")
+
+        if recent_lines:
+            parts.append("Recent messages:\n" + "\n".join(recent_lines))
+
+        return "\n\n".join(parts) if parts else "No prior conversation"
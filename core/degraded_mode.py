@@ -0,0 +1,88 @@
+"""Mentor replies served without an LLM while the provider's circuit is open.
+
+Replies keep the roundtable's two-sentence shape: an observation grounded in the retrieved company
+context when retrieval returned any, then one of the mentor's stock recommendations, rotated so
+consecutive turns do not repeat.
+"""
+import re
+
+# Mentor -> (area of focus, stock recommendations)
+MENTOR_TEMPLATES = {
+    "Academic Mentor": ("academic", [
+        "A weekly study plan with one review session per subject would give them a steady base to build on.",
+        "Practising retrieval with short self-quizzes after each class would make their learning stick.",
+    ]),
+    "Career Guide": ("career", [
+        "Exploring two or three careers through short conversations with people in those fields would sharpen their direction.",
+        "Starting a simple record of projects and achievements now would make later applications much easier.",
+    ]),
+    "Tech Innovator": ("technology", [
+        "Building one small project end to end would turn their curiosity into practical skill.",
+        "Spending a few hours a week learning a programming fundamental would open many doors later.",
+    ]),
+    "Wellness Coach": ("wellbeing", [
+        "A consistent sleep schedule and short daily movement breaks would support everything else they are working on.",
+        "Setting aside a few minutes each day to wind down would help them manage pressure sustainably.",
+    ]),
+    "Life Skills Mentor": ("life skills", [
+        "Taking ownership of one household routine would build independence and time management together.",
+        "Keeping a simple weekly planner would help them balance commitments without last-minute stress.",
+    ]),
+    "Creative Mentor": ("creative", [
+        "A small creative project with a clear finish date would give their ideas a place to grow.",
+        "Keeping an idea journal and revisiting it weekly would help them develop their creative voice.",
+    ]),
+    "Leadership Coach": ("leadership", [
+        "Volunteering to organise one group activity would let them practise leadership in a low-stakes setting.",
+        "Asking teammates for feedback after group work would help them grow as a collaborator and leader.",
+    ]),
+    "Financial Advisor": ("financial", [
+        "Tracking their spending for a month would be a practical first step towards good money habits.",
+        "Setting one small savings goal would teach them planning and patience with money.",
+    ]),
+    "Communication Expert": ("communication", [
+        "Practising a short presentation for family or friends would build their confidence in speaking.",
+        "Summarising what they read in a few sentences each day would sharpen their clarity of expression.",
+    ]),
+    "Global Perspective Mentor": ("global perspective", [
+        "Following one international news story each week would broaden their understanding of the world.",
+        "Connecting with peers from different backgrounds would help them see problems from new angles.",
+    ]),
+}
+DEFAULT_TEMPLATE = ("overall development", [
+    "Choosing one concrete goal for the coming month would give them clear momentum.",
+])
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+
+
+def _grounding(context_chunks, max_words=30):
+    """First sentence of the retrieved context, or None if retrieval returned nothing usable"""
+    if not isinstance(context_chunks, str) or not context_chunks.startswith("📚"):
+        return None
+    parts = context_chunks.split("\n\n", 1)
+    if len(parts) < 2 or not parts[1].strip():
+        return None
+    sentence = SENTENCE_END.split(parts[1].strip(), 1)[0].strip().rstrip(".!?")
+    words = sentence.split()
+    if len(words) < 4:
+        return None
+    return " ".join(words[:max_words])
+
+
+def _student_name(student_data):
+    if not isinstance(student_data, dict):
+        return "the student"
+    return (student_data.get('personal_info') or {}).get('name') or student_data.get('name') or "the student"
+
+
+def degraded_reply(agent_name, student_data=None, context_chunks=None, turn=0):
+    """Two-sentence reply from ``agent_name`` built without calling the LLM"""
+    focus, recommendations = MENTOR_TEMPLATES.get(agent_name, DEFAULT_TEMPLATE)
+    name = _student_name(student_data)
+    grounding = _grounding(context_chunks)
+    if grounding:
+        first = f"From the {focus} side, our guidance for students like {name} notes: {grounding}."
+    else:
+        first = f"From the {focus} side, {name} would benefit from small, consistent steps rather than big changes."
+    return f"{first} {recommendations[turn % len(recommendations)]}"
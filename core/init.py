@@ -13,6 +13,8 @@ from .chat_logic import (
     process_agent_turn,
     handle_message_completion
 )
+from .roundtable_engine import RoundtableEngine
+from .session_state import SessionState, AgentCounter, roundtable_state
 
 __all__ = [
     'initialize_session_state',
@@ -27,5 +29,9 @@ __all__ = [
     'get_conversation_progression',
     'get_progressive_context',
     'process_agent_turn',
-    'handle_message_completion'
+    'handle_message_completion',
+    'RoundtableEngine',
+    'SessionState',
+    'AgentCounter',
+    'roundtable_state'
 ]
\ No newline at end of file
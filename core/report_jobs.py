@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import REPORT_JOB_WORKERS, REPORT_JOB_HISTORY
+from utils.rate_limit import llm_priority
+from utils.usage import usage_scope
+
+logger = logging.getLogger(__name__)
+
+# Stage name -> progress fraction shown while the stage runs
+REPORT_STAGES = OrderedDict([
+    ("queued", 0.0),
+    ("context", 0.05),
+    ("analysis", 0.15),
+    ("html", 0.8),
+    ("pdf", 0.9),
+    ("done", 1.0),
+])
+
+STAGE_LABELS = {
+    "queued": "Waiting for a free worker",
+    "context": "Retrieving company context",
+    "analysis": "Analyzing the discussion and writing the report",
+    "html": "Formatting the report",
+    "pdf": "Rendering the PDF",
+    "done": "Finished",
+}
+
+
+class ReportJob:
+    """State of one background report generation.
+
+    Only the worker thread writes to a job; the page reads snapshots via ``to_dict``.
+    """
+
+    def __init__(self, session_id, student_data, chat_history):
+        self.id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.student_data = dict(student_data or {})
+        self.chat_history = list(chat_history or [])  # snapshot, chatting may continue
+        self.status = "queued"  # queued, running, done, failed
+        self.stage = "queued"
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.error_details = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def set_stage(self, stage, progress=None):
+        """Progress callback handed to the report generator"""
+        self.stage = stage
+        self.progress = REPORT_STAGES.get(stage, self.progress) if progress is None else progress
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "stage_label": STAGE_LABELS.get(self.stage, self.stage),
+            "progress": self.progress,
+            "error": self.error,
+            "elapsed": (self.finished_at or time.time()) - self.created_at,
+            "message_count": len(self.chat_history),
+        }
+
+
+class ReportJobQueue:
+    """Process-wide queue running report generation off the Streamlit script thread.
+
+    Workers never touch ``st.session_state``; everything a job needs is captured at submit time
+    and the page collects the result by polling with the job id.
+    """
+
+    def __init__(self, max_workers=REPORT_JOB_WORKERS, max_jobs=REPORT_JOB_HISTORY):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, report_generator, student_data, chat_history,
+               context_fn=None, context_query="", memory=None):
+        """Queue a report; returns the job id immediately"""
+        job = ReportJob(session_id, student_data, chat_history)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict_finished()
+        self._executor.submit(self._run, job, report_generator, context_fn, context_query, memory)
+        logger.info(f"Queued report job {job.id} ({len(job.chat_history)} messages)")
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """Snapshot of a job's progress, or None if unknown (e.g. evicted or server restarted)"""
+        job = self.get(job_id)
+        return job.to_dict() if job else None
+
+    def result(self, job_id):
+        """Result dict of a finished job, or None while it is still running"""
+        job = self.get(job_id)
+        if job is None or not job.finished:
+            return None
+        return job.result
+
+    def active_jobs(self, session_id):
+        with self._lock:
+            return [job.id for job in self._jobs.values() if job.session_id == session_id and not job.finished]
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs beyond max_jobs (caller holds the lock)"""
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
+
+    def _run(self, job, report_generator, context_fn, context_query, memory):
+        job.status = "running"
+        status = "failed"
+        try:
+            # Unchanged profile and transcript - skip retrieval and generation entirely
+            job.result = report_generator.get_cached_report(job.chat_history, job.student_data)
+            if job.result is not None:
+                status = "done"
+                return
+
+            job.set_stage("context")
+            context_chunks = "GVC AI Mentor Roundtable Discussion Context"
+            if context_fn is not None:
+                try:
+                    context_chunks = context_fn(context_query, k=5)
+                except Exception as context_error:
+                    logger.warning(f"Report job {job.id}: context retrieval failed: {context_error}")
+
+            student_data = job.student_data if isinstance(job.student_data, dict) else {}
+            with usage_scope(session_id=job.session_id, gvc_id=student_data.get('gvc_id'), agent="Report Generator"), \
+                    llm_priority("batch"):
+                job.result = report_generator.generate_csv_style_report(
+                    job.chat_history, job.student_data, context_chunks,
+                    memory=memory, progress_callback=job.set_stage
+                )
+            if job.result.get('html'):
+                status = "done"
+            else:
+                job.error = job.result.get('message')
+        except Exception as e:
+            logger.error(f"Report job {job.id} failed: {e}")
+            job.error = str(e)
+            job.error_details = traceback.format_exc()
+        finally:
+            job.set_stage("done")
+            job.finished_at = time.time()
+            job.status = status  # set last so pollers see a complete job
+
+
+# Global instance
+report_job_queue = ReportJobQueue()
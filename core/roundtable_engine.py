@@ -0,0 +1,633 @@
+import asyncio
+import logging
+import time
+
+from config.settings import (
+    MAX_AGENT_TURNS,
+    SIMILARITY_THRESHOLD,
+    MAX_MESSAGE_ATTEMPTS,
+    CONVERSATION_PHASES,
+    TOPIC_KEYWORDS,
+    BUDGET_FALLBACK_MODEL,
+    STREAM_VALIDATION,
+    PANEL_BATCH_MODE,
+    PANEL_BATCH_SIZE,
+    LLM_DEADLINES,
+    TURN_TIMEOUT
+)
+from core.cancellation import GenerationCancelled, cancellations
+from core.degraded_mode import degraded_reply
+from core.session_state import SessionState, default_state_values
+from core.stream_validation import StreamValidator
+from utils.chat_utils import format_message
+from utils.circuit_breaker import CircuitOpenError
+from utils.hedging import llm_deadline
+from utils.llm import llm_available
+from utils.rate_limit import llm_call_guard, llm_priority
+from utils.tracing import tracer, new_trace_id
+from utils.usage import usage_ledger, usage_scope
+
+logger = logging.getLogger(__name__)
+
+GENERIC_PHRASES = [
+    "as an ai", "i'm an ai", "i cannot", "i don't have access",
+    "let me help you", "i understand", "that's a great question"
+]
+
+
+def extract_topics_from_message(message_content):
+    """Extract topics mentioned in a message"""
+    message_lower = message_content.lower()
+    topics_found = set()
+
+    for topic, keywords in TOPIC_KEYWORDS.items():
+        if any(keyword in message_lower for keyword in keywords):
+            topics_found.add(topic)
+
+    return topics_found
+
+
+class RoundtableEngine:
+    """Turn logic of the mentor roundtable, independent of Streamlit.
+
+    ``state`` is the session's ``SessionState`` (the app keeps one per browser session, see
+    ``core.session_state.roundtable_state``). The synchronous methods are the building blocks
+    the Streamlit adapters in ``core.chat_logic`` call between reruns; ``step``, ``user_says``
+    and ``run_round`` drive whole turns for headless callers without UI pacing delays.
+    """
+
+    def __init__(self, orchestrator, state=None, context_fn=None, max_agent_turns=MAX_AGENT_TURNS, alive_fn=None,
+                 store=None):
+        self.orchestrator = orchestrator
+        self.state = state if state is not None else SessionState()
+        self.context_fn = context_fn
+        self.max_agent_turns = max_agent_turns
+        self.alive_fn = alive_fn  # returns False once whoever asked for the generation has gone away
+        self.store = store  # a SessionStore persisting the transcript, or None
+        self._ensure_state()
+
+    def _ensure_state(self):
+        for key, value in default_state_values().items():
+            if self.state.get(key) is None and value is not None:
+                setattr(self.state, key, value)
+
+    # ------------------------------------------------------------------
+    # Message quality
+    # ------------------------------------------------------------------
+
+    def _span(self, name, **attributes):
+        """Tracing span tagged with the current turn and session"""
+        return tracer.span(
+            name,
+            trace_id=self.state.get('trace_id'),
+            session_id=self.state.get('session_id'),
+            **attributes
+        )
+
+    def _usage_scope(self, agent):
+        """Attribute LLM usage to this session, its student and the given agent"""
+        student_data = self.state.get('student_data')
+        return usage_scope(
+            session_id=self.state.get('session_id'),
+            gvc_id=student_data.get('gvc_id') if isinstance(student_data, dict) else None,
+            agent=agent
+        )
+
+    def message_attempts(self):
+        """Generation attempts this session's token budget allows; downgrades the model once exceeded"""
+        status = usage_ledger.budget_status(self.state.get('session_id'))
+        if status == "exceeded" and not self.state.get('budget_downgraded'):
+            if BUDGET_FALLBACK_MODEL and hasattr(self.orchestrator, 'downgrade_models'):
+                logger.warning(f"Session over token budget, switching mentors to {BUDGET_FALLBACK_MODEL}")
+                self.orchestrator.downgrade_models(BUDGET_FALLBACK_MODEL)
+            self.state.budget_downgraded = True
+        return MAX_MESSAGE_ATTEMPTS if status == "ok" else 1
+
+    def check_message_similarity(self, new_message, agent_name, threshold=SIMILARITY_THRESHOLD):
+        """Check if a message is too similar to previous messages from the same agent"""
+        previous_messages = self.state.agent_message_history.setdefault(agent_name, [])
+        new_words = set(new_message.lower().split())
+
+        for prev_message in previous_messages:
+            prev_words = set(prev_message.lower().split())
+
+            if len(new_words) > 0 and len(prev_words) > 0:
+                # Calculate Jaccard similarity
+                intersection = len(new_words.intersection(prev_words))
+                union = len(new_words.union(prev_words))
+
+                if union > 0 and intersection / union > threshold:
+                    return True, prev_message
+
+        return False, None
+
+    def remember_message(self, message, agent_name, max_history=3):
+        """Add message to agent's history for similarity tracking"""
+        history = self.state.agent_message_history.setdefault(agent_name, [])
+        history.append(message)
+
+        # Keep only recent messages to prevent memory issues
+        if len(history) > max_history:
+            self.state.agent_message_history[agent_name] = history[-max_history:]
+
+    @staticmethod
+    def validate_message(message):
+        """Validate that an agent message meets quality standards"""
+        if not message or len(message.strip()) < 20:
+            return False, "Message too short"
+
+        if len(message) > 2000:
+            return False, "Message too long"
+
+        # Check for generic responses
+        message_lower = message.lower()
+        if any(phrase in message_lower for phrase in GENERIC_PHRASES):
+            return False, "Generic AI response detected"
+
+        return True, "Valid"
+
+    # ------------------------------------------------------------------
+    # Conversation progression
+    # ------------------------------------------------------------------
+
+    def conversation_progression(self):
+        """Determine what phase the conversation should be in"""
+        message_count = len(self.state.chat_history)
+
+        for phase, config in CONVERSATION_PHASES.items():
+            if message_count <= config["threshold"]:
+                return phase
+
+        return "synthesis"  # Default to final phase
+
+    def covered_topics(self):
+        """Topics the mentors have raised so far in the transcript"""
+        covered_topics = set()
+        for msg in self.state.chat_history:
+            if msg["role"] != "User":
+                covered_topics.update(extract_topics_from_message(msg["content"]))
+        return covered_topics
+
+    def progressive_context(self, agent_name):
+        """Get context that encourages conversation progression"""
+        phase = self.conversation_progression()
+        covered_topics = self.covered_topics()
+
+        student_name = (self.state.student_data or {}).get('personal_info', {}).get('name', 'the student')
+        phase_prompts = {
+            "initial": f"""
+This is the beginning of the discussion. Introduce a fresh perspective on the student's situation.
+Current agent: {agent_name}
+Student: {student_name}
+Avoid repeating what others have said. Focus on your unique expertise.
+""",
+            "development": f"""
+Build on the conversation by diving deeper into specifics.
+Topics already covered: {', '.join(covered_topics) if covered_topics else 'none yet'}
+As {agent_name}, introduce NEW actionable strategies or insights that haven't been discussed.
+Provide specific, practical advice based on your expertise.
+""",
+            "synthesis": f"""
+We're in the final phase. Provide concrete next steps or synthesize the discussion into actionable recommendations.
+Covered topics: {', '.join(covered_topics)}
+As {agent_name}, avoid repeating earlier advice. Focus on SPECIFIC, MEASURABLE actions the student can take immediately.
+Consider how your expertise connects with what others have shared.
+"""
+        }
+
+        return phase_prompts.get(phase, phase_prompts["initial"])
+
+    def can_continue(self):
+        """Determine if the conversation should continue; returns (bool, reason)"""
+        if self.state.consecutive_agent_turns >= self.max_agent_turns:
+            return False, "Turn limit reached"
+
+        if not self.state.chat_running:
+            return False, "Chat not running"
+
+        if not self.state.student_data:
+            return False, "No student data"
+
+        if self.state.agent_turn_in_progress and self.state.message_streaming:
+            last_start = self.state.get('last_agent_start_time')
+            if last_start and time.time() - last_start > TURN_TIMEOUT:
+                return False, "Agent timeout"
+
+        return True, "Continue"
+
+    def analytics(self):
+        """Get analytics about the current conversation"""
+        chat_history = self.state.chat_history
+        agent_messages = [msg for msg in chat_history if msg["role"] != "User"]
+        user_messages = [msg for msg in chat_history if msg["role"] == "User"]
+
+        agent_participation = {}
+        for msg in agent_messages:
+            agent_participation[msg["role"]] = agent_participation.get(msg["role"], 0) + 1
+        covered_topics = self.covered_topics()
+
+        return {
+            "total_messages": len(chat_history),
+            "agent_messages": len(agent_messages),
+            "user_messages": len(user_messages),
+            "agent_participation": agent_participation,
+            "covered_topics": len(covered_topics),
+            "conversation_phase": self.conversation_progression(),
+            "topics_list": list(covered_topics)
+        }
+
+    # ------------------------------------------------------------------
+    # Turn building blocks
+    # ------------------------------------------------------------------
+
+    def select_agent(self, user_message=None):
+        """Pick the next speaker, falling back to the orchestrator's safe selection"""
+        priority = "interactive" if user_message else self.reply_priority()
+        with self._span("agent_selection") as span, self._usage_scope("Orchestrator"), llm_priority(priority), \
+                llm_deadline(LLM_DEADLINES["agent_selection"]):
+            try:
+                return self.orchestrator.select_next_agent(self.state.chat_history, user_message=user_message)
+            except Exception as e:
+                logger.warning(f"Enhanced agent selection failed: {e}, using fallback")
+                span.set(fallback=True)
+                return self.orchestrator.get_safe_next_agent(self.state.chat_history, user_message=user_message)
+
+    def reply_priority(self):
+        """Rate-limit class of the current turn: interactive when it answers the student"""
+        history = self.state.chat_history
+        return "interactive" if history and history[-1].get("role") == "User" else "agent"
+
+    def begin_turn(self):
+        """Choose the speaker and mark the turn as in progress; returns the agent name"""
+        # Spans recorded across reruns of this turn share one trace id
+        self.state.trace_id = new_trace_id()
+        self.state.last_agent_start_time = time.time()
+        # A batched panel call already decided who speaks next
+        queued = self.state.get('panel_queue')
+        self.state.current_agent = queued[0][0] if queued else self.select_agent()
+        self.state.thinking_agent = self.state.current_agent
+        self.state.agent_turn_in_progress = True
+        self.state.roundtable_message = ""
+        logger.info(f"Starting turn for {self.state.current_agent}")
+        return self.state.current_agent
+
+    def fetch_context(self, k=3):
+        """Company context for the latest message"""
+        if self.context_fn is None:
+            return ""
+        query = self.state.chat_history[-1]["content"] if self.state.chat_history else ""
+        with self._span("retrieval", k=k):
+            return self.context_fn(query, k=k)
+
+    def generate_message(self, context_chunks):
+        """Generate the current agent's message with validation and similarity retries"""
+        agent_name = self.state.current_agent or "Academic Mentor"
+        max_attempts = self.message_attempts()
+        session_id = self.state.get('session_id')
+        cancel_token = cancellations.begin(session_id, self.alive_fn)
+        # The token also guards every LLM request of the generation, so a cancelled one is not
+        # sent and one still waiting for rate-limit capacity or its first token is abandoned
+        with self._span("generation", agent=agent_name) as span, self._usage_scope(agent_name), \
+                llm_priority(self.reply_priority()), llm_call_guard(cancel_token):
+            attempts = 0
+            try:
+                if PANEL_BATCH_MODE and self.reply_priority() == "agent":
+                    message = self.panel_message(agent_name, context_chunks, span)
+                    if cancel_token.cancelled:
+                        self.state.panel_queue = []
+                        span.set(cancelled=cancel_token.reason)
+                        return None
+                    if message:
+                        return message
+
+                while attempts < max_attempts:
+                    if cancel_token.cancelled:
+                        logger.info(f"Generation for {agent_name} cancelled: {cancel_token.reason}")
+                        span.set(cancelled=cancel_token.reason)
+                        return None
+                    if not self.served_locally(agent_name) and not llm_available():
+                        return self.degraded_message(agent_name, context_chunks, span)
+                    try:
+                        logger.info(f"Attempting to generate message for {agent_name}, attempt {attempts + 1}")
+
+                        try:
+                            agent_stream = self.orchestrator.stream_agent_message(
+                                agent_name,
+                                self.state.chat_history,
+                                self.state.student_data,
+                                context_chunks,
+                                user_message=None
+                            )
+                        except Exception as e:
+                            logger.warning(f"Enhanced streaming failed: {e}, falling back to simple method")
+                            agent_stream = self.orchestrator.simple_stream_agent_message(
+                                agent_name,
+                                self.state.chat_history,
+                                self.state.student_data,
+                                context_chunks,
+                                user_message=None
+                            )
+
+                        # Collect streaming content, judging it as it arrives so a bad reply is
+                        # cancelled instead of paid for in full
+                        temp_message = ""
+                        max_words = 100
+                        # The last attempt tolerates a near-duplicate, as the post-hoc check does
+                        previous = self.state.agent_message_history.get(agent_name, []) if attempts < max_attempts - 1 else []
+                        validator = StreamValidator(GENERIC_PHRASES, previous) if STREAM_VALIDATION else None
+                        verdict = None
+
+                        with llm_deadline(LLM_DEADLINES["mentor_reply"]):
+                            for token in agent_stream:
+                                if cancel_token.cancelled:
+                                    break
+                                temp_message += token
+                                verdict = validator.feed(token) if validator else None
+                                if verdict:
+                                    break
+                                if len(temp_message.split()) > max_words:
+                                    logger.warning(f"Message generation exceeded {max_words} words, stopping")
+                                    break
+                            agent_stream.close()
+                        if cancel_token.cancelled:
+                            continue
+
+                        if verdict and verdict[0] == "abort":
+                            logger.info(f"Aborted streaming message from {agent_name}: {verdict[1]}, retrying")
+                            span.add("aborted_streams")
+                            attempts += 1
+                            if validator.similar_message:
+                                context_chunks += f"\n\nIMPORTANT: Do NOT repeat or paraphrase this previous message: '{validator.similar_message[:100]}...' Provide a completely different perspective or approach."
+                            continue
+                        if verdict:
+                            temp_message = verdict[1]
+
+                        if not temp_message.strip():
+                            temp_message = f"As the {agent_name}, I believe the student should focus on developing their core strengths. This will provide a solid foundation for future growth and success."
+
+                        is_valid, validation_msg = self.validate_message(temp_message)
+                        if not is_valid:
+                            logger.warning(f"Invalid message from {agent_name}: {validation_msg}")
+                            attempts += 1
+                            continue
+
+                        is_similar, similar_message = self.check_message_similarity(temp_message, agent_name)
+
+                        if not is_similar or attempts == max_attempts - 1:
+                            logger.info(f"Generated valid message for {agent_name} after {attempts + 1} attempts")
+                            return temp_message
+
+                        logger.info(f"Similar message detected for {agent_name}, retrying...")
+                        attempts += 1
+                        context_chunks += f"\n\nIMPORTANT: Do NOT repeat or paraphrase this previous message: '{similar_message[:100]}...' Provide a completely different perspective or approach."
+
+                    except GenerationCancelled:
+                        raise
+                    except CircuitOpenError:
+                        return self.degraded_message(agent_name, context_chunks, span)
+                    except Exception as e:
+                        logger.error(f"Error generating message (attempt {attempts + 1}): {e}")
+                        attempts += 1
+                        if attempts >= max_attempts:
+                            return self.degraded_message(agent_name, context_chunks, span)
+
+                return None
+            except GenerationCancelled:
+                logger.info(f"Generation for {agent_name} cancelled: {cancel_token.reason}")
+                self.state.panel_queue = []
+                span.set(cancelled=cancel_token.reason)
+                return None
+            finally:
+                span.set(retries=attempts)
+                cancellations.finish(session_id, cancel_token)
+
+    def panel_message(self, agent_name, context_chunks, span):
+        """The agent's message from a batched panel call, or None to generate it on its own.
+
+        Takes the next queued message when one is waiting for this agent; otherwise asks for the
+        next few mentors' messages in one call, keeps the leading run that passes validation and
+        queues all but the first for the following turns.
+        """
+        queue = self.state.get('panel_queue') or []
+        if queue and queue[0][0] == agent_name:
+            span.set(panel="queued")
+            return queue.pop(0)[1]
+        self.state.panel_queue = []
+
+        count = min(PANEL_BATCH_SIZE, self.max_agent_turns - self.state.consecutive_agent_turns)
+        if count < 2 or not hasattr(self.orchestrator, 'generate_panel_batch'):
+            return None
+        if not self.served_locally(agent_name) and not llm_available():
+            return None
+
+        speakers = self.orchestrator.panel_speakers(agent_name, count)
+        with self._span("panel_batch", speakers=len(speakers)) as batch_span, self._usage_scope("Panel"), \
+                llm_deadline(LLM_DEADLINES["mentor_reply"]):
+            try:
+                batch = self.orchestrator.generate_panel_batch(
+                    speakers,
+                    self.state.chat_history,
+                    self.state.student_data,
+                    context_chunks
+                )
+            except GenerationCancelled:
+                raise
+            except Exception as e:
+                logger.warning(f"Panel batch generation failed: {e}, generating {agent_name} on its own")
+                batch_span.set(failed=True)
+                return None
+            accepted = self.validate_panel(batch)
+            batch_span.set(returned=len(batch), accepted=len(accepted))
+
+        if not accepted:
+            return None
+        span.set(panel="generated")
+        self.state.panel_queue = accepted[1:]
+        return accepted[0][1]
+
+    def validate_panel(self, batch):
+        """Leading [agent, message] pairs of a panel batch that pass the per-message checks"""
+        accepted = []
+        for agent_name, message in batch:
+            if STREAM_VALIDATION:
+                verdict = StreamValidator(GENERIC_PHRASES).feed(message)
+                if verdict and verdict[0] == "truncate":
+                    message = verdict[1]
+            is_valid, validation_msg = self.validate_message(message)
+            if is_valid:
+                is_similar, _ = self.check_message_similarity(message, agent_name)
+                validation_msg = "Similar to an earlier message" if is_similar else validation_msg
+                is_valid = not is_similar
+            if not is_valid:
+                # Later messages answer this one, so they are dropped with it
+                logger.info(f"Panel message from {agent_name} rejected: {validation_msg}")
+                break
+            accepted.append([agent_name, message])
+        return accepted
+
+    def served_locally(self, agent_name):
+        """Whether the agent runs on the local model backend, which provider outages do not affect"""
+        agent = getattr(self.orchestrator, 'agents', {}).get(agent_name)
+        return getattr(getattr(agent, 'llm', None), 'local', False)
+
+    def degraded_message(self, agent_name, context_chunks, span):
+        """Template reply used when the LLM provider is down or every attempt failed"""
+        logger.warning(f"Serving a degraded-mode reply for {agent_name}")
+        span.set(degraded=True)
+        return degraded_reply(agent_name, self.state.student_data, context_chunks, len(self.state.chat_history))
+
+    def cancel_generation(self, reason="cancelled"):
+        """Abort this session's in-flight generation, if any; returns True if one was cancelled"""
+        return cancellations.cancel(self.state.get('session_id'), reason)
+
+    def complete_turn(self, message_content):
+        """Record the agent's message and advance; returns True when the agents pause"""
+        agent_name = self.state.current_agent
+        self.append_message(format_message(agent_name, message_content))
+        self.remember_message(message_content, agent_name)
+
+        if hasattr(self.orchestrator, 'update_conversation_state'):
+            self.orchestrator.update_conversation_state(agent_name, message_content)
+
+        self.state.consecutive_agent_turns += 1
+
+        if self.state.consecutive_agent_turns >= self.max_agent_turns:
+            self.state.chat_running = False
+            self.reset_turn_state()
+            return True
+
+        self.state.current_agent = self.orchestrator.select_next_agent(self.state.chat_history)
+        self.reset_turn_state()
+        return False
+
+    def append_message(self, message):
+        """Add a message to the transcript, persisting it when the engine has a store"""
+        self.state.chat_history.append(message)
+        if self.store is not None:
+            self.store.append(self.state.get('session_id'), message, self.state.student_data)
+
+    def add_user_message(self, content):
+        """Append the student's message and choose who responds; returns the responding agent"""
+        # Whatever a mentor was saying is moot now that the student has spoken
+        self.cancel_generation("user_message")
+        self.state.panel_queue = []
+        self.append_message(format_message("User", content))
+
+        # The student speaking resets the agents' turn budget
+        self.state.consecutive_agent_turns = 0
+        self.state.chat_running = True
+        self.reset_turn_state()
+
+        with self._usage_scope("Orchestrator"), llm_priority("interactive"), \
+                llm_deadline(LLM_DEADLINES["agent_selection"]):
+            if hasattr(self.orchestrator, 'intelligent_agent_selection'):
+                responding_agent = self.orchestrator.intelligent_agent_selection(self.state.chat_history, content)
+            else:
+                responding_agent = self.orchestrator.select_next_agent(self.state.chat_history, content)
+
+        self.state.current_agent = responding_agent
+        return responding_agent
+
+    def take_turn(self):
+        """Run one complete agent turn synchronously; returns the new message or None"""
+        should_continue, reason = self.can_continue()
+        if not should_continue:
+            logger.info(f"Roundtable turn skipped: {reason}")
+            return None
+
+        trace_id = new_trace_id()
+        with tracer.span("turn", trace_id=trace_id, session_id=self.state.get('session_id')):
+            self.begin_turn()
+            self.state.trace_id = trace_id
+            self.state.message_streaming = True
+            try:
+                message_content = self.generate_message(self.fetch_context())
+            except Exception:
+                self.reset_turn_state()
+                raise
+
+            if not message_content:
+                self.reset_turn_state()
+                return None
+
+            self.complete_turn(message_content)
+            return self.state.chat_history[-1]
+
+    # ------------------------------------------------------------------
+    # State resets
+    # ------------------------------------------------------------------
+
+    def reset_turn_state(self):
+        self.state.thinking_agent = None
+        self.state.last_agent_start_time = None
+        self.state.agent_turn_in_progress = False
+        self.state.message_streaming = False
+
+    def reset_conversation_state(self):
+        """Reset conversation-specific state while preserving the transcript"""
+        self.state.agent_message_history = {}
+        self.state.consecutive_agent_turns = 0
+        self.state.panel_queue = []
+        self.reset_turn_state()
+
+    def reset(self):
+        """Clear the transcript and all turn state"""
+        self.cancel_generation("reset")
+        self.state.chat_history = []
+        if self.store is not None:
+            self.store.mark_reset(self.state.get('session_id'))
+        self.state.pending_agent_message = None
+        self.state.roundtable_message = ""
+        self.state.chat_running = False
+        self.state.current_agent = "Academic Mentor"
+        self.reset_conversation_state()
+
+        # Drop the rolling summary along with the transcript
+        if self.orchestrator is not None and hasattr(self.orchestrator, 'memory'):
+            self.orchestrator.memory.reset()
+
+    def unstick(self):
+        """Reset the turn if an agent was selected but never started generating"""
+        if (self.state.get('agent_turn_in_progress') and
+                self.state.get('thinking_agent') and
+                not self.state.get('message_streaming')):
+            self.reset_turn_state()
+            self.state.chat_running = True
+            logger.info("Reset stuck agent state")
+            return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Async API for headless callers
+    # ------------------------------------------------------------------
+
+    async def step(self):
+        """Run one agent turn off the event loop; returns the new message or None"""
+        return await asyncio.to_thread(self.take_turn)
+
+    async def user_says(self, content, respond=True):
+        """Add a student message; with respond=True, run agents until they pause.
+
+        Returns the agent messages produced in response.
+        """
+        await asyncio.to_thread(self.add_user_message, content)
+        if not respond:
+            return []
+        return await self.run_round()
+
+    async def run_round(self, max_turns=None):
+        """Start or resume the discussion and run turns until the agents pause (or max_turns).
+
+        Returns the new messages.
+        """
+        self.state.chat_running = True
+        self.state.consecutive_agent_turns = 0
+        messages = []
+        while max_turns is None or len(messages) < max_turns:
+            message = await self.step()
+            if message is None:
+                break
+            messages.append(message)
+            if not self.state.chat_running:
+                break
+        return messages
@@ -1,61 +1,36 @@
+import time
+import uuid
+
 import streamlit as st
 from agents.agent_orchestrator import AgentOrchestrator
-from agents.report_generator import ReportGenerator
-from config.settings import MAX_AGENT_TURNS, AGENTS_INFO
+from config.settings import MAX_AGENT_TURNS, AGENTS_INFO, REPORT_ARTIFACTS_PER_SESSION, SESSION_RESUME_MESSAGES
+from core.report_jobs import report_job_queue
+from core.roundtable_engine import RoundtableEngine
+from core.session_state import roundtable_state
+from core.session_store import session_store
+from utils.chat_utils import Message
 
 def initialize_session_state(vectordb):
     """Initialize all session state variables with enhanced orchestrator"""
     
-    # Chat state
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
-    if 'current_agent' not in st.session_state:
-        st.session_state.current_agent = "Academic Mentor"
-    if 'chat_running' not in st.session_state:
-        st.session_state.chat_running = False
-    # Don't overwrite existing student_data - only initialize if truly missing
-    # This preserves the data from the data_input page
-    if 'student_data' not in st.session_state or st.session_state.student_data is None:
-        st.session_state.student_data = None
+    # Roundtable state lives in one SessionState; student_data set by the data input page is kept
+    state = roundtable_state()
     
     # Enhanced Agent orchestration with improved flow control
     if 'orchestrator' not in st.session_state:
         st.session_state.orchestrator = AgentOrchestrator(vectordb=vectordb)
-    if 'report_generator' not in st.session_state:
-        st.session_state.report_generator = ReportGenerator()
-    
-    # Enhanced conversation state tracking
-    if 'conversation_state' not in st.session_state:
-        st.session_state.conversation_state = {
-            "phase": "opening",
-            "rounds_completed": 0,
-            "agent_participation": {},
-            "last_three_agents": [],
-            "topic_coverage": set(),
-            "interaction_quality": []
-        }
-    
-    # Agent turn management
-    if 'consecutive_agent_turns' not in st.session_state:
-        st.session_state.consecutive_agent_turns = 0
-    if 'pending_agent_message' not in st.session_state:
-        st.session_state.pending_agent_message = None
-    if 'agent_turn_in_progress' not in st.session_state:
-        st.session_state.agent_turn_in_progress = False
-    if 'thinking_agent' not in st.session_state:
-        st.session_state.thinking_agent = None
-    if 'roundtable_message' not in st.session_state:
-        st.session_state.roundtable_message = ""
-    if 'message_streaming' not in st.session_state:
-        st.session_state.message_streaming = False
     
-    # Legacy conversation tracking (keep for compatibility)
-    if 'conversation_topics' not in st.session_state:
-        st.session_state.conversation_topics = set()
-    if 'agent_message_history' not in st.session_state:
-        st.session_state.agent_message_history = {}
-    if 'conversation_phase' not in st.session_state:
-        st.session_state.conversation_phase = "initial"
+    # Background report jobs and the finished reports of this session
+    if state.session_id is None:
+        # A refresh or a restart picks the transcript back up from the ?session= link
+        requested = _requested_session_id()
+        if not (requested and resume_session(requested)):
+            state.session_id = uuid.uuid4().hex
+            _link_session(state.session_id)
+    if 'report_job_ids' not in st.session_state:
+        st.session_state.report_job_ids = []
+    if 'report_artifacts' not in st.session_state:
+        st.session_state.report_artifacts = []
     
     # UI state
     if 'selected_agents' not in st.session_state:
@@ -65,82 +40,121 @@ def initialize_session_state(vectordb):
     if 'last_user_message_time' not in st.session_state:
         st.session_state.last_user_message_time = None
 
+def _requested_session_id():
+    """Session ID from the page URL, if it names a valid ID"""
+    query_params = getattr(st, 'query_params', None)  # Streamlit 1.30+
+    if query_params is None or not session_store.enabled:
+        return None
+    session_id = query_params.get("session")
+    return session_id if session_store.valid_id(session_id) else None
+
+def _link_session(session_id):
+    """Put the session ID in the page URL so reloading it resumes the session"""
+    query_params = getattr(st, 'query_params', None)
+    if query_params is not None and session_store.enabled:
+        query_params["session"] = session_id
+
+def resume_session(session_id):
+    """Load a stored session's recent transcript and profile into this browser session.
+
+    Returns False if the store has no such session.
+    """
+    loaded = session_store.load(session_id, last=SESSION_RESUME_MESSAGES)
+    if loaded is None:
+        return False
+    student_data, messages = loaded
+    state = roundtable_state()
+    state.session_id = session_id
+    state.chat_history = messages
+    if student_data and not state.student_data:
+        state.student_data = student_data
+    
+    # Rebuild the orchestrator's participation tracking from the resumed transcript
+    orchestrator = st.session_state.get('orchestrator')
+    if orchestrator is not None:
+        for msg in messages:
+            if msg.get("role") in orchestrator.agent_order:
+                orchestrator.update_conversation_state(msg["role"], msg.get("content", ""))
+    _link_session(session_id)
+    return True
+
 def reset_chat_session():
     """Reset chat session state"""
-    st.session_state.chat_history = []
-    st.session_state.consecutive_agent_turns = 0
-    st.session_state.pending_agent_message = None
-    st.session_state.agent_turn_in_progress = False
-    st.session_state.thinking_agent = None
-    st.session_state.conversation_topics = set()
-    st.session_state.agent_message_history = {}
-    st.session_state.conversation_phase = "initial"
-    st.session_state.roundtable_message = ""
-    st.session_state.message_streaming = False
-    st.session_state.chat_running = False
-    st.session_state.current_agent = "Academic Mentor"
+    RoundtableEngine(st.session_state.get('orchestrator'), state=roundtable_state(), store=session_store).reset()
+
+def collect_finished_report_jobs():
+    """Move finished background reports into the session's artifact store; returns pending job ids"""
+    pending = []
+    for job_id in st.session_state.get('report_job_ids', []):
+        job = report_job_queue.get(job_id)
+        if job is None:
+            continue  # evicted or lost with a server restart
+        if not job.finished:
+            pending.append(job_id)
+            continue
+        artifacts = st.session_state.setdefault('report_artifacts', [])
+        artifacts.insert(0, {
+            "job_id": job.id,
+            "created_at": job.finished_at or time.time(),
+            "success": job.status == "done" and bool(job.result and job.result.get('success')),
+            "html": (job.result or {}).get('html'),
+            "pdf": (job.result or {}).get('pdf'),
+            "message": job.error or (job.result or {}).get('message', ''),
+            "error_details": job.error_details,
+            "message_count": len(job.chat_history),
+        })
+        del artifacts[REPORT_ARTIFACTS_PER_SESSION:]
+    st.session_state.report_job_ids = pending
+    return pending
 
 def update_agent_status():
     """Update agent status and return if paused"""
     agents_paused = False
+    state = roundtable_state()
     
     # Check if agents should pause due to turn limit
-    if st.session_state.consecutive_agent_turns >= MAX_AGENT_TURNS:
+    if state.consecutive_agent_turns >= MAX_AGENT_TURNS:
         agents_paused = True
-        st.session_state.chat_running = False
-        st.session_state.thinking_agent = None
-        st.session_state.agent_turn_in_progress = False
-        st.session_state.message_streaming = False
+        state.chat_running = False
+        state.thinking_agent = None
+        state.agent_turn_in_progress = False
+        state.message_streaming = False
     else:
-        agents_paused = not st.session_state.chat_running
+        agents_paused = not state.chat_running
     
     return agents_paused
 
 def get_session_summary():
     """Get a summary of the current session state"""
+    state = roundtable_state()
+    analytics = RoundtableEngine(st.session_state.get('orchestrator'), state=state).analytics()
     return {
-        "chat_messages": len(st.session_state.chat_history),
-        "current_agent": st.session_state.current_agent,
-        "chat_running": st.session_state.chat_running,
-        "consecutive_turns": st.session_state.consecutive_agent_turns,
-        "conversation_phase": st.session_state.conversation_phase,
-        "topics_covered": list(st.session_state.conversation_topics),
-        "agents_with_history": list(st.session_state.agent_message_history.keys())
+        "chat_messages": len(state.chat_history),
+        "current_agent": state.current_agent,
+        "chat_running": state.chat_running,
+        "consecutive_turns": state.consecutive_agent_turns,
+        "conversation_phase": analytics["conversation_phase"],
+        "topics_covered": analytics["topics_list"],
+        "agents_with_history": list(state.agent_message_history.keys())
     }
 
 def validate_session_state():
     """Validate and fix any corrupted session state"""
     try:
-        # Ensure required attributes exist
-        required_attrs = [
-            'chat_history', 'current_agent', 'chat_running', 'student_data',
-            'consecutive_agent_turns', 'agent_turn_in_progress', 'thinking_agent'
-        ]
-        
-        for attr in required_attrs:
-            if attr not in st.session_state:
-                if attr == 'chat_history':
-                    st.session_state.chat_history = []
-                elif attr == 'current_agent':
-                    st.session_state.current_agent = "Academic Mentor"
-                elif attr in ['chat_running', 'agent_turn_in_progress']:
-                    setattr(st.session_state, attr, False)
-                elif attr == 'consecutive_agent_turns':
-                    st.session_state.consecutive_agent_turns = 0
-                else:
-                    setattr(st.session_state, attr, None)
+        # SessionState always has every attribute, so only the values need checking
+        state = roundtable_state()
         
         # Validate current agent
         valid_agents = [agent["name"] for agent in AGENTS_INFO]
-        if st.session_state.current_agent not in valid_agents:
-            st.session_state.current_agent = valid_agents[0]
+        if state.current_agent not in valid_agents:
+            state.current_agent = valid_agents[0]
         
         # Validate consecutive turns
-        if st.session_state.consecutive_agent_turns < 0:
-            st.session_state.consecutive_agent_turns = 0
-        elif st.session_state.consecutive_agent_turns > MAX_AGENT_TURNS:
-            st.session_state.consecutive_agent_turns = MAX_AGENT_TURNS
-            st.session_state.chat_running = False
+        if state.consecutive_agent_turns < 0:
+            state.consecutive_agent_turns = 0
+        elif state.consecutive_agent_turns > MAX_AGENT_TURNS:
+            state.consecutive_agent_turns = MAX_AGENT_TURNS
+            state.chat_running = False
         
         return True
         
@@ -150,30 +164,37 @@ def validate_session_state():
 
 def cleanup_session_state():
     """Clean up session state to prevent memory issues"""
-    # Limit chat history size
-    max_history = 100
-    if len(st.session_state.chat_history) > max_history:
-        st.session_state.chat_history = st.session_state.chat_history[-max_history:]
+    state = roundtable_state()
+    # Limit chat history size; older messages stay in the session store, so only trim when it has them
+    excess = len(state.chat_history) - SESSION_RESUME_MESSAGES
+    if excess > 0 and session_store.exists(state.session_id):
+        state.chat_history = state.chat_history[excess:]
+        # The rolling summary counts positions in the history, so it has to know what was dropped
+        orchestrator = st.session_state.get('orchestrator')
+        if orchestrator is not None:
+            orchestrator.memory.dropped_front(excess)
     
     # Limit agent message history
     max_agent_history = 5
-    for agent_name in st.session_state.agent_message_history:
-        if len(st.session_state.agent_message_history[agent_name]) > max_agent_history:
-            st.session_state.agent_message_history[agent_name] = \
-                st.session_state.agent_message_history[agent_name][-max_agent_history:]
+    for agent_name in state.agent_message_history:
+        if len(state.agent_message_history[agent_name]) > max_agent_history:
+            state.agent_message_history[agent_name] = \
+                state.agent_message_history[agent_name][-max_agent_history:]
 
 def export_session_data():
     """Export session data for debugging or backup"""
     import json
     from datetime import datetime
     
+    state = roundtable_state()
+    session_summary = get_session_summary()
     session_data = {
         "timestamp": datetime.now().isoformat(),
-        "chat_history": st.session_state.chat_history,
-        "student_data": st.session_state.student_data,
-        "session_summary": get_session_summary(),
-        "conversation_topics": list(st.session_state.conversation_topics),
-        "agent_message_history": st.session_state.agent_message_history
+        "chat_history": [Message.from_dict(msg).to_dict() for msg in state.chat_history],
+        "student_data": state.student_data,
+        "session_summary": session_summary,
+        "conversation_topics": session_summary["topics_covered"],
+        "agent_message_history": state.agent_message_history
     }
     
     return json.dumps(session_data, indent=2, default=str)
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""Compact per-session state for the roundtable.
+
+``SessionState`` holds every key the turn loop reads or writes in fixed slots, with the
+transcript as slotted ``Message`` objects (role names interned, so hundreds of sessions share one
+copy of each mentor name) and per-mentor counts in an ``AgentCounter`` backed by a small integer
+array. ``to_dict`` / ``from_dict`` round-trip it through JSON, leaving out values at their defaults.
+The app keeps one per browser session under ``st.session_state.roundtable`` (``roundtable_state``).
+"""
+from array import array
+
+from config.settings import AGENTS_INFO
+from utils.chat_utils import Message
+
+AGENT_NAMES = tuple(agent["name"] for agent in AGENTS_INFO)
+
+
+def default_state_values():
+    """Fresh values for every state key the roundtable turn loop reads or writes"""
+    return {
+        "chat_history": [],
+        "student_data": None,
+        "current_agent": "Academic Mentor",
+        "chat_running": False,
+        "consecutive_agent_turns": 0,
+        "agent_turn_in_progress": False,
+        "thinking_agent": None,
+        "message_streaming": False,
+        "roundtable_message": "",
+        "agent_message_history": {},
+        "trace_id": None,
+        "last_agent_start_time": None,
+        "budget_downgraded": False,
+        "panel_queue": [],  # [agent, message] pairs from a batched panel call, still to be shown
+    }
+
+
+class AgentCounter:
+    """Per-agent counts in an array indexed by a fixed agent order; reads like a dict of ints"""
+
+    __slots__ = ("names", "_index", "_counts")
+
+    def __init__(self, names=AGENT_NAMES, counts=None):
+        self.names = tuple(names)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._counts = array("I", counts if counts is not None else [0] * len(self.names))
+
+    def __getitem__(self, name):
+        return self._counts[self._index[name]]
+
+    def __setitem__(self, name, value):
+        self._counts[self._index[name]] = value
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def get(self, name, default=None):
+        index = self._index.get(name)
+        return default if index is None else self._counts[index]
+
+    def keys(self):
+        return self.names
+
+    def values(self):
+        return list(self._counts)
+
+    def items(self):
+        return list(zip(self.names, self._counts))
+
+    def reset(self):
+        for i in range(len(self._counts)):
+            self._counts[i] = 0
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+class SessionState:
+    """One roundtable session's state, as fixed attributes"""
+
+    __slots__ = tuple(default_state_values()) + ("session_id", "pending_agent_message")
+
+    def __init__(self, student_data=None, chat_history=None, **values):
+        for key, value in default_state_values().items():
+            setattr(self, key, value)
+        self.session_id = None
+        self.pending_agent_message = None
+        self.student_data = student_data
+        self.chat_history = [Message.from_dict(msg) for msg in chat_history or []]
+        for key, value in values.items():
+            setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        """JSON-ready dict of the values that differ from a fresh session"""
+        defaults = default_state_values()
+        data = {}
+        for key in self.__slots__:
+            value = getattr(self, key)
+            if value == defaults.get(key):
+                continue
+            if key == "chat_history":
+                value = [msg.to_dict() for msg in value]
+            data[key] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        values = dict(data)
+        # Derived from the transcript now; older checkpoints still carry them
+        values.pop("conversation_topics", None)
+        values.pop("conversation_phase", None)
+        return cls(**values)
+
+
+def roundtable_state():
+    """This browser session's ``SessionState``, kept under one ``st.session_state`` key"""
+    import streamlit as st
+    if 'roundtable' not in st.session_state:
+        st.session_state.roundtable = SessionState()
+    return st.session_state.roundtable
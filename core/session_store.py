@@ -0,0 +1,274 @@
+"""Durable roundtable transcripts: one append-only JSONL segment per session.
+
+Every message is written and flushed to the OS as it is appended; a background thread fsyncs
+the files written since its last pass every ``SESSION_FSYNC_INTERVAL`` seconds, so a busy server
+pays for one fsync per session per interval rather than one per message. A segment holds three
+kinds of records:
+
+    {"t": "meta", "student_data": {...}}          the profile, written again only when it changes
+    {"t": "msg", "role": ..., "content": ...}     one chat message
+    {"t": "reset"}                                the transcript was cleared; earlier messages are dead
+
+``load`` replays a segment, so a session survives a browser refresh or a server restart and can
+be resumed by its ID. Segments idle for ``SESSION_ARCHIVE_DAYS`` are compacted down to their live
+records and gzipped into ``archive/``; loading an archived session brings it back.
+"""
+import atexit
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import (
+    SESSION_STORE_DIR,
+    SESSION_FSYNC_INTERVAL,
+    SESSION_MAX_OPEN_FILES,
+    SESSION_ARCHIVE_DAYS
+)
+from utils.chat_utils import Message
+
+logger = logging.getLogger(__name__)
+
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+ARCHIVE_CHECK_INTERVAL = 3600  # seconds between sweeps for idle segments
+
+
+class SessionStore:
+    """Append-only transcript segments under ``root``; a ``root`` of None disables persistence"""
+
+    def __init__(self, root=SESSION_STORE_DIR, fsync_interval=SESSION_FSYNC_INTERVAL,
+                 max_open_files=SESSION_MAX_OPEN_FILES, archive_days=SESSION_ARCHIVE_DAYS):
+        self.root = root
+        self.fsync_interval = fsync_interval
+        self.max_open_files = max_open_files
+        self.archive_days = archive_days
+        self._files = OrderedDict()  # session_id -> open segment, least recently written first
+        self._dirty = set()  # written since the last fsync
+        self._meta = {}  # session_id -> last student_data written, as JSON
+        self._lock = threading.Lock()
+        self._syncer = None
+
+    @property
+    def enabled(self):
+        return self.root is not None
+
+    @staticmethod
+    def valid_id(session_id):
+        """Session IDs come from URLs, so only plain tokens may name a file"""
+        return isinstance(session_id, str) and bool(SESSION_ID_PATTERN.match(session_id))
+
+    def _path(self, session_id):
+        return os.path.join(self.root, f"{session_id}.jsonl")
+
+    def _archive_path(self, session_id):
+        return os.path.join(self.root, "archive", f"{session_id}.jsonl.gz")
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _handle(self, session_id):
+        """Open segment for appending (caller holds the lock)"""
+        f = self._files.get(session_id)
+        if f is not None:
+            self._files.move_to_end(session_id)
+            return f
+        os.makedirs(self.root, exist_ok=True)
+        f = self._files[session_id] = open(self._path(session_id), "a", encoding="utf-8")
+        while len(self._files) > self.max_open_files:
+            self._close(next(iter(self._files)))
+        return f
+
+    def _close(self, session_id):
+        """Sync and close a segment (caller holds the lock)"""
+        f = self._files.pop(session_id, None)
+        if f is None:
+            return
+        if session_id in self._dirty:
+            self._dirty.discard(session_id)
+            os.fsync(f.fileno())
+        f.close()
+
+    def _write(self, session_id, record):
+        if not self.enabled or not self.valid_id(session_id):
+            return
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        try:
+            with self._lock:
+                f = self._handle(session_id)
+                f.write(line)
+                f.flush()
+                self._dirty.add(session_id)
+                self._ensure_syncer()
+        except OSError as e:
+            logger.warning(f"Session transcript write failed for {session_id}: {e}")
+
+    def append(self, session_id, message, student_data=None):
+        """Persist one chat message (and the profile, if it changed since it was last written)"""
+        if student_data is not None:
+            self.save_meta(session_id, student_data)
+        self._write(session_id, {"t": "msg", **Message.from_dict(message).to_dict()})
+
+    def save_meta(self, session_id, student_data):
+        encoded = json.dumps(student_data, sort_keys=True, default=str)
+        if self._meta.get(session_id) == encoded:
+            return
+        self._meta[session_id] = encoded
+        self._write(session_id, {"t": "meta", "student_data": student_data})
+
+    def mark_reset(self, session_id):
+        """The transcript was cleared; messages written before this are dropped on load"""
+        self._write(session_id, {"t": "reset", "at": time.time()})
+
+    def sync(self):
+        """fsync every segment written since the last call"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            for session_id in dirty:
+                f = self._files.get(session_id)
+                if f is None:
+                    continue
+                try:
+                    os.fsync(f.fileno())
+                except OSError as e:
+                    logger.warning(f"Session transcript fsync failed for {session_id}: {e}")
+
+    def _ensure_syncer(self):
+        """Start the background fsync thread on first write (caller holds the lock)"""
+        if self._syncer is None or not self._syncer.is_alive():
+            self._syncer = threading.Thread(target=self._sync_loop, name="session-store-sync", daemon=True)
+            self._syncer.start()
+
+    def _sync_loop(self):
+        next_archive = time.monotonic()
+        while True:
+            time.sleep(self.fsync_interval)
+            self.sync()
+            if self.archive_days and time.monotonic() >= next_archive:
+                next_archive = time.monotonic() + ARCHIVE_CHECK_INTERVAL
+                try:
+                    self.archive_idle()
+                except OSError as e:
+                    logger.warning(f"Session archive sweep failed: {e}")
+
+    def close(self):
+        with self._lock:
+            for session_id in list(self._files):
+                self._close(session_id)
+
+    # ------------------------------------------------------------------
+    # Reading, compaction and archiving
+    # ------------------------------------------------------------------
+
+    def exists(self, session_id):
+        if not self.enabled or not self.valid_id(session_id):
+            return False
+        return os.path.exists(self._path(session_id)) or os.path.exists(self._archive_path(session_id))
+
+    def _records(self, session_id):
+        path = self._path(session_id)
+        if not os.path.exists(path):
+            self._unarchive(session_id)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+
+    def load(self, session_id, last=None):
+        """(student_data, messages) of a stored session, or None if there is none.
+
+        ``last`` keeps only the most recent messages, for callers that hold a bounded window in memory.
+        """
+        if not self.exists(session_id):
+            return None
+        student_data = None
+        messages = []
+        for record in self._records(session_id):
+            kind = record.get("t")
+            if kind == "meta":
+                student_data = record.get("student_data")
+            elif kind == "reset":
+                messages = []
+            elif kind == "msg":
+                messages.append(Message.from_dict(record))
+                if last and len(messages) > 2 * last:
+                    del messages[:-last]
+        if student_data is not None:
+            self._meta[session_id] = json.dumps(student_data, sort_keys=True, default=str)
+        return student_data, messages[-last:] if last else messages
+
+    def transcript(self, session_id):
+        """Every live message of a session, including those no longer held in memory"""
+        loaded = self.load(session_id)
+        return loaded[1] if loaded else []
+
+    def compact(self, session_id):
+        """Rewrite a segment as its live records only: the latest profile and messages since the last reset"""
+        path = self._path(session_id)
+        tmp_path = path + ".tmp"
+        with self._lock:
+            # Under the lock so no message lands between reading the segment and replacing it
+            self._close(session_id)
+            loaded = self.load(session_id)
+            if loaded is None:
+                return
+            student_data, messages = loaded
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                if student_data is not None:
+                    f.write(json.dumps({"t": "meta", "student_data": student_data}, ensure_ascii=False, default=str) + "\n")
+                for message in messages:
+                    f.write(json.dumps({"t": "msg", **message.to_dict()}, ensure_ascii=False, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+    def archive_idle(self, max_age_days=None):
+        """Compact and gzip segments not written for ``max_age_days``; returns how many were archived"""
+        if not self.enabled or not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - 86400 * (max_age_days or self.archive_days)
+        archived = 0
+        for name in os.listdir(self.root):
+            session_id, ext = os.path.splitext(name)
+            path = os.path.join(self.root, name)
+            if ext != ".jsonl" or session_id in self._files or os.path.getmtime(path) > cutoff:
+                continue
+            self.compact(session_id)
+            compacted_at = os.path.getmtime(path)
+            archive_path = self._archive_path(session_id)
+            os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+            with open(path, "rb") as src, gzip.open(archive_path, "wb") as dst:
+                dst.write(src.read())
+            with self._lock:
+                # The session may have been resumed and written to since the checks above; its
+                # segment then stays live and the copy just made is dropped
+                if session_id in self._files or os.path.getmtime(path) != compacted_at:
+                    os.remove(archive_path)
+                    continue
+                os.remove(path)
+            self._meta.pop(session_id, None)
+            archived += 1
+        if archived:
+            logger.info(f"Archived {archived} idle session transcripts")
+        return archived
+
+    def _unarchive(self, session_id):
+        """Move an archived segment back so the session can continue"""
+        archive_path = self._archive_path(session_id)
+        if not os.path.exists(archive_path):
+            return
+        with gzip.open(archive_path, "rb") as src, open(self._path(session_id), "wb") as dst:
+            dst.write(src.read())
+        os.remove(archive_path)
+
+
+session_store = SessionStore()
+atexit.register(session_store.close)
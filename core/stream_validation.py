@@ -0,0 +1,77 @@
+"""Incremental checks on a mentor reply while it is still streaming.
+
+``StreamValidator.feed`` is called with each chunk and returns a verdict as soon as the reply
+can be judged, so the caller can close the stream instead of paying for the rest of it:
+
+- ``("abort", reason)``: a generic AI phrase or a near-duplicate of one of the agent's earlier
+  messages; discard and regenerate.
+- ``("truncate", text)``: a third sentence started; ``text`` is the complete first two
+  sentences, which is a valid reply on its own.
+"""
+import re
+
+from config.settings import (
+    SIMILARITY_THRESHOLD,
+    STREAM_MAX_SENTENCES,
+    STREAM_SIMILARITY_PREFIX_WORDS
+)
+
+# A sentence ends at . ! or ? followed by whitespace and the start of a new sentence
+SENTENCE_BOUNDARY = re.compile(r'[.!?]["\')\]]*\s+(?=["\'(\[]?[A-Z0-9])')
+ABBREVIATIONS = ("e.g.", "i.e.", "etc.", "vs.", "dr.", "mr.", "mrs.", "ms.", "st.")
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class StreamValidator:
+    def __init__(self, generic_phrases, previous_messages=(), max_sentences=STREAM_MAX_SENTENCES,
+                 similarity_threshold=SIMILARITY_THRESHOLD, prefix_words=STREAM_SIMILARITY_PREFIX_WORDS):
+        self.generic_phrases = [phrase.lower() for phrase in generic_phrases]
+        self.previous_messages = list(previous_messages)
+        self.previous_prefixes = [message.lower().split()[:prefix_words] for message in self.previous_messages]
+        self.max_sentences = max_sentences
+        self.similarity_threshold = similarity_threshold
+        self.prefix_words = prefix_words
+        self.text = ""
+        self._prefix_checked = False
+        self.similar_message = None
+
+    def feed(self, chunk):
+        """Add a streamed chunk; returns None while the reply still looks fine"""
+        self.text += chunk
+        lowered = self.text.lower()
+
+        for phrase in self.generic_phrases:
+            if phrase in lowered:
+                return ("abort", f"generic phrase '{phrase}'")
+
+        if not self._prefix_checked:
+            words = lowered.split()
+            # Judge the prefix once it is long enough and its last word is complete
+            if len(words) > self.prefix_words or (len(words) == self.prefix_words and chunk[-1:].isspace()):
+                self._prefix_checked = True
+                prefix = set(words[:self.prefix_words])
+                for message, previous in zip(self.previous_messages, self.previous_prefixes):
+                    if jaccard(prefix, set(previous)) > self.similarity_threshold:
+                        self.similar_message = message
+                        return ("abort", "near-duplicate of an earlier message")
+
+        boundaries = self._sentence_ends()
+        if len(boundaries) >= self.max_sentences:
+            return ("truncate", self.text[:boundaries[self.max_sentences - 1]].strip())
+        return None
+
+    def _sentence_ends(self):
+        """Offsets just past each completed sentence that is followed by another one"""
+        ends = []
+        for match in SENTENCE_BOUNDARY.finditer(self.text):
+            end = match.start() + len(match.group().rstrip())
+            last_word = self.text[:match.start() + 1].split()[-1].lower()
+            if last_word in ABBREVIATIONS:
+                continue
+            ends.append(end)
+        return ends
@@ -258,6 +258,6 @@ def render_enhanced_data_collection():
                 'help_seeking_behavior': help_seeking
             }
             
-            st.session_state.student_data = enhanced_data
+            roundtable_state().student_data = enhanced_data
             st.success("Enhanced student profile saved successfully!")
             return enhanced_data
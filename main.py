@@ -7,11 +7,19 @@ load_dotenv()
 # Import configuration
 from config.settings import APP_TITLE, PAGE_ICON
 from config.styles import MAIN_CSS
+from core.session_state import roundtable_state
 
 # Import page components
 from pages.data_input_backend import render_data_input_page
 from pages.data_showcase_enhanced import render_data_showcase_page
 from pages.roundtable import render_roundtable_page
+from utils.pdf_renderer import pdf_renderer
+
+@st.cache_resource
+def warm_up_pdf_renderer():
+    """Once per server process: start the PDF renderer before the first report needs it"""
+    pdf_renderer.warm_up()
+    return pdf_renderer.backend
 
 def main():
     """Main application function with streamlined 2-step flow + optional review"""
@@ -21,6 +29,7 @@ def main():
         page_icon=PAGE_ICON,
         layout="wide"
     )
+    warm_up_pdf_renderer()
     
     # Apply CSS styles
     st.markdown(MAIN_CSS, unsafe_allow_html=True)
@@ -39,7 +48,7 @@ def main():
         render_data_showcase_page()
     elif st.session_state.current_page == 'roundtable':
         # Ensure student data is available before rendering roundtable
-        if st.session_state.get('student_data'):
+        if roundtable_state().get('student_data'):
             render_roundtable_page()
         else:
             st.error("❌ No student data found. Please complete the previous steps first.")
@@ -52,7 +61,7 @@ def render_simple_navigation():
     # Navigation buttons
     col1, col2, col3 = st.columns(3)
     
-    has_data = st.session_state.get('student_data') is not None
+    has_data = roundtable_state().get('student_data') is not None
     current_page = st.session_state.current_page
     
     with col1:
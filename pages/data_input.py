@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 
+from core.session_state import roundtable_state
+
 def render_data_input_page():
     """Page 1: Data Input"""
     
@@ -310,7 +312,7 @@ def render_csv_upload_section():
                         # Clean up any NaN values
                         student_data = {k: (v if pd.notna(v) else '') for k, v in student_data.items()}
                         
-                        st.session_state.student_data = student_data
+                        roundtable_state().student_data = student_data
                         st.success("✅ Data imported successfully! Redirecting to profile showcase...")
                         
                         # Auto-advance to showcase page
@@ -490,7 +492,7 @@ def render_manual_entry_section():
                 }
                 
                 # Store in session state
-                st.session_state.student_data = student_data
+                roundtable_state().student_data = student_data
                 st.success("✅ **Student profile saved successfully!** Redirecting to profile showcase...")
                 
                 # Auto-advance to showcase page
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from backend.data_manager import data_manager
+from core.session_state import roundtable_state
 
 def add_red_theme_styling():
     """Add targeted red theme styling ONLY for the dropdown menu"""
@@ -164,11 +165,11 @@ def render_student_selector():
         st.info("Please check your data file and try again.")
     
     # Show navigation buttons if student data is loaded (outside the try-except to always show)
-    if st.session_state.get('student_data'):
+    if roundtable_state().get('student_data'):
         st.markdown("---")
         st.markdown("### 🚀 Student Loaded - Choose Next Step")
         
-        data = st.session_state.student_data
+        data = roundtable_state().student_data
         st.info(f"**Currently Selected:** {data['name']} ({data.get('gvc_id', 'Unknown ID')})")
         
         col1, col2 = st.columns(2)
@@ -190,7 +191,7 @@ def load_student_data(gvc_id: str):
         
         if student_data:
             # Store in session state
-            st.session_state.student_data = student_data
+            roundtable_state().student_data = student_data
             st.session_state.selected_gvc_id = gvc_id
             
             # Show success message
@@ -221,6 +222,7 @@ def load_student_data(gvc_id: str):
 
 def render_quick_actions():
     """Quick actions sidebar"""
+    state = roundtable_state()
     
     st.markdown("### ⚡ Quick Actions")
     
@@ -231,19 +233,18 @@ def render_quick_actions():
         st.rerun()
     
     # Clear current selection
-    if st.session_state.get('student_data'):
+    if state.get('student_data'):
         if st.button("🗑️ Clear Selection", use_container_width=True):
-            if 'student_data' in st.session_state:
-                del st.session_state.student_data
+            state.student_data = None
             if 'selected_gvc_id' in st.session_state:
                 del st.session_state.selected_gvc_id
             st.success("Selection cleared!")
             st.rerun()
     
     # Show current selection
-    if st.session_state.get('student_data'):
+    if state.get('student_data'):
         st.markdown("### 👤 Current Selection")
-        data = st.session_state.student_data
+        data = state.student_data
         st.info(f"**{data['name']}**\\n{data['gvc_id']} • {data['grade_level']}")
     
     # Data management
@@ -343,7 +344,7 @@ def render_manual_entry_form():
                     'additional_info': additional_info
                 }
                 
-                st.session_state.student_data = manual_data
+                roundtable_state().student_data = manual_data
                 st.session_state.manual_entry_mode = False
                 st.success(f"Using manual data for {name}")
                 
@@ -380,7 +381,7 @@ def render_manual_entry_form():
             }
             
             if data_manager.add_student(manual_data):
-                st.session_state.student_data = manual_data
+                roundtable_state().student_data = manual_data
                 st.session_state.manual_entry_mode = False
                 st.rerun()
 
@@ -12,17 +12,19 @@ import matplotlib.pyplot as plt
 import io
 import base64
 
+from core.session_state import roundtable_state
+
 def render_data_showcase_page():
     """Page 2: Modern Dashboard-style Student Profile"""
     
-    if not st.session_state.get('student_data'):
+    if not roundtable_state().get('student_data'):
         st.error("❌ No student data found. Please go back to Data Input and select a student.")
         if st.button("← Back to Data Input"):
             st.session_state.current_page = 'data_input'
             st.rerun()
         return
     
-    data = st.session_state.student_data
+    data = roundtable_state().student_data
     gvc_id = st.session_state.get('selected_gvc_id', data.get('gvc_id', 'Unknown'))
     
     # Add custom CSS for dashboard styling
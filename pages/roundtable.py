@@ -7,6 +7,11 @@ from datetime import datetime
 import json
 import tempfile
 import os
+import uuid
+
+from utils.chat_utils import Message
+from core.session_state import roundtable_state
+
 try:
     import streamlit.components.v1 as components
 except ImportError:
@@ -15,6 +20,7 @@ except ImportError:
 # Mock imports and fallback implementations
 try:
     from config.settings import AGENTS_INFO, MAX_AGENT_TURNS, ROUNDTABLE_CENTER, ROUNDTABLE_RADIUS
+    from config.settings import REPORT_JOB_POLL_SECONDS
 except ImportError:
     AGENTS_INFO = [
         {"name": "Academic Mentor", "avatar": "📚", "image": "avatars/academic_mentor.png", "expertise": "Academic guidance"},
@@ -31,6 +37,7 @@ except ImportError:
     MAX_AGENT_TURNS = 5
     ROUNDTABLE_CENTER = (50, 50)
     ROUNDTABLE_RADIUS = 40
+    REPORT_JOB_POLL_SECONDS = 1.0
 
 try:
     from config.styles import ROUNDTABLE_CSS
@@ -49,22 +56,19 @@ except ImportError:
     """
 
 try:
-    from core.session_manager import initialize_session_state
+    from core.session_store import session_store
 except ImportError:
+    session_store = None
+
+try:
+    from core.session_manager import initialize_session_state, cleanup_session_state
+except ImportError:
+    def cleanup_session_state():
+        """Nothing to trim without the session store"""
+
     def initialize_session_state(vectordb=None):
         """Mock session state initialization"""
-        if 'chat_history' not in st.session_state:
-            st.session_state.chat_history = []
-        if 'chat_running' not in st.session_state:
-            st.session_state.chat_running = False
-        if 'current_agent' not in st.session_state:
-            st.session_state.current_agent = None
-        if 'thinking_agent' not in st.session_state:
-            st.session_state.thinking_agent = None
-        if 'consecutive_agent_turns' not in st.session_state:
-            st.session_state.consecutive_agent_turns = 0
-        if 'agent_turn_in_progress' not in st.session_state:
-            st.session_state.agent_turn_in_progress = False
+        roundtable_state()
 
 try:
     from core.avatar_manager import create_role_to_image_mapping
@@ -82,7 +86,7 @@ except ImportError:
         st.markdown("*Collaborative Learning Experience*")
         
         # Add student profile section
-        student_data = st.session_state.get('student_data', {})
+        student_data = roundtable_state().get('student_data', {})
         if student_data:
             st.markdown("---")
             render_sidebar_student_profile(student_data)
@@ -260,11 +264,11 @@ except ImportError:
     
     def render_chat_history(role_to_image=None):
         """Mock chat history"""
-        if not st.session_state.get('chat_history'):
+        if not roundtable_state().get('chat_history'):
             st.info("💡 Start the discussion or ask a question to begin!")
             return
         
-        for message in st.session_state.chat_history[-10:]:
+        for message in roundtable_state().chat_history[-10:]:
             role = message.get("role", "Unknown")
             content = message.get("content", "")
             timestamp = message.get("timestamp", "")
@@ -288,9 +292,10 @@ except ImportError:
     
     def render_status_display():
         """Mock status display"""
-        current_agent = st.session_state.get('current_agent', 'None')
-        thinking_agent = st.session_state.get('thinking_agent', 'None')
-        chat_running = st.session_state.get('chat_running', False)
+        state = roundtable_state()
+        current_agent = state.get('current_agent', 'None')
+        thinking_agent = state.get('thinking_agent', 'None')
+        chat_running = state.get('chat_running', False)
         
         if thinking_agent and thinking_agent != 'None':
             st.info(f"🧠 {thinking_agent} is thinking...")
@@ -327,6 +332,11 @@ except ImportError:
                 </div>
                 """, unsafe_allow_html=True)
 
+try:
+    from core.cancellation import cancellations
+except ImportError:
+    cancellations = None
+
 try:
     from utils.vector_store import load_vectorstore, get_context_chunks
 except ImportError:
@@ -344,12 +354,13 @@ logger = logging.getLogger(__name__)
 # Mock additional required functions
 def reset_chat_session():
     """Reset chat session"""
-    st.session_state.chat_history = []
-    st.session_state.consecutive_agent_turns = 0
-    st.session_state.chat_running = False
-    st.session_state.current_agent = None
-    st.session_state.thinking_agent = None
-    st.session_state.agent_turn_in_progress = False
+    state = roundtable_state()
+    state.chat_history = []
+    state.consecutive_agent_turns = 0
+    state.chat_running = False
+    state.current_agent = None
+    state.thinking_agent = None
+    state.agent_turn_in_progress = False
 
 def add_message_to_history(content, agent_name):
     """Mock message tracking"""
@@ -435,8 +446,8 @@ def _render_simple_roundtable():
     for i, agent in enumerate(AGENTS_INFO):
         with cols[i % len(cols)]:
             # Get agent state
-            is_thinking = agent["name"] == st.session_state.get('thinking_agent', None)
-            is_active = agent["name"] == st.session_state.get('current_agent', None) and not is_thinking
+            is_thinking = agent["name"] == roundtable_state().get('thinking_agent', None)
+            is_active = agent["name"] == roundtable_state().get('current_agent', None) and not is_thinking
             
             # Color based on state
             if is_thinking:
@@ -607,14 +618,15 @@ def _truncate_text(text, max_length):
 
 def render_roundtable_controls():
     """Render roundtable control buttons in sidebar"""
+    state = roundtable_state()
     st.markdown("### 🎮 Discussion Controls")
     
     # Get current state
-    chat_running = st.session_state.get('chat_running', False)
-    current_agent = st.session_state.get('current_agent', 'None')
-    thinking_agent = st.session_state.get('thinking_agent', 'None')
-    consecutive_turns = st.session_state.get('consecutive_agent_turns', 0)
-    has_chat_history = bool(st.session_state.get('chat_history', []))
+    chat_running = state.get('chat_running', False)
+    current_agent = state.get('current_agent', 'None')
+    thinking_agent = state.get('thinking_agent', 'None')
+    consecutive_turns = state.get('consecutive_agent_turns', 0)
+    has_chat_history = bool(state.get('chat_history', []))
     
     # Main control buttons
     col1, col2 = st.columns(2)
@@ -676,11 +688,11 @@ def render_roundtable_controls():
         st.rerun()
     
     if st.button("🎯 Focus on Academic", use_container_width=True):
-        st.session_state.current_agent = "Academic Mentor"
+        state.current_agent = "Academic Mentor"
         st.rerun()
     
     if st.button("💼 Focus on Career", use_container_width=True):
-        st.session_state.current_agent = "Career Guide"
+        state.current_agent = "Career Guide"
         st.rerun()
 
 def render_visual_roundtable():
@@ -714,9 +726,9 @@ def generate_roundtable_html():
         y = 50 + radius * math.sin(math.radians(angle))
         
         # Determine avatar state
-        is_thinking = agent["name"] == st.session_state.get('thinking_agent', None)
+        is_thinking = agent["name"] == roundtable_state().get('thinking_agent', None)
         is_active = (
-            agent["name"] == st.session_state.get('current_agent', None) 
+            agent["name"] == roundtable_state().get('current_agent', None) 
             and not is_thinking
         )
         
@@ -901,18 +913,19 @@ def render_chat_interface():
 
 def display_chat_history():
     """Display the chat message history"""
-    if not st.session_state.get('chat_history'):
+    state = roundtable_state()
+    if not state.get('chat_history'):
         st.info("💡 Start the discussion or ask a question to begin!")
         return
     
     # Show recent messages (limit to last 10 for performance)
-    recent_messages = st.session_state.chat_history[-10:]
+    recent_messages = state.chat_history[-10:]
     
     for message in recent_messages:
         render_chat_message(message)
     
-    if len(st.session_state.chat_history) > 10:
-        st.caption(f"Showing last 10 of {len(st.session_state.chat_history)} messages")
+    if len(state.chat_history) > 10:
+        st.caption(f"Showing last 10 of {len(state.chat_history)} messages")
 
 def render_chat_message(message):
     """Render a single chat message"""
@@ -955,14 +968,15 @@ def render_chat_message(message):
 
 def start_roundtable_discussion():
     """Start the roundtable discussion using existing chat logic"""
+    state = roundtable_state()
     # Initialize discussion state
-    st.session_state.chat_running = True
-    st.session_state.consecutive_agent_turns = 0
-    st.session_state.agent_turn_in_progress = False
+    state.chat_running = True
+    state.consecutive_agent_turns = 0
+    state.agent_turn_in_progress = False
     
     # Get student name for personalized welcome - check multiple possible locations
     student_name = "Student"
-    student_data = st.session_state.get('student_data', {})
+    student_data = state.get('student_data', {})
     if not student_data:
         student_data = st.session_state.get('user_profile', {})
     
@@ -976,8 +990,8 @@ def start_roundtable_discussion():
     
     # Set first agent (Academic Mentor as default)
     if AGENTS_INFO:
-        st.session_state.current_agent = AGENTS_INFO[0]["name"]
-        st.session_state.thinking_agent = None
+        state.current_agent = AGENTS_INFO[0]["name"]
+        state.thinking_agent = None
         
         # Add initial agent introduction
         first_agent = AGENTS_INFO[0]["name"]
@@ -990,12 +1004,13 @@ def start_roundtable_discussion():
 
 def resume_roundtable_discussion():
     """Resume a paused roundtable discussion"""
-    st.session_state.chat_running = True
-    st.session_state.agent_turn_in_progress = False
+    state = roundtable_state()
+    state.chat_running = True
+    state.agent_turn_in_progress = False
     
     # Get student name - check multiple possible locations
     student_name = "Student"
-    student_data = st.session_state.get('student_data', {})
+    student_data = state.get('student_data', {})
     if not student_data:
         student_data = st.session_state.get('user_profile', {})
     
@@ -1008,11 +1023,18 @@ def resume_roundtable_discussion():
     
     st.success("▶️ Discussion resumed!")
 
+def _cancel_inflight(reason):
+    """Abort the mentor reply currently being generated for this session"""
+    if cancellations is not None:
+        cancellations.cancel(roundtable_state().get('session_id'), reason)
+
 def pause_roundtable_discussion():
     """Pause the roundtable discussion"""
-    st.session_state.chat_running = False
-    st.session_state.thinking_agent = None
-    st.session_state.agent_turn_in_progress = False
+    state = roundtable_state()
+    _cancel_inflight("pause")
+    state.chat_running = False
+    state.thinking_agent = None
+    state.agent_turn_in_progress = False
     
     # Add pause message
     pause_message = "⏸️ Discussion paused. You can resume anytime or ask questions directly."
@@ -1022,21 +1044,24 @@ def pause_roundtable_discussion():
 
 def stop_roundtable_discussion():
     """Stop the roundtable discussion"""
-    st.session_state.chat_running = False
-    st.session_state.thinking_agent = None
-    st.session_state.current_agent = None
+    state = roundtable_state()
+    _cancel_inflight("stop")
+    state.chat_running = False
+    state.thinking_agent = None
+    state.current_agent = None
 
 def reset_roundtable_completely():
     """Reset the entire roundtable state"""
     reset_chat_session()
-    st.session_state.chat_history = []
+    roundtable_state().chat_history = []
 
 def advance_to_next_agent():
     """Advance to the next agent in the roundtable"""
+    state = roundtable_state()
     if not AGENTS_INFO:
         return
     
-    current_agent = st.session_state.get('current_agent')
+    current_agent = state.get('current_agent')
     current_index = 0
     
     # Find current agent index
@@ -1050,72 +1075,63 @@ def advance_to_next_agent():
     next_agent = AGENTS_INFO[next_index]["name"]
     
     # Set thinking state first
-    st.session_state.thinking_agent = next_agent
-    st.session_state.current_agent = None
+    state.thinking_agent = next_agent
+    state.current_agent = None
     
     # Brief delay for visual effect
     time.sleep(0.5)
     
     # Set as active
-    st.session_state.current_agent = next_agent
-    st.session_state.thinking_agent = None
+    state.current_agent = next_agent
+    state.thinking_agent = None
 
 def add_user_message(content):
     """Add a user message to chat history"""
-    message = {
-        "role": "User",
-        "content": content,
-        "timestamp": datetime.now().strftime("%H:%M:%S")
-    }
-    
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
+    message = Message("User", content, datetime.now().strftime("%H:%M:%S"))
     
-    st.session_state.chat_history.append(message)
+    roundtable_state().chat_history.append(message)
+    _persist_message(message)
     
     # Reset consecutive agent turns when user speaks
-    st.session_state.consecutive_agent_turns = 0
+    roundtable_state().consecutive_agent_turns = 0
 
 def add_system_message(content):
     """Add a system message to chat history"""
-    message = {
-        "role": "System",
-        "content": content,
-        "timestamp": datetime.now().strftime("%H:%M:%S")
-    }
+    message = Message("System", content, datetime.now().strftime("%H:%M:%S"))
     
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
-    
-    st.session_state.chat_history.append(message)
+    roundtable_state().chat_history.append(message)
+    _persist_message(message)
 
 def add_agent_message(agent_name, content):
     """Add an agent message to chat history"""
-    message = {
-        "role": agent_name,
-        "content": content,
-        "timestamp": datetime.now().strftime("%H:%M:%S")
-    }
-    
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
+    message = Message(agent_name, content, datetime.now().strftime("%H:%M:%S"))
     
-    st.session_state.chat_history.append(message)
+    roundtable_state().chat_history.append(message)
+    _persist_message(message)
     
     # Track for similarity checking
     add_message_to_history(content, agent_name)
 
+def _persist_message(message):
+    """Append a message to this session's stored transcript"""
+    if session_store is not None:
+        session_store.append(roundtable_state().get('session_id'), message, roundtable_state().get('student_data'))
+
 def clear_chat_history():
     """Clear the chat history"""
-    st.session_state.chat_history = []
-    st.session_state.consecutive_agent_turns = 0
+    state = roundtable_state()
+    state.chat_history = []
+    if session_store is not None:
+        session_store.mark_reset(state.get('session_id'))
+    state.consecutive_agent_turns = 0
 
 def process_agent_interactions():
     """Process agent interactions using existing code logic"""
+    state = roundtable_state()
     try:
         # Check if we should continue
-        if st.session_state.consecutive_agent_turns >= MAX_AGENT_TURNS:
-            st.session_state.chat_running = False
+        if state.consecutive_agent_turns >= MAX_AGENT_TURNS:
+            state.chat_running = False
             st.warning(f"⏸️ Agents have paused after {MAX_AGENT_TURNS} consecutive turns. Ask a question to continue!")
             return
         
@@ -1124,7 +1140,7 @@ def process_agent_interactions():
             st.info("🔄 Reset stuck agent state")
         
         # Process agent turn if applicable
-        if st.session_state.get('chat_running') and not st.session_state.get('agent_turn_in_progress'):
+        if state.get('chat_running') and not state.get('agent_turn_in_progress'):
             # Mock get_context_chunks function for now
             def mock_get_context_chunks():
                 return ["Context chunk 1", "Context chunk 2"]
@@ -1161,8 +1177,8 @@ def _generate_roundtable_html():
         y = 50 + radius * math.sin(math.radians(angle))
         
         # Get agent state
-        is_thinking = agent["name"] == st.session_state.get('thinking_agent', None)
-        is_active = agent["name"] == st.session_state.get('current_agent', None) and not is_thinking
+        is_thinking = agent["name"] == roundtable_state().get('thinking_agent', None)
+        is_active = agent["name"] == roundtable_state().get('current_agent', None) and not is_thinking
         
         # Determine style based on state
         if is_thinking:
@@ -1503,6 +1519,130 @@ def _create_center_logo_with_image():
     </div>
     """
 
+def _submit_report_job(chat_history, student_data):
+    """Queue report generation in the background and remember the job in this session"""
+    state = roundtable_state()
+    from agents.mentor_registry import mentor_registry
+    from core.report_jobs import report_job_queue
+    from utils.vector_store import get_context_chunks
+    
+    # The shared generator, on the session's downgraded model if its budget ran out
+    orchestrator = st.session_state.get('orchestrator')
+    report_generator = orchestrator.agents["Report Generator"] if orchestrator is not None \
+        else mentor_registry.get("Report Generator")
+    
+    # Reuse the session's rolling conversation summary if available
+    memory = getattr(orchestrator, 'memory', None)
+    
+    # Use student data to generate relevant context query
+    context_query = f"student development education mentoring {student_data.get('interests', '')} {student_data.get('goals', '')}"
+    
+    if state.session_id is None:
+        state.session_id = uuid.uuid4().hex
+    
+    # Long sessions keep only recent messages in memory; the report covers the whole discussion
+    stored = session_store.transcript(state.session_id) if session_store is not None else []
+    if len(stored) > len(chat_history):
+        chat_history = stored
+    job_id = report_job_queue.submit(
+        state.session_id, report_generator, student_data, chat_history,
+        context_fn=get_context_chunks, context_query=context_query, memory=memory
+    )
+    st.session_state.setdefault('report_job_ids', []).append(job_id)
+    st.toast("🔄 Report generation started - you can keep chatting meanwhile")
+    st.rerun()
+
+def _render_report_job_progress():
+    """Show progress of this session's running report jobs; reruns the page once one finishes"""
+    from core.report_jobs import report_job_queue
+    from core.session_manager import collect_finished_report_jobs
+    
+    job_count = len(st.session_state.get('report_job_ids', []))
+    pending = collect_finished_report_jobs()
+    
+    for job_id in pending:
+        status = report_job_queue.status(job_id)
+        if status:
+            st.progress(
+                status['progress'],
+                text=f"🔄 {status['stage_label']}... ({status['elapsed']:.0f}s)"
+            )
+    
+    if len(pending) < job_count:
+        st.rerun()
+
+def _render_report_artifact(artifact, report_format, student_name, chat_history, student_data):
+    """Display a finished report from the session's artifact store"""
+    finished_at = datetime.fromtimestamp(artifact['created_at'])
+    timestamp = finished_at.strftime('%Y%m%d_%H%M%S')
+    
+    if artifact['html']:
+        # Display based on format selection
+        if report_format in ["HTML Preview", "Both"]:
+            st.success(f"✅ Report generated successfully at {finished_at.strftime('%H:%M:%S')}!")
+            if artifact['message_count'] < len(chat_history):
+                st.caption(f"This report covers the first {artifact['message_count']} messages. Regenerate to include the latest discussion.")
+            st.markdown("### 📖 Professional Report Preview")
+            
+            # Use components if available, otherwise show download option
+            if components:
+                components.html(artifact['html'], height=700, scrolling=True)
+            else:
+                st.info("📄 HTML preview not available. Please download the report to view.")
+                st.download_button(
+                    label="📥 Download HTML Report",
+                    data=artifact['html'],
+                    file_name=f"GVC_Report_{student_name}_{timestamp}.html",
+                    mime="text/html",
+                    use_container_width=True
+                )
+        
+        if report_format in ["PDF Download", "Both"] and artifact['pdf']:
+            # Create download button for PDF
+            st.download_button(
+                label="📥 Download Professional PDF Report",
+                data=artifact['pdf'],
+                file_name=f"GVC_Roundtable_Report_{student_name}_{timestamp}.pdf",
+                mime="application/pdf",
+                type="primary",
+                use_container_width=True
+            )
+        elif report_format in ["PDF Download", "Both"] and not artifact['pdf']:
+            st.warning("⚠️ PDF generation encountered issues. HTML preview is available.")
+            if report_format == "PDF Download":
+                st.markdown("### 📖 Report Preview (HTML)")
+                if components:
+                    components.html(artifact['html'], height=700, scrolling=True)
+                else:
+                    st.download_button(
+                        label="📥 Download HTML Report",
+                        data=artifact['html'],
+                        file_name=f"GVC_Report_{student_name}_{timestamp}.html",
+                        mime="text/html",
+                        use_container_width=True
+                    )
+    else:
+        st.error(f"❌ {artifact['message']}")
+        st.info("Please ensure all required dependencies are installed and try again.")
+        
+        # Show debug info in expander
+        with st.expander("🔍 Debug Information"):
+            st.write(f"**Error:** {artifact['message']}")
+            st.write(f"**Chat History Length:** {artifact['message_count']}")
+            st.write(f"**Student Data Keys:** {list(student_data.keys())}")
+            if artifact.get('error_details'):
+                st.code(artifact['error_details'])
+    
+    # Additional options
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🔄 Regenerate Report", type="secondary", use_container_width=True):
+            _submit_report_job(chat_history, student_data)
+    with col2:
+        if st.button("📧 Email Report", type="secondary", use_container_width=True):
+            st.info("📧 Email functionality coming soon!")
+
 def render_report_generation_section():
     """Render the report generation section at the end of the roundtable page"""
     # Add custom CSS for report section
@@ -1564,8 +1704,8 @@ def render_report_generation_section():
     """, unsafe_allow_html=True)
     
     # Check if we have required data
-    chat_history = st.session_state.get('chat_history', [])
-    student_data = st.session_state.get('student_data', {})
+    chat_history = roundtable_state().get('chat_history', [])
+    student_data = roundtable_state().get('student_data', {})
     
     if not chat_history:
         st.markdown("""
@@ -1614,96 +1754,21 @@ def render_report_generation_section():
     st.markdown("---")
     
     if st.button("🚀 Generate Report", type="primary", use_container_width=True):
-        with st.spinner("🔄 Generating your personalized report..."):
-            try:
-                # Import ReportGenerator and vector store utilities
-                from agents.report_generator import ReportGenerator
-                from utils.vector_store import get_context_chunks
-                
-                # Initialize report generator
-                report_generator = ReportGenerator()
-                
-                # Get context chunks from vector store
-                try:
-                    # Use student data and chat history to generate relevant context query
-                    context_query = f"student development education mentoring {student_data.get('interests', '')} {student_data.get('goals', '')}"
-                    context_chunks = get_context_chunks(context_query, k=5)
-                except Exception as context_error:
-                    st.warning(f"Could not load context from vector store: {context_error}")
-                    context_chunks = "GVC AI Mentor Roundtable Discussion Context"
-                
-                # Generate enhanced report with professional CSV-style formatting
-                report_result = report_generator.generate_csv_style_report(
-                    chat_history, student_data, context_chunks
-                )
-                
-                if report_result['success']:
-                    # Display based on format selection
-                    if report_format in ["HTML Preview", "Both"]:
-                        st.success("✅ Report generated successfully!")
-                        st.markdown("### 📖 Professional Report Preview")
-                        
-                        # Use components if available, otherwise show download option
-                        if components:
-                            components.html(report_result['html'], height=700, scrolling=True)
-                        else:
-                            st.info("📄 HTML preview not available. Please download the report to view.")
-                            st.download_button(
-                                label="📥 Download HTML Report",
-                                data=report_result['html'],
-                                file_name=f"GVC_Report_{student_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
-                                mime="text/html",
-                                use_container_width=True
-                            )
-                    
-                    if report_format in ["PDF Download", "Both"] and report_result['pdf']:
-                        # Create download button for PDF
-                        st.download_button(
-                            label="📥 Download Professional PDF Report",
-                            data=report_result['pdf'],
-                            file_name=f"GVC_Roundtable_Report_{student_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                            mime="application/pdf",
-                            type="primary",
-                            use_container_width=True
-                        )
-                    elif report_format in ["PDF Download", "Both"] and not report_result['pdf']:
-                        st.warning("⚠️ PDF generation encountered issues. HTML preview is available.")
-                        if report_format == "PDF Download":
-                            st.markdown("### 📖 Report Preview (HTML)")
-                            if components:
-                                components.html(report_result['html'], height=700, scrolling=True)
-                            else:
-                                st.download_button(
-                                    label="📥 Download HTML Report",
-                                    data=report_result['html'],
-                                    file_name=f"GVC_Report_{student_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
-                                    mime="text/html",
-                                    use_container_width=True
-                                )
-                
-                else:
-                    st.error(f"❌ {report_result['message']}")
-                
-                # Additional options
-                st.markdown("---")
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("🔄 Regenerate Report", type="secondary", use_container_width=True):
-                        st.rerun()
-                with col2:
-                    if st.button("📧 Email Report", type="secondary", use_container_width=True):
-                        st.info("📧 Email functionality coming soon!")
-                    
-            except Exception as e:
-                st.error(f"❌ Error generating report: {e}")
-                st.info("Please ensure all required dependencies are installed and try again.")
-                
-                # Show debug info in expander
-                with st.expander("🔍 Debug Information"):
-                    st.write(f"**Error:** {str(e)}")
-                    st.write(f"**Chat History Length:** {len(chat_history)}")
-                    st.write(f"**Student Data Keys:** {list(student_data.keys())}")
-                    st.code(traceback.format_exc())
+        _submit_report_job(chat_history, student_data)
+    
+    # Running jobs are polled on their own, chatting continues meanwhile
+    if st.session_state.get('report_job_ids'):
+        if hasattr(st, "fragment"):
+            st.fragment(run_every=REPORT_JOB_POLL_SECONDS)(_render_report_job_progress)()
+        else:
+            _render_report_job_progress()
+            if st.button("🔄 Refresh Report Status", use_container_width=True):
+                st.rerun()
+    
+    # Latest finished report is kept in the session, so it survives reruns
+    artifacts = st.session_state.get('report_artifacts', [])
+    if artifacts:
+        _render_report_artifact(artifacts[0], report_format, student_name, chat_history, student_data)
     
     # Additional info
     st.markdown("---")
@@ -1728,11 +1793,14 @@ def render_roundtable_page():
         # Initialize session state with vectordb
         initialize_session_state(vectordb)
         
+        # Keep only the recent transcript in memory; the session store has the rest
+        cleanup_session_state()
+        
         # Create role to image mapping
         role_to_image = create_role_to_image_mapping()
         
         # Load student data from session state if available
-        student_data = st.session_state.get('student_data', {})
+        student_data = roundtable_state().get('student_data', {})
         if not student_data:
             # Try to load from other possible session state keys
             student_data = st.session_state.get('user_profile', {})
@@ -0,0 +1,208 @@
+"""Unattended roundtable simulation for whole cohorts.
+
+Runs N-turn mentor roundtables for many students in parallel and saves each transcript:
+
+    python simulate_roundtables.py --all --turns 10 --output-dir transcripts/
+    python simulate_roundtables.py --ids GVC001770 GVC001772 --concurrency 4 --rpm 60
+    python simulate_roundtables.py --all --rpm 120 --provider-rpm api.together.xyz=30
+
+Every agent turn waits for a slot under the global concurrency limit, and every LLM request a
+roundtable makes (speaker selection and hedges included) for capacity at its provider's rate
+limiter: each provider gets --rpm unless --provider-rpm gives it its own. Transcripts are checkpointed after each turn, so an interrupted
+run resumes mid-roundtable. The output directory can be fed to batch_reports.py via
+--transcripts-dir.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents.agent_orchestrator import AgentOrchestrator
+from backend.data_manager import data_manager
+from core.roundtable_engine import RoundtableEngine
+from core.session_state import SessionState
+from utils.rate_limit import configure_rate_limits, provider_name
+
+logger = logging.getLogger("simulate_roundtables")
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    """Atomic write so a crash never leaves a half-written transcript"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+def opening_message(student_data):
+    """A first student message built from the profile"""
+    return (
+        f"Hi, I'm {student_data.get('name', 'a student')}. "
+        f"My goal: {student_data.get('goals', 'to grow')}. "
+        f"What I find hard: {student_data.get('challenges', 'staying consistent')}."
+    )
+
+
+class Simulation:
+    """Shared limits and bookkeeping for one simulation run"""
+
+    def __init__(self, args):
+        self.args = args
+        self.turn_slots = asyncio.Semaphore(args.concurrency)
+        self.turns_done = 0
+        self.started = time.time()
+        # Every request goes through its provider's limiter, so --rpm counts requests rather than turns
+        configure_rate_limits(requests_per_minute=args.rpm, burst_seconds=self.burst_seconds(args.rpm))
+        for base, rpm in args.provider_rpm:
+            configure_rate_limits(provider_name(base), requests_per_minute=rpm, burst_seconds=self.burst_seconds(rpm))
+
+    def burst_seconds(self, rpm):
+        return (self.args.burst or max(1.0, rpm / 60)) * 60 / rpm if rpm else None
+
+    def report_progress(self, gvc_id, turn):
+        self.turns_done += 1
+        elapsed = time.time() - self.started
+        sys.stderr.write(
+            f"\r{self.turns_done} turns done ({self.turns_done / max(elapsed, 1e-6) * 60:.0f}/min) | "
+            f"last: {gvc_id} turn {turn}/{self.args.turns} "
+        )
+        sys.stderr.flush()
+
+    async def run_student(self, gvc_id, student_data):
+        path = os.path.join(self.args.output_dir, f"{gvc_id}.json")
+        checkpoint = load_checkpoint(path)
+        if checkpoint and checkpoint.get("status") == "done" and not self.args.force:
+            return "skipped"
+        if self.args.force or not checkpoint:
+            checkpoint = {"gvc_id": gvc_id, "student_data": student_data, "chat_history": [], "turns": 0}
+
+        orchestrator = AgentOrchestrator()
+        state = SessionState(
+            student_data=student_data,
+            chat_history=checkpoint["chat_history"],
+            session_id=f"simulation-{gvc_id}"
+        )
+        engine = RoundtableEngine(orchestrator, state=state, context_fn=self.context_fn)
+
+        # Rebuild the orchestrator's participation tracking when resuming
+        for msg in state.chat_history:
+            if msg.get("role") in orchestrator.agent_order:
+                orchestrator.update_conversation_state(msg["role"], msg.get("content", ""))
+
+        if self.args.student_opening and not state.chat_history:
+            await engine.user_says(opening_message(student_data), respond=False)
+
+        state.chat_running = True
+        while checkpoint["turns"] < self.args.turns:
+            # The engine pauses every few turns; resume like the UI's Resume button
+            if not state.chat_running or state.consecutive_agent_turns >= engine.max_agent_turns:
+                state.chat_running = True
+                state.consecutive_agent_turns = 0
+
+            async with self.turn_slots:
+                message = await engine.step()
+            if message is None:
+                checkpoint.update(status="failed", error="Agent produced no message")
+                save_checkpoint(path, checkpoint)
+                return "failed"
+
+            checkpoint["turns"] += 1
+            checkpoint.update(chat_history=[msg.to_dict() for msg in state.chat_history], status="running", updated_at=time.time())
+            save_checkpoint(path, checkpoint)
+            self.report_progress(gvc_id, checkpoint["turns"])
+
+        checkpoint.update(status="done", updated_at=time.time())
+        save_checkpoint(path, checkpoint)
+        return "done"
+
+    def context_fn(self, query, k=3):
+        if self.args.no_context:
+            return ""
+        from utils.vector_store import get_context_chunks
+        return get_context_chunks(query, k=k)
+
+    async def run_student_safely(self, gvc_id, student_data):
+        try:
+            return await self.run_student(gvc_id, student_data)
+        except Exception as e:
+            logger.error(f"{gvc_id}: simulation failed: {e}")
+            return "failed"
+
+
+async def run_simulations(args):
+    gvc_ids = data_manager.get_all_gvc_ids() if args.all else args.ids
+    students = {}
+    for gvc_id in gvc_ids:
+        student_data = data_manager.get_student_by_gvc_id(gvc_id)
+        if student_data is None:
+            logger.warning(f"Unknown GVC ID skipped: {gvc_id}")
+            continue
+        students[gvc_id] = student_data
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    simulation = Simulation(args)
+    print(f"Simulating {len(students)} roundtables of {args.turns} turns "
+          f"(concurrency {args.concurrency}, {args.rpm} requests/min)", file=sys.stderr)
+
+    results = await asyncio.gather(*(
+        simulation.run_student_safely(gvc_id, student_data) for gvc_id, student_data in students.items()
+    ))
+    sys.stderr.write("\n")
+
+    summary = {status: results.count(status) for status in ("done", "skipped", "failed")}
+    print(f"Finished: {summary['done']} done, {summary['skipped']} already complete, "
+          f"{summary['failed']} failed. Transcripts in {args.output_dir}", file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+def provider_rpm(value):
+    base, sep, rpm = value.rpartition("=")
+    try:
+        if not sep or not base:
+            raise ValueError(value)
+        return ("//" + base if "//" not in base else base), float(rpm)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HOST=RPM, got {value!r}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run unattended mentor roundtables for many students")
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--ids", nargs="+", help="GVC IDs to simulate")
+    selection.add_argument("--all", action="store_true", help="simulate every student in the roster")
+    parser.add_argument("--turns", type=int, default=10, help="agent turns per roundtable")
+    parser.add_argument("--output-dir", default="transcripts", help="where <gvc_id>.json transcripts are checkpointed")
+    parser.add_argument("--concurrency", type=int, default=16, help="agent turns in flight across all roundtables")
+    parser.add_argument("--rpm", type=float, default=120,
+                        help="LLM requests per minute allowed per provider across the run (0 for no limit)")
+    parser.add_argument("--provider-rpm", type=provider_rpm, action="append", default=[], metavar="HOST=RPM",
+                        help="requests per minute for one provider, given by host or base URL; repeatable")
+    parser.add_argument("--burst", type=float, default=None, help="requests that may go out at once (defaults to one second of --rpm)")
+    parser.add_argument("--student-opening", action="store_true", help="start each roundtable with a message from the student")
+    parser.add_argument("--no-context", action="store_true", help="skip vector store retrieval")
+    parser.add_argument("--force", action="store_true", help="restart roundtables that already have a transcript")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    return asyncio.run(run_simulations(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
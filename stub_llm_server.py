@@ -0,0 +1,285 @@
+"""Local OpenAI-compatible stub LLM server for offline load and latency testing.
+
+Serves /v1/chat/completions (plain and streaming) and /v1/models with canned mentor replies,
+so the full roundtable can be exercised without network access or API spend:
+
+    python stub_llm_server.py --port 8001 --latency lognormal:0.6,0.4 --tokens-per-sec 80 --error-rate 0.02
+    LLM_API_BASE=http://localhost:8001/v1 LLM_API_KEY=stub streamlit run main.py
+
+Latency specs (seconds until the first token):
+    fixed:0.5   uniform:0.2,1.5   normal:0.8,0.2   lognormal:MU,SIGMA (of the underlying normal)
+"""
+import argparse
+import json
+import logging
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("stub_llm_server")
+
+MENTOR_REPLIES = [
+    "Building on that point, the student's curiosity is a real strength that deserves a structured outlet. "
+    "I'd suggest they pick one small project this month and share their progress with a mentor every week.",
+    "I agree with the previous mentor, and I'd add that consistency matters more than intensity at this stage. "
+    "A simple weekly planner with three clear priorities would help them turn goals into daily habits.",
+    "That's a thoughtful observation, and it connects well with the student's interest in working with others. "
+    "Joining a club or team where they can take on a small leadership role would build confidence quickly.",
+    "The challenges they describe are common, and it's encouraging that they're already aware of them. "
+    "Setting aside twenty minutes each evening for reflection would help them notice what's working.",
+    "I'd like to highlight how their interests could open doors to several future paths. "
+    "Talking to two professionals in fields they're curious about would give them a realistic picture.",
+    "Their goals are ambitious in a good way, and breaking them into milestones will make them manageable. "
+    "A monthly check-in with a parent or teacher would keep them accountable without adding pressure.",
+]
+
+SUMMARY_REPLY = (
+    "The mentors discussed the student's strengths, interests and current challenges, "
+    "and recommended small, consistent steps with regular check-ins."
+)
+
+CANDIDATE_PATTERN = re.compile(r"Available mentors:\s*(.+)")
+JSON_KEY_PATTERN = re.compile(r'"(\w+)" \((array of strings|string)\)')
+PANEL_SPEAKER_PATTERN = re.compile(r"^- ([^:\n]+):", re.MULTILINE)  # "- <mentor>: <persona>" lines
+
+
+class LatencyModel:
+    """Samples time-to-first-token from a named distribution"""
+
+    def __init__(self, spec):
+        name, _, params = spec.partition(":")
+        self.name = name
+        self.params = [float(p) for p in params.split(",") if p]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if expected.get(name) != len(self.params):
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+
+    def sample(self):
+        if self.name == "fixed":
+            return self.params[0]
+        if self.name == "uniform":
+            return random.uniform(*self.params)
+        if self.name == "normal":
+            return max(0.0, random.gauss(*self.params))
+        return random.lognormvariate(*self.params)
+
+
+def count_tokens(text):
+    """Rough token estimate (about 4 characters per token)"""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def message_text(messages, role=None):
+    return "\n".join(
+        str(m.get("content") or "") for m in messages if role is None or m.get("role") == role
+    )
+
+
+def canned_reply(body):
+    """Pick a reply that fits the kind of request the app is making"""
+    messages = body.get("messages", [])
+    prompt = message_text(messages)
+
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        if "MENTORS, IN SPEAKING ORDER:" in prompt:
+            # Panel batch: one message per listed mentor, in the order given
+            section = prompt.split("MENTORS, IN SPEAKING ORDER:", 1)[1].split("\n\n", 1)[0]
+            speakers = [name.strip() for name in PANEL_SPEAKER_PATTERN.findall(section)]
+            replies = random.sample(MENTOR_REPLIES, min(len(speakers), len(MENTOR_REPLIES)))
+            return json.dumps({"messages": [
+                {"mentor": speaker, "message": replies[i % len(replies)]} for i, speaker in enumerate(speakers)
+            ]})
+        keys = JSON_KEY_PATTERN.findall(prompt)
+        return json.dumps({
+            key: [MENTOR_REPLIES[0].split(". ")[0] + "."] if kind == "array of strings" else MENTOR_REPLIES[1]
+            for key, kind in keys
+        } or {"summary": SUMMARY_REPLY})
+
+    candidates = CANDIDATE_PATTERN.search(prompt)
+    if candidates and "mentor's exact name" in prompt:
+        return random.choice([c.strip() for c in candidates.group(1).split(",") if c.strip()])
+
+    if "summar" in message_text(messages, "system").lower():
+        return SUMMARY_REPLY
+    return random.choice(MENTOR_REPLIES)
+
+
+def split_stream_chunks(text):
+    """Word-sized pieces, the granularity providers typically stream at"""
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+class StubConfig:
+    def __init__(self, latency, tokens_per_sec, error_rate, error_codes):
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.error_codes = error_codes
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, failed):
+        with self.lock:
+            self.requests += 1
+            self.errors += int(failed)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "StubLLM/1.0"
+    protocol_version = "HTTP/1.1"
+    config = None  # set by make_server
+
+    def log_message(self, fmt, *args):
+        logger.debug("%s - %s", self.address_string(), fmt % args)
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub-mentor", "object": "model"}]})
+        elif self.path.rstrip("/") in ("", "/health"):
+            self._send_json(200, {"status": "ok", "requests": self.config.requests, "errors": self.config.errors})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        config = self.config
+        time.sleep(config.latency.sample())
+        if random.random() < config.error_rate:
+            config.record(failed=True)
+            status = random.choice(config.error_codes)
+            self._send_json(status, {"error": {"message": "Injected stub error", "type": "stub_error", "code": status}})
+            return
+
+        reply = canned_reply(body)
+        usage = {
+            "prompt_tokens": count_tokens(message_text(body.get("messages", []))),
+            "completion_tokens": count_tokens(reply),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = body.get("model", "stub-mentor")
+
+        if body.get("stream"):
+            self._stream_reply(completion_id, model, reply)
+        else:
+            time.sleep(usage["completion_tokens"] / config.tokens_per_sec)
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+        config.record(failed=False)
+
+    def _stream_reply(self, completion_id, model, reply):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for piece in split_stream_chunks(reply):
+                time.sleep(count_tokens(piece) / self.config.tokens_per_sec)
+                event({"content": piece})
+            event({}, finish_reason="stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("Client disconnected mid-stream")
+
+
+def make_server(host, port, config):
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM server with canned mentor replies")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default="fixed:0.3", help="time-to-first-token distribution, e.g. lognormal:-0.5,0.5")
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0, help="generation speed after the first token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument("--error-codes", default="429,500,503", help="HTTP statuses used for injected errors")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible runs")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format="%(levelname)s %(name)s: %(message)s")
+    if args.seed is not None:
+        random.seed(args.seed)
+    try:
+        config = StubConfig(
+            latency=LatencyModel(args.latency),
+            tokens_per_sec=max(args.tokens_per_sec, 1e-3),
+            error_rate=args.error_rate,
+            error_codes=[int(code) for code in args.error_codes.split(",") if code.strip()],
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    server = make_server(args.host, args.port, config)
+    print(f"Stub LLM server on http://{args.host}:{args.port}/v1 "
+          f"(latency {args.latency}, {args.tokens_per_sec:g} tokens/s, error rate {args.error_rate:g})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {config.requests} requests ({config.errors} injected errors)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
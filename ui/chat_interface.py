@@ -2,8 +2,10 @@ import streamlit as st
 import time
 from config.settings import MAX_AGENT_TURNS, ROLE_TO_AVATAR, STREAMING_DELAY
 from core.avatar_manager import get_avatar_for_role
-from core.chat_logic import process_agent_turn, handle_message_completion
-from utils.chat_utils import format_message
+from core.chat_logic import process_agent_turn, handle_message_completion, get_engine
+from core.session_state import roundtable_state
+from utils.tracing import tracer
+from utils.chat_utils import Message, format_message
 
 def render_user_input():
     """Render user input section"""
@@ -11,8 +13,8 @@ def render_user_input():
     
     # Check if user can send messages
     agents_paused = (
-        not st.session_state.get('chat_running', False) or
-        st.session_state.get('consecutive_agent_turns', 0) >= MAX_AGENT_TURNS
+        not roundtable_state().get('chat_running', False) or
+        roundtable_state().get('consecutive_agent_turns', 0) >= MAX_AGENT_TURNS
     )
     
     # User input area
@@ -57,7 +59,8 @@ def render_user_input():
 
 def render_chat_history(role_to_image):
     """Render chat message history"""
-    if not st.session_state.get('chat_history', []):
+    state = roundtable_state()
+    if not state.get('chat_history', []):
         st.markdown("### 💭 Discussion Will Appear Here")
         st.info("👋 Welcome! Start the discussion to see the AI mentors' conversation.")
         return
@@ -68,11 +71,11 @@ def render_chat_history(role_to_image):
     chat_container = st.container()
     
     with chat_container:
-        for i, msg in enumerate(st.session_state.chat_history):
+        for i, msg in enumerate(state.chat_history):
             _render_single_message(msg, role_to_image, i)
     
     # Auto-scroll indicator
-    if st.session_state.get('chat_running', False):
+    if state.get('chat_running', False):
         st.markdown("📡 *Live discussion in progress...*")
 
 def _render_single_message(msg, role_to_image, message_index):
@@ -104,7 +107,7 @@ def _render_single_message(msg, role_to_image, message_index):
             )
         
         # Message content
-        if role == st.session_state.get('thinking_agent') and message_index == len(st.session_state.chat_history) - 1:
+        if role == roundtable_state().get('thinking_agent') and message_index == len(roundtable_state().chat_history) - 1:
             # Show streaming effect for current message
             _render_streaming_message(content)
         else:
@@ -120,7 +123,7 @@ def _render_streaming_message(content):
     placeholder = st.empty()
     
     # Get current streaming progress
-    streaming_progress = st.session_state.get('roundtable_message', '')
+    streaming_progress = roundtable_state().get('roundtable_message', '')
     
     if streaming_progress:
         placeholder.markdown(streaming_progress)
@@ -129,14 +132,15 @@ def _render_streaming_message(content):
 
 def render_status_display():
     """Render current discussion status"""
+    state = roundtable_state()
     from core.session_manager import update_agent_status
     
     # Get current status
     agents_paused = update_agent_status()
-    chat_running = st.session_state.get('chat_running', False)
-    current_agent = st.session_state.get('current_agent')
-    thinking_agent = st.session_state.get('thinking_agent')
-    consecutive_turns = st.session_state.get('consecutive_agent_turns', 0)
+    chat_running = state.get('chat_running', False)
+    current_agent = state.get('current_agent')
+    thinking_agent = state.get('thinking_agent')
+    consecutive_turns = state.get('consecutive_agent_turns', 0)
     
     # Status container
     status_container = st.container()
@@ -146,7 +150,7 @@ def render_status_display():
             agent_avatar = ROLE_TO_AVATAR.get(thinking_agent, "❓")
             st.success(f"🟢 **Agents are actively discussing** | {agent_avatar} **{thinking_agent}** is thinking...")
             
-        elif chat_running and current_agent and st.session_state.get('agent_turn_in_progress'):
+        elif chat_running and current_agent and state.get('agent_turn_in_progress'):
             agent_avatar = ROLE_TO_AVATAR.get(current_agent, "❓")
             st.success(f"🟢 **Agents are actively discussing** | {agent_avatar} **{current_agent}** is preparing to speak...")
             
@@ -154,7 +158,7 @@ def render_status_display():
             agent_avatar = ROLE_TO_AVATAR.get(current_agent, "❓")
             st.success(f"🟢 **Agents are actively discussing** | Next up: {agent_avatar} **{current_agent}**")
             
-        elif agents_paused and st.session_state.get('chat_history'):
+        elif agents_paused and state.get('chat_history'):
             if current_agent:
                 agent_avatar = ROLE_TO_AVATAR.get(current_agent, "❓")
                 st.warning(f"⏸️ **Agents paused after {consecutive_turns} messages** | Next: {agent_avatar} **{current_agent}** | Enter message or resume discussion")
@@ -170,7 +174,8 @@ def render_status_display():
 
 def handle_agent_logic(get_context_chunks, role_to_image):
     """Handle agent conversation logic"""
-    if not st.session_state.get('chat_running', False) or not st.session_state.get('student_data'):
+    state = roundtable_state()
+    if not state.get('chat_running', False) or not state.get('student_data'):
         return
     
     try:
@@ -179,10 +184,10 @@ def handle_agent_logic(get_context_chunks, role_to_image):
         
         if message_content:
             # Clear thinking state
-            st.session_state.thinking_agent = None
+            state.thinking_agent = None
             
             # Get avatar for current agent
-            current_agent = st.session_state.get('current_agent')
+            current_agent = state.get('current_agent')
             avatar = get_avatar_for_role(current_agent, role_to_image)
             
             # Display message with streaming effect
@@ -206,71 +211,43 @@ def handle_agent_logic(get_context_chunks, role_to_image):
     except Exception as e:
         st.error(f"❌ Error in agent logic: {str(e)}")
         # Reset states on error
-        st.session_state.chat_running = False
-        st.session_state.thinking_agent = None
-        st.session_state.agent_turn_in_progress = False
+        state.chat_running = False
+        state.thinking_agent = None
+        state.agent_turn_in_progress = False
 
 def _stream_message_content(message_content, placeholder):
     """Stream message content word by word"""
+    state = roundtable_state()
     displayed_content = ""
     words = message_content.split()
     
-    for i, word in enumerate(words):
-        displayed_content += word + " "
-        placeholder.markdown(displayed_content)
-        
-        # Update roundtable message for streaming effect
-        st.session_state.roundtable_message = displayed_content
-        
-        # Small delay between words
-        time.sleep(STREAMING_DELAY)
+    with tracer.span("streaming", trace_id=state.get('trace_id'),
+                     session_id=state.get('session_id'), words=len(words)):
+        for i, word in enumerate(words):
+            displayed_content += word + " "
+            placeholder.markdown(displayed_content)
+            
+            # Update roundtable message for streaming effect
+            state.roundtable_message = displayed_content
+            
+            # Small delay between words
+            time.sleep(STREAMING_DELAY)
     
     # Clear streaming state
-    st.session_state.roundtable_message = ""
+    state.roundtable_message = ""
 
 def handle_user_message(user_interrupted, user_message):
     """Handle user message input with enhanced orchestrator integration"""
     if user_interrupted and user_message and user_message.strip():
         try:
-            # Add user message to chat history
-            from utils.chat_utils import format_message
-            from datetime import datetime
-            
-            user_msg = format_message("User", user_message.strip())
-            st.session_state.chat_history.append(user_msg)
-            
-            # Reset agent conversation state for user input
-            st.session_state.consecutive_agent_turns = 0
-            st.session_state.chat_running = True
-            st.session_state.agent_turn_in_progress = False
-            st.session_state.thinking_agent = None
-            st.session_state.message_streaming = False
-            
-            # Use enhanced orchestrator to select responding agent based on user message
-            if hasattr(st.session_state.orchestrator, 'intelligent_agent_selection'):
-                responding_agent = st.session_state.orchestrator.intelligent_agent_selection(
-                    st.session_state.chat_history, 
-                    user_message
-                )
-            else:
-                # Fallback to regular selection
-                responding_agent = st.session_state.orchestrator.select_next_agent(
-                    st.session_state.chat_history, 
-                    user_message
-                )
-            
-            st.session_state.current_agent = responding_agent
-            
-            # Update orchestrator conversation state if available
-            if hasattr(st.session_state.orchestrator, 'update_conversation_state'):
-                st.session_state.orchestrator.update_conversation_state("User", user_message)
+            # Add the message and pick the responding agent
+            responding_agent = get_engine().add_user_message(user_message.strip())
             
             # Clear input and restart
             st.session_state.user_input = ""
             st.success(f"✅ Message sent! **{responding_agent}** will respond to your question.")
             
             # Brief pause then rerun
-            import time
             time.sleep(0.5)
             st.rerun()
             
@@ -315,18 +292,18 @@ def _get_agent_person_name(role):
 
 def _get_student_name():
     """Get student name for display"""
-    if st.session_state.get('student_data'):
-        personal_info = st.session_state.student_data.get('personal_info', {})
+    if roundtable_state().get('student_data'):
+        personal_info = roundtable_state().student_data.get('personal_info', {})
         return personal_info.get('name', 'Student')
     return 'Student'
 
 def render_chat_statistics():
     """Render chat statistics (optional)"""
-    if not st.session_state.get('chat_history'):
+    if not roundtable_state().get('chat_history'):
         return
     
     with st.expander("📊 Discussion Statistics"):
-        chat_history = st.session_state.chat_history
+        chat_history = roundtable_state().chat_history
         
         # Basic stats
         total_messages = len(chat_history)
@@ -366,7 +343,8 @@ def render_chat_statistics():
 
 def export_chat_history():
     """Export chat history in various formats"""
-    if not st.session_state.get('chat_history'):
+    state = roundtable_state()
+    if not state.get('chat_history'):
         return
     
     from utils.chat_utils import format_chat_for_export
@@ -384,17 +362,17 @@ def export_chat_history():
     student_name = _get_student_name().replace(" ", "_")
     
     if export_format == "JSON":
-        data = json.dumps(st.session_state.chat_history, indent=2)
+        data = json.dumps([Message.from_dict(msg).to_dict() for msg in state.chat_history], indent=2)
         filename = f"mentor_chat_{student_name}_{timestamp}.json"
         mime_type = "application/json"
         
     elif export_format == "Text":
-        data = format_chat_for_export(st.session_state.chat_history)
+        data = format_chat_for_export(state.chat_history)
         filename = f"mentor_chat_{student_name}_{timestamp}.txt"
         mime_type = "text/plain"
         
     else:  # HTML
-        data = _format_chat_as_html(st.session_state.chat_history)
+        data = _format_chat_as_html(state.chat_history)
         filename = f"mentor_chat_{student_name}_{timestamp}.html"
         mime_type = "text/html"
     
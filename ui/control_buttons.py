@@ -1,19 +1,22 @@
 import streamlit as st
 from core.session_manager import reset_chat_session, update_agent_status
+from core.chat_logic import cancel_inflight
+from core.session_state import roundtable_state
 from config.settings import MAX_AGENT_TURNS
 
 def render_control_buttons():
     """Render chat control buttons"""
+    state = roundtable_state()
     st.markdown("### 🎮 Discussion Controls")
     
     # Create button columns
     col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
     
     # Get current status - FIX: Don't override agents_paused with update_agent_status()
-    chat_running = getattr(st.session_state, 'chat_running', False)
+    chat_running = state.chat_running
     agents_paused = getattr(st.session_state, 'agents_paused', False)  # Use session state directly
-    has_student_data = st.session_state.student_data is not None
-    consecutive_turns = getattr(st.session_state, 'consecutive_agent_turns', 0)
+    has_student_data = state.student_data is not None
+    consecutive_turns = state.consecutive_agent_turns
     
     # DEBUG - Add temporarily to see values
     #st.write(f"🔍 DEBUG: chat_running={chat_running}, agents_paused={agents_paused}, has_student_data={has_student_data}")
@@ -49,7 +52,7 @@ def render_control_buttons():
     # Resume Discussion Button
     with col3:
         # FIXED: Resume should be enabled when discussion is paused (not running but agents_paused is True)
-        resume_disabled = chat_running or not has_student_data or (not agents_paused and len(st.session_state.get('chat_history', [])) == 0)
+        resume_disabled = chat_running or not has_student_data or (not agents_paused and len(state.get('chat_history', [])) == 0)
         resume_help = _get_button_help_text("resume", resume_disabled, has_student_data, chat_running)
         
         if st.button(
@@ -62,7 +65,7 @@ def render_control_buttons():
     
     # Clear Chat Button
     with col4:
-        clear_disabled = not st.session_state.get('chat_history', [])
+        clear_disabled = not state.get('chat_history', [])
         clear_help = _get_button_help_text("clear", clear_disabled, has_student_data, chat_running)
         
         if st.button(
@@ -110,17 +113,18 @@ def _get_button_help_text(button_type, disabled, has_student_data, chat_running)
 
 def _handle_start_discussion():
     """Handle start discussion button click"""
+    state = roundtable_state()
     try:
-        st.session_state.chat_running = True
-        st.session_state.consecutive_agent_turns = 0
-        st.session_state.pending_agent_message = None
-        st.session_state.agent_turn_in_progress = False
-        st.session_state.thinking_agent = None
-        st.session_state.message_streaming = False
+        state.chat_running = True
+        state.consecutive_agent_turns = 0
+        state.pending_agent_message = None
+        state.agent_turn_in_progress = False
+        state.thinking_agent = None
+        state.message_streaming = False
         
         # Ensure we have a current agent
-        if not getattr(st.session_state, 'current_agent', None):
-            st.session_state.current_agent = "Academic Mentor"
+        if not state.current_agent:
+            state.current_agent = "Academic Mentor"
         
         st.success("🚀 Discussion started! The AI mentors will begin their roundtable.")
         st.rerun()
@@ -130,13 +134,17 @@ def _handle_start_discussion():
 
 def _handle_pause_discussion():
     """Handle pause discussion button click"""
+    state = roundtable_state()
     try:
+        # Abort the mentor reply being generated rather than letting it finish unseen
+        cancel_inflight("pause")
+        
         # Set states in the correct order
-        st.session_state.chat_running = False
+        state.chat_running = False
         st.session_state.agents_paused = True
-        st.session_state.thinking_agent = None
-        st.session_state.agent_turn_in_progress = False
-        st.session_state.message_streaming = False
+        state.thinking_agent = None
+        state.agent_turn_in_progress = False
+        state.message_streaming = False
         
         st.info("⏸️ Discussion paused. You can now send a message or generate a report.")
         st.rerun()  # Force immediate rerun
@@ -146,29 +154,30 @@ def _handle_pause_discussion():
 
 def _handle_resume_discussion():
     """Handle resume discussion button click"""
+    state = roundtable_state()
     try:
         # Set states in the correct order
         st.session_state.agents_paused = False
-        st.session_state.chat_running = True
-        st.session_state.agent_turn_in_progress = False
-        st.session_state.thinking_agent = None
-        st.session_state.message_streaming = False
-        st.session_state.consecutive_agent_turns = 0
+        state.chat_running = True
+        state.agent_turn_in_progress = False
+        state.thinking_agent = None
+        state.message_streaming = False
+        state.consecutive_agent_turns = 0
         
         # Fix: Properly select next agent
         if hasattr(st.session_state, 'orchestrator') and st.session_state.orchestrator:
-            if st.session_state.chat_history:
-                st.session_state.current_agent = st.session_state.orchestrator.select_next_agent(
-                    st.session_state.chat_history
+            if state.chat_history:
+                state.current_agent = st.session_state.orchestrator.select_next_agent(
+                    state.chat_history
                 )
             else:
                 available_agents = [agent["name"] for agent in st.session_state.get('agents_info', [])]
                 if available_agents:
-                    st.session_state.current_agent = available_agents[0]
+                    state.current_agent = available_agents[0]
                 else:
-                    st.session_state.current_agent = "Academic Mentor"
+                    state.current_agent = "Academic Mentor"
         else:
-            st.session_state.current_agent = "Academic Mentor"
+            state.current_agent = "Academic Mentor"
         
         st.success("▶️ Discussion resumed! The AI mentors will continue their conversation.")
         st.rerun()  # Force immediate rerun
@@ -226,7 +235,7 @@ def _render_control_status(agents_paused, chat_running, consecutive_turns):
     else:
         status_text = "🔴 <strong>Discussion Stopped</strong>"
     
-    current_agent = getattr(st.session_state, 'current_agent', 'None')
+    current_agent = roundtable_state().current_agent
     
     # Compact status display - FIXED: Use HTML <strong> instead of markdown **
     st.markdown(f"""
@@ -249,6 +258,7 @@ def _render_control_status(agents_paused, chat_running, consecutive_turns):
 
 def render_advanced_controls():
     """Render advanced control options (optional)"""
+    state = roundtable_state()
     with st.expander("⚙️ Advanced Controls"):
         st.markdown("### 🔧 Advanced Options")
         
@@ -298,30 +308,34 @@ def render_advanced_controls():
         
         with col1:
             if st.button("🔄 Reset Session", type="secondary"):
+                cancel_inflight("reset")
                 # Full session reset
+                student_data = state.student_data
                 for key in list(st.session_state.keys()):
-                    if key not in ['student_data']:  # Preserve student data
-                        del st.session_state[key]
+                    del st.session_state[key]
+                roundtable_state().student_data = student_data  # Preserve student data
                 st.success("🔄 Session reset complete")
                 st.rerun()
         
         with col2:
             if st.button("🆘 Force Stop", type="secondary"):
-                # Force stop all processes
-                st.session_state.chat_running = False
-                st.session_state.agent_turn_in_progress = False
-                st.session_state.thinking_agent = None
-                st.session_state.message_streaming = False
+                # Force stop all processes, including in-flight LLM requests
+                cancel_inflight("force_stop")
+                state.chat_running = False
+                state.agent_turn_in_progress = False
+                state.thinking_agent = None
+                state.message_streaming = False
                 st.warning("🆘 All processes stopped")
 
 def get_control_state_summary():
     """Get summary of current control state"""
+    state = roundtable_state()
     return {
-        "chat_running": getattr(st.session_state, 'chat_running', False),
+        "chat_running": state.chat_running,
         "agents_paused": update_agent_status(),
-        "consecutive_turns": getattr(st.session_state, 'consecutive_agent_turns', 0),
-        "current_agent": getattr(st.session_state, 'current_agent', None),
-        "thinking_agent": getattr(st.session_state, 'thinking_agent', None),
-        "has_student_data": st.session_state.student_data is not None,
-        "chat_history_length": len(st.session_state.get('chat_history', []))
+        "consecutive_turns": state.consecutive_agent_turns,
+        "current_agent": state.current_agent,
+        "thinking_agent": state.thinking_agent,
+        "has_student_data": state.student_data is not None,
+        "chat_history_length": len(state.get('chat_history', []))
     }
\ No newline at end of file
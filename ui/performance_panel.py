@@ -0,0 +1,128 @@
+import streamlit as st
+from datetime import datetime
+from config.settings import SESSION_TOKEN_BUDGET
+from core.session_state import roundtable_state
+from utils.circuit_breaker import all_breakers
+from utils.rate_limit import all_rate_limiters
+from utils.tracing import tracer
+from utils.usage import usage_ledger
+
+# Display order for the per-stage table; other span names follow alphabetically
+STAGE_ORDER = [
+    "turn", "rate_limit.wait", "agent_selection", "agent_selection.llm", "retrieval", "retrieval.chroma",
+    "generation", "mentor_llm", "streaming", "pacing", "rerun",
+    "report", "report.analysis", "report.map", "report.sections", "report.llm", "report.html", "report.pdf"
+]
+
+def render_performance_panel():
+    """Session token usage plus per-stage latency (p50/p95), token and retry counts from the tracing buffer"""
+    with st.expander("⏱️ Performance", expanded=False):
+        _render_provider_health()
+        _render_session_usage()
+
+        this_session = st.checkbox("This session only", value=True, key="perf_this_session")
+        session_id = roundtable_state().get('session_id') if this_session else None
+        stats = tracer.stage_stats(session_id=session_id)
+
+        if not stats:
+            st.caption("No traced activity yet. Start the discussion to collect timings.")
+            return
+
+        ordered = sorted(stats, key=lambda name: (STAGE_ORDER.index(name) if name in STAGE_ORDER else len(STAGE_ORDER), name))
+        rows = []
+        for name in ordered:
+            entry = stats[name]
+            rows.append({
+                "stage": name,
+                "count": entry["count"],
+                "p50 ms": round(entry["p50_ms"], 1),
+                "p95 ms": round(entry["p95_ms"], 1),
+                "tokens in/out": f"{entry.get('tokens_in', 0)}/{entry.get('tokens_out', 0)}",
+                "retries": entry.get("retries", 0),
+                "aborted": entry.get("aborted_streams", 0),
+                "hedged/won": f"{entry.get('hedges', 0)}/{entry.get('hedge_wins', 0)}",
+                "cache hits": entry.get("cache_hits", 0),
+                "errors": entry["errors"],
+            })
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+        _render_last_turn(session_id)
+        _render_rate_limiter()
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "📥 Export JSONL",
+                data=tracer.to_jsonl(tracer.spans(session_id=session_id)),
+                file_name=f"traces_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+                mime="application/x-ndjson",
+                key="perf_export"
+            )
+        with col2:
+            if st.button("🧹 Clear", key="perf_clear"):
+                tracer.clear()
+                st.rerun()
+
+def _render_last_turn(session_id):
+    """Stage breakdown of the most recent turn"""
+    turns = [span for span in tracer.spans(session_id=session_id) if span.name == "generation"]
+    if not turns:
+        return
+    trace_id = turns[-1].trace_id
+    spans = [span for span in tracer.spans() if span.trace_id == trace_id]
+    breakdown = " • ".join(f"{span.name} {span.duration_ms:.0f} ms" for span in spans if span.name != "rerun")
+    reruns = sum(1 for span in spans if span.name == "rerun")
+    st.caption(f"Last turn: {breakdown}" + (f" • {reruns} reruns" if reruns else ""))
+
+def _render_provider_health():
+    """Warn while an LLM provider's circuit is open and mentors answer in degraded mode"""
+    for breaker in all_breakers():
+        health = breaker.to_dict()
+        if health["state"] != "closed":
+            st.error(f"LLM provider {health['name']} unavailable for {health['open_for']:.0f}s: "
+                     f"mentors are using template replies until it recovers.")
+
+def _render_rate_limiter():
+    """Queueing at each provider's LLM rate limiter, per priority class"""
+    for limiter in all_rate_limiters():
+        if limiter.enabled:
+            _render_limiter_queue(limiter)
+
+def _render_limiter_queue(limiter):
+    rows = [
+        {
+            "priority": name,
+            "queued now": entry["queued"],
+            "admitted": entry["admitted"],
+            "p95 wait ms": round(entry["p95_wait_ms"], 1),
+            "max wait ms": round(entry["max_wait_ms"], 1),
+            "timeouts": entry["timeouts"],
+        }
+        for name, entry in limiter.stats().items()
+    ]
+    if any(row["admitted"] or row["queued now"] for row in rows):
+        st.caption(f"LLM rate limiter for {limiter.name} (all sessions)")
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+def _render_session_usage():
+    """Tokens and cost for this session, per mentor, against the session budget"""
+    session_id = roundtable_state().get('session_id')
+    totals = usage_ledger.totals("session_id", session_id)
+    if not totals["calls"]:
+        return
+
+    st.markdown(f"**Tokens:** {totals['total_tokens']:,} in {totals['calls']} calls • **Cost:** ${totals['cost']:.4f}")
+    if SESSION_TOKEN_BUDGET:
+        st.progress(min(totals["total_tokens"] / SESSION_TOKEN_BUDGET, 1.0))
+        status = usage_ledger.budget_status(session_id)
+        if status == "exceeded":
+            st.warning("Token budget exceeded: mentors use the fallback model and skip retries.")
+        elif status == "tight":
+            st.info("Token budget nearly used: similarity retries are skipped.")
+
+    by_agent = usage_ledger.session_breakdown(session_id)
+    rows = [
+        {"mentor": agent, "calls": entry["calls"], "tokens": entry["total_tokens"], "cost $": round(entry["cost"], 4)}
+        for agent, entry in sorted(by_agent.items(), key=lambda item: -item[1]["total_tokens"])
+    ]
+    st.dataframe(rows, hide_index=True, use_container_width=True)
@@ -2,6 +2,8 @@ import streamlit as st
 import json
 from datetime import datetime
 import os
+from config.settings import SHOW_PERFORMANCE_PANEL
+from core.session_state import roundtable_state
 
 def render_sidebar():
     """Render the sidebar with beautiful student information display"""
@@ -13,7 +15,7 @@ def render_sidebar():
     
     with st.sidebar:
         # Display beautiful student profile if available
-        if hasattr(st.session_state, 'student_data') and st.session_state.student_data:
+        if roundtable_state().student_data:
             _render_beautiful_student_profile()
         else:
             # Show message when no student data is available
@@ -21,12 +23,16 @@ def render_sidebar():
         
         # Session controls
         _render_session_controls()
+        
+        if SHOW_PERFORMANCE_PANEL:
+            from ui.performance_panel import render_performance_panel
+            render_performance_panel()
 
 def _render_beautiful_student_profile():
     """Render beautiful student profile in sidebar using Streamlit components"""
     
     # Get student data from session state
-    student_data = st.session_state.student_data
+    student_data = roundtable_state().student_data
     
     # Extract data with flexible field names
     name = _get_field_value(student_data, ['name', 'student_name'], 'Unknown Student')
@@ -222,6 +228,7 @@ def _truncate_sidebar_text(text, max_length):
 
 def _render_session_controls():
     """Render minimal session state controls"""
+    state = roundtable_state()
     st.markdown("---")
     
     if st.button("🔄 Reset Session", key="reset_session"):
@@ -229,7 +236,7 @@ def _render_session_controls():
             del st.session_state[key]
         st.rerun()
     
-    if hasattr(st.session_state, 'student_data') and st.session_state.student_data:
+    if state.student_data:
         if st.button("💾 Export Profile", key="export_session"):
             try:
                 # Convert student data for JSON serialization
@@ -243,7 +250,7 @@ def _render_session_controls():
                     else:
                         return obj
                 
-                clean_student_data = convert_types(st.session_state.student_data)
+                clean_student_data = convert_types(state.student_data)
                 student_json = json.dumps(clean_student_data, indent=2)
                 
                 st.download_button(
@@ -257,10 +264,11 @@ def _render_session_controls():
 
 def get_student_context_summary():
     """Get a formatted summary of student data for AI context"""
-    if not hasattr(st.session_state, 'student_data') or not st.session_state.student_data:
+    state = roundtable_state()
+    if not state.student_data:
         return "No student information available."
     
-    data = st.session_state.student_data
+    data = state.student_data
     
     # Extract basic info
     name = _get_field_value(data, ['name', 'student_name'], 'Unknown')
@@ -0,0 +1,78 @@
+import json
+import threading
+from collections import OrderedDict
+
+from config.settings import REPORT_ARTIFACT_CACHE_BYTES
+
+
+def artifact_size(artifact):
+    """Approximate memory footprint of a cached report artifact in bytes"""
+    size = 0
+    for value in artifact.values():
+        if isinstance(value, bytes):
+            size += len(value)
+        elif isinstance(value, str):
+            size += len(value.encode("utf-8"))
+        elif value is not None:
+            size += len(json.dumps(value, default=str))
+    return size
+
+
+class ArtifactCache:
+    """Thread-safe content-addressed LRU cache bounded by total bytes.
+
+    Keys are content hashes, so an entry never goes stale; it is only evicted
+    when the cache grows past ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=REPORT_ARTIFACT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (artifact, size)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[0])
+
+    def put(self, key, artifact):
+        """Store an artifact dict; entries larger than the whole cache are skipped"""
+        size = artifact_size(artifact)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (dict(artifact), size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Global instance - shared across sessions, keys are content hashes
+report_artifact_cache = ArtifactCache()
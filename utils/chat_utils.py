@@ -1,11 +1,57 @@
-def format_message(role, content):
-    return {
-        "role": role,
-        "content": content
-    }
+import sys
+
+
+class Message:
+    """One chat message in fixed slots, with the role name interned.
+
+    Reads like the ``{"role": ..., "content": ...}`` dicts it replaces, so ``msg["role"]`` and
+    ``msg.get("content", "")`` keep working; ``to_dict`` gives the plain form for JSON.
+    """
+
+    __slots__ = ("role", "content", "timestamp")
+
+    def __init__(self, role, content, timestamp=None):
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        return cls(data["role"], data.get("content", ""), data.get("timestamp"))
+
+    def __getitem__(self, key):
+        if key not in self.__slots__ or (key == "timestamp" and self.timestamp is None):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and (key != "timestamp" or self.timestamp is not None)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return [key for key in self.__slots__ if key in self]
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, (Message, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, Message) else other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Message({self.role!r}, {self.content!r})"
+
+
+def format_message(role, content, timestamp=None):
+    return Message(role, content, timestamp)
 
 def format_chat_display(msg):
     if msg["role"] == "User":
         return f"**You:** {msg['content']}"
     else:
-        return f"**{msg['role']}**: {msg['content']}"
\ No newline at end of file
+        return f"**{msg['role']}**: {msg['content']}"
@@ -0,0 +1,186 @@
+"""Circuit breakers around the LLM providers.
+
+Every model built by ``utils.llm.create_chat_llm`` reports its calls to the breaker of its
+provider. After ``CIRCUIT_FAILURE_THRESHOLD`` consecutive provider failures the breaker opens:
+calls then fail immediately with ``CircuitOpenError`` instead of waiting out timeouts and retries,
+and a background thread probes the provider until it answers again. Callers check
+``is_open`` to switch to their degraded-mode path. Setting LLM_CIRCUIT_BREAKER=0 in the
+environment leaves models built afterwards without a breaker.
+"""
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from config.settings import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN, CIRCUIT_PROBE_TIMEOUT
+from utils.rate_limit import RateLimitTimeout, provider_name
+from utils.tracing import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """The provider's circuit is open; the call was not sent"""
+
+
+def is_provider_failure(error):
+    """Whether an LLM error says the provider is unhealthy (5xx, timeouts, connection errors)"""
+    if isinstance(error, (GeneratorExit, KeyboardInterrupt, CircuitOpenError, RateLimitTimeout)):
+        return False
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status >= 500
+    return True
+
+
+def http_probe(api_base, timeout=CIRCUIT_PROBE_TIMEOUT):
+    """Probe function for OpenAI-compatible endpoints: does GET {api_base}/models answer?"""
+    def probe():
+        try:
+            with urllib.request.urlopen(f"{api_base.rstrip('/')}/models", timeout=timeout) as response:
+                return response.status < 500
+        except urllib.error.HTTPError as e:
+            return e.code < 500
+        except (OSError, ValueError):
+            return False
+    return probe
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> closed again once a probe or trial call succeeds.
+
+    Without a probe function the breaker turns half-open after the cooldown and lets a single
+    real call through as the trial.
+    """
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN, probe=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probe = probe
+        self.state = "closed"  # closed, open, half_open
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._trial_in_flight = False
+        self._prober = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self.state == "open"
+
+    def _maybe_half_open(self):
+        if self.state == "open" and self.probe is None and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless the call may go out"""
+        with self._lock:
+            self._maybe_half_open()
+            if self.state == "open" or (self.state == "half_open" and self._trial_in_flight):
+                raise CircuitOpenError(f"LLM provider {self.name} unavailable (circuit open)")
+            if self.state == "half_open":
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"LLM provider {self.name} recovered, closing circuit")
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self._open()
+
+    def end_trial(self):
+        """A half-open trial call ended without a verdict (e.g. it was cancelled)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _open(self):
+        """Trip the breaker (caller holds the lock)"""
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        logger.warning(f"LLM provider {self.name} failing ({self.failures} consecutive errors), opening circuit")
+        if self.probe is not None and (self._prober is None or not self._prober.is_alive()):
+            self._prober = threading.Thread(target=self._probe_loop, name=f"circuit-probe-{self.name}", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        while True:
+            time.sleep(self.cooldown)
+            with self._lock:
+                if self.state == "closed":
+                    return
+            if self.probe():
+                self.record_success()
+                return
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self.state,
+                "failures": self.failures,
+                "trips": self.trips,
+                "open_for": time.monotonic() - self.opened_at if self.state != "closed" else 0.0,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(api_base):
+    """The shared breaker of the provider behind an endpoint"""
+    name = provider_name(api_base)
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, probe=http_probe(api_base) if api_base else None)
+        return _breakers[name]
+
+
+def all_breakers():
+    with _breakers_lock:
+        return list(_breakers.values())
+
+
+if BaseCallbackHandler is not None:
+    class CircuitBreakerCallbackHandler(BaseCallbackHandler):
+        """Fails calls fast while the provider's circuit is open and feeds call outcomes to it"""
+
+        raise_error = True  # CircuitOpenError must stop the call
+
+        def __init__(self, breaker):
+            self.breaker = breaker
+
+        def on_chat_model_start(self, serialized, messages, **kwargs):
+            self.breaker.before_call()
+
+        def on_llm_end(self, response, **kwargs):
+            self.breaker.record_success()
+
+        def on_llm_error(self, error, **kwargs):
+            if is_provider_failure(error):
+                self.breaker.record_failure()
+            else:
+                self.breaker.end_trial()
+
+
+def circuit_breaker_callback(api_base):
+    """Callback handler reporting to the breaker of ``api_base``, or None without langchain_core
+    or with LLM_CIRCUIT_BREAKER=0"""
+    if BaseCallbackHandler is None or os.getenv("LLM_CIRCUIT_BREAKER", "1") == "0":
+        return None
+    return CircuitBreakerCallbackHandler(breaker_for(api_base))
@@ -0,0 +1,244 @@
+"""Deadline-aware, hedged LLM calls.
+
+Call sites declare how long they can wait for a model to start answering:
+
+    with llm_deadline(LLM_DEADLINES["mentor_reply"]):
+        for token in agent.stream_chat(...):
+            ...
+
+A ``HedgedChatModel`` streams from its primary model and, if no output has arrived by the
+primary's recent p90 time-to-first-token (or half the remaining deadline, whichever is sooner),
+fires the same request at a hedge model. The clock starts when the shared rate limiter admits the
+primary request: a call still queued for local capacity is never hedged, since that would only
+queue a second one. Whichever starts answering first wins; the other stream is closed, which
+closes its HTTP response, and a loser that has not been sent yet never is. If neither has
+answered by the deadline the call raises ``DeadlineExceeded``.
+"""
+import contextvars
+import logging
+import operator
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import reduce
+
+from langchain.schema import AIMessage
+
+from config.settings import LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES, LLM_HEDGE_DEFAULT_DELAY
+from utils.rate_limit import (
+    GUARD_CHECK_INTERVAL,
+    RateLimitTimeout,
+    check_call_guards,
+    llm_call_guard
+)
+from utils.tracing import percentile, tracer
+
+logger = logging.getLogger(__name__)
+
+_deadline = contextvars.ContextVar("llm_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """No model produced output before the call site's deadline"""
+
+
+class HedgeLost(Exception):
+    """Stops an attempt that lost the race before its request was sent"""
+
+
+@contextmanager
+def llm_deadline(seconds):
+    """LLM calls inside the block must start answering within ``seconds``; nested deadlines only tighten"""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left():
+    """Seconds until the active deadline, or None without one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class LatencyTracker:
+    """Recent time-to-first-token samples per model, shared by all sessions"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, model, seconds):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, model, fraction, min_samples=1):
+        """Latency quantile in seconds, or None until ``min_samples`` calls were seen"""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < min_samples:
+            return None
+        return percentile(samples, fraction)
+
+
+latency_tracker = LatencyTracker()
+
+
+class _StreamWorker:
+    """Consumes one model stream on a background thread and posts its chunks to a shared queue.
+
+    Also the call guard of its request (see ``utils.rate_limit.llm_call_guard``): the limiter
+    reports admission through ``admitted`` and refuses to send the request once cancelled.
+    """
+
+    def __init__(self, llm, model, messages, kwargs, events):
+        self.model = model
+        self.events = events
+        self.cancelled = threading.Event()
+        self.admitted_at = None
+        # Each thread gets its own copy of the caller's context (usage scope, priority, span)
+        context = contextvars.copy_context()
+        self.thread = threading.Thread(
+            target=context.run, args=(self._run, llm, messages, kwargs), name=f"llm-stream-{model}", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self, llm, messages, kwargs):
+        stream = None
+        first = True
+        try:
+            with llm_call_guard(self):
+                if not any(getattr(callback, "holds_calls", False) for callback in getattr(llm, "callbacks", None) or ()):
+                    self.admitted()  # nothing queues the request, so it goes out right away
+                stream = llm.stream(messages, **kwargs)
+                for chunk in stream:
+                    if self.cancelled.is_set():
+                        return
+                    if first:
+                        first = False
+                        if self.admitted_at is None:  # a model that does not run the callbacks
+                            self.admitted()
+                        latency_tracker.record(self.model, time.monotonic() - self.admitted_at)
+                    self.events.put((self, "chunk", chunk))
+            self.events.put((self, "done", None))
+        except Exception as e:
+            self.events.put((self, "error", e))
+        finally:
+            if stream is not None:
+                stream.close()
+
+    def admitted(self):
+        """The rate limiter let the request go out; time-to-first-token counts from here"""
+        self.admitted_at = time.monotonic()
+        self.events.put((self, "admitted", None))
+
+    def raise_if_cancelled(self):
+        if self.cancelled.is_set():
+            raise HedgeLost(f"{self.model} request no longer needed")
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class HedgedChatModel:
+    """Chat model wrapper racing a hedge model against a slow primary; other attributes pass through"""
+
+    hedged = True
+
+    def __init__(self, primary, hedge, primary_model, hedge_model):
+        self.primary = primary
+        self.hedge = hedge
+        self.primary_model = primary_model
+        self.hedge_model = hedge_model
+
+    def __getattr__(self, name):
+        if name == "primary":  # not yet set, e.g. while unpickling
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+
+    def hedge_delay(self):
+        """Seconds to wait on the primary before also asking the hedge model"""
+        delay = latency_tracker.quantile(self.primary_model, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES)
+        if delay is None:
+            delay = LLM_HEDGE_DEFAULT_DELAY
+        remaining = time_left()
+        if remaining is not None:
+            delay = min(delay, remaining / 2)
+        return max(0.0, delay)
+
+    def stream(self, messages, **kwargs):
+        events = queue.Queue()
+        deadline = _deadline.get()
+        workers = [_StreamWorker(self.primary, self.primary_model, messages, kwargs, events)]
+        hedge_at = None  # set once the rate limiter admits the primary request
+        winner = None
+        try:
+            errors = []
+            while winner is None:
+                now = time.monotonic()
+                if len(workers) == 1 and hedge_at is not None and now >= hedge_at:
+                    logger.info(f"{self.primary_model} slow to answer, hedging with {self.hedge_model}")
+                    tracer.add_to_current("hedges")
+                    workers.append(_StreamWorker(self.hedge, self.hedge_model, messages, kwargs, events))
+                # Wakes up regularly so a generation cancelled while waiting for its first token stops
+                wake_at = [t for t in (hedge_at if len(workers) == 1 else None, deadline) if t is not None]
+                try:
+                    worker, kind, payload = events.get(timeout=max(0.0, min(wake_at + [now + GUARD_CHECK_INTERVAL]) - now))
+                except queue.Empty:
+                    check_call_guards()
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise DeadlineExceeded(
+                            f"No answer from {', '.join(w.model for w in workers)} within the deadline"
+                        )
+                    continue
+                if kind == "admitted":
+                    if worker is workers[0] and hedge_at is None:
+                        hedge_at = time.monotonic() + self.hedge_delay()
+                    continue
+                if kind == "error":
+                    errors.append(payload)
+                    if len(errors) < len(workers):
+                        continue  # the other model may still answer
+                    if len(workers) == 2 or isinstance(payload, RateLimitTimeout):
+                        raise payload  # a hedge would only wait in the same full queue
+                    check_call_guards()  # a cancelled generation is not retried on the hedge model
+                    hedge_at = now  # a failed primary is hedged right away
+                    continue
+                winner = worker
+                if worker is not workers[0]:
+                    tracer.add_to_current("hedge_wins")
+
+            for worker in workers:
+                if worker is not winner:
+                    worker.cancel()
+
+            while kind == "chunk":
+                yield payload
+                worker, kind, payload = self._next_event(events, winner)
+            if kind == "error":
+                raise payload
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+    @staticmethod
+    def _next_event(events, worker):
+        """The next event posted by ``worker``, checking the call guards while it is slow to come"""
+        while True:
+            try:
+                event = events.get(timeout=GUARD_CHECK_INTERVAL)
+            except queue.Empty:
+                check_call_guards()
+                continue
+            if event[0] is worker:
+                return event
+
+    def invoke(self, messages, **kwargs):
+        chunks = list(self.stream(messages, **kwargs))
+        return reduce(operator.add, chunks) if chunks else AIMessage(content="")
@@ -0,0 +1,84 @@
+import json
+import re
+
+_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+
+
+def _strip_code_fences(text):
+    """Return the contents of the first markdown code fence, or the text itself"""
+    match = _FENCE_PATTERN.search(text)
+    return match.group(1).strip() if match else text.strip()
+
+
+def _outermost_object(text):
+    """Slice out the first balanced {...} block, ignoring braces inside strings"""
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+
+    # Truncated response - close what we can
+    return text[start:] + "}" * depth if depth > 0 else None
+
+
+def _repair(text):
+    """Fix the most common LLM JSON mistakes"""
+    return _TRAILING_COMMA_PATTERN.sub(r"\1", text)
+
+
+def extract_json_object(text):
+    """Parse the JSON object in an LLM response, tolerating fences, prose and trailing commas.
+
+    Returns None when no object can be recovered.
+    """
+    if isinstance(text, dict):
+        return text
+    if not isinstance(text, str) or not text.strip():
+        return None
+
+    stripped = _strip_code_fences(text)
+    for candidate in (stripped, _outermost_object(stripped)):
+        if not candidate:
+            continue
+        for variant in (candidate, _repair(candidate)):
+            try:
+                # strict=False accepts raw newlines inside strings
+                parsed = json.loads(variant, strict=False)
+            except ValueError:
+                continue
+            if isinstance(parsed, dict):
+                return parsed
+    return None
+
+
+def normalize_keys(data):
+    """Map keys like 'Skill Feedback' or 'skill-feedback' to 'skill_feedback'"""
+    if not isinstance(data, dict):
+        return {}
+    normalized = {}
+    for key, value in data.items():
+        clean_key = re.sub(r"[^a-z0-9]+", "_", str(key).strip().lower()).strip("_")
+        clean_key = re.sub(r"^\d+_", "", clean_key)  # "1_highlights" -> "highlights"
+        normalized[clean_key] = value
+    return normalized
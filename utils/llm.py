@@ -0,0 +1,94 @@
+import logging
+import os
+
+from langchain_community.chat_models import ChatOpenAI
+
+from config.settings import (
+    LLM_API_BASE,
+    LLM_MODEL,
+    LLM_REQUEST_TIMEOUT,
+    LLM_HEDGE_MODEL,
+    LLM_HEDGE_API_BASE,
+    LLM_BACKENDS
+)
+from utils.circuit_breaker import breaker_for, circuit_breaker_callback
+from utils.hedging import HedgedChatModel
+from utils.rate_limit import rate_limit_callback
+from utils.tracing import tracing_callback
+from utils.usage import usage_callback
+
+logger = logging.getLogger(__name__)
+
+
+def llm_api_base():
+    """Chat-completions endpoint, e.g. http://localhost:8001/v1 for stub_llm_server.py"""
+    return os.getenv("LLM_API_BASE") or LLM_API_BASE
+
+
+def llm_model():
+    return os.getenv("LLM_MODEL") or LLM_MODEL
+
+
+def llm_backend(agent_name):
+    """Backend configured for an agent, "local" or "remote" (the default)"""
+    local_agents = [name.strip() for name in os.getenv("LLM_LOCAL_AGENTS", "").split(",") if name.strip()]
+    if agent_name and (agent_name in local_agents or "*" in local_agents):
+        return "local"
+    return LLM_BACKENDS.get(agent_name, "remote")
+
+
+def llm_hedge_model():
+    return os.getenv("LLM_HEDGE_MODEL", LLM_HEDGE_MODEL or "") or None
+
+
+def create_chat_llm(temperature=0.7, model=None, hedged=False, api_base=None, api_key=None, backend="remote",
+                    **kwargs):
+    """ChatOpenAI client for the configured provider; every agent builds its model here.
+
+    ``hedged=True`` wraps it in a HedgedChatModel that races the hedge model when this one is
+    slow to start answering (see utils.hedging); latency-sensitive call sites ask for this.
+    ``backend="local"`` returns the shared llama.cpp model instead (see utils.local_llm), falling
+    back to the remote provider when it is not installed.
+    """
+    if backend == "local":
+        from utils.local_llm import LocalChatModel, local_backend_available, local_model_path
+        if local_backend_available():
+            return LocalChatModel(temperature=temperature)
+        logger.warning(f"Local LLM backend unavailable (llama-cpp-python or {local_model_path()} missing), using remote")
+
+    model = model or llm_model()
+    hedge_model = llm_hedge_model() if hedged else None
+    if hedge_model and hedge_model != model:
+        return HedgedChatModel(
+            create_chat_llm(temperature, model, api_base=api_base, api_key=api_key, **kwargs),
+            create_chat_llm(
+                temperature, hedge_model,
+                api_base=os.getenv("LLM_HEDGE_API_BASE") or LLM_HEDGE_API_BASE,
+                api_key=os.getenv("LLM_HEDGE_API_KEY"),
+                **kwargs
+            ),
+            model,
+            hedge_model
+        )
+
+    api_base = api_base or llm_api_base()
+    handlers = (circuit_breaker_callback(api_base), rate_limit_callback(api_base), tracing_callback, usage_callback)
+    callbacks = [handler for handler in handlers if handler is not None]
+    if callbacks:
+        kwargs["callbacks"] = callbacks + list(kwargs.get("callbacks") or [])
+    kwargs.setdefault("request_timeout", LLM_REQUEST_TIMEOUT)
+    return ChatOpenAI(
+        temperature=temperature,
+        model=model,
+        openai_api_key=api_key or os.getenv("LLM_API_KEY") or os.getenv("OPENROUTER_API_KEY"),
+        openai_api_base=api_base,
+        **kwargs
+    )
+
+
+def llm_available():
+    """False while the circuits of the primary provider and of the hedge provider (if any) are open"""
+    if not breaker_for(llm_api_base()).is_open:
+        return True
+    hedge_base = os.getenv("LLM_HEDGE_API_BASE") or LLM_HEDGE_API_BASE
+    return bool(llm_hedge_model() and hedge_base and not breaker_for(hedge_base).is_open)
@@ -0,0 +1,222 @@
+"""CPU-only local chat model (llama.cpp) for agents configured with the "local" backend.
+
+One quantized GGUF model is loaded per process and shared by every session. llama.cpp decodes one
+sequence at a time per context, so requests from all sessions go through a single worker queue:
+each waits only for the replies queued ahead of it, and nothing is loaded twice. Replies are
+short (two sentences), which keeps that queue fast on CPU.
+
+Requires the optional ``llama-cpp-python`` package and a model file at LOCAL_MODEL_PATH; when
+either is missing ``local_backend_available`` is False and callers fall back to the remote provider.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from config.settings import (
+    LOCAL_MODEL_PATH,
+    LOCAL_MODEL_CONTEXT,
+    LOCAL_MODEL_THREADS,
+    LOCAL_MODEL_MAX_TOKENS
+)
+from utils.hedging import DeadlineExceeded, time_left
+from utils.rate_limit import GUARD_CHECK_INTERVAL, check_call_guards
+from utils.tracing import tracer
+from utils.usage import usage_ledger
+
+try:
+    from llama_cpp import Llama
+    LLAMA_CPP_AVAILABLE = True
+except ImportError:
+    LLAMA_CPP_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+def local_model_path():
+    return os.getenv("LOCAL_MODEL_PATH") or LOCAL_MODEL_PATH
+
+
+def local_backend_available():
+    return LLAMA_CPP_AVAILABLE and os.path.exists(local_model_path())
+
+
+def to_chat_messages(messages):
+    """langchain messages (or a plain prompt string) -> OpenAI-style role/content dicts"""
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    return [{"role": ROLES.get(getattr(m, "type", "human"), "user"), "content": m.content} for m in messages]
+
+
+class _Request:
+    __slots__ = ("messages", "params", "chunks", "cancelled", "enqueued_at")
+
+    def __init__(self, messages, params):
+        self.messages = messages
+        self.params = params
+        self.chunks = queue.Queue()
+        self.cancelled = threading.Event()
+        self.enqueued_at = time.monotonic()
+
+
+class LocalModelRunner:
+    """Owns the llama.cpp model and serves queued requests from all sessions on one worker thread"""
+
+    def __init__(self, model_path, n_ctx=LOCAL_MODEL_CONTEXT, n_threads=LOCAL_MODEL_THREADS):
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self.model_name = f"local/{os.path.basename(model_path)}"
+        self._requests = queue.Queue()
+        self._llama = None
+        self._worker = threading.Thread(target=self._serve, name="local-llm", daemon=True)
+        self._worker.start()
+
+    @property
+    def queued(self):
+        return self._requests.qsize()
+
+    def submit(self, messages, **params):
+        request = _Request(messages, params)
+        self._requests.put(request)
+        return request
+
+    def _load(self):
+        if self._llama is None:
+            start = time.perf_counter()
+            self._llama = Llama(
+                model_path=self.model_path, n_ctx=self.n_ctx, n_threads=self.n_threads, verbose=False
+            )
+            logger.info(f"Loaded local model {self.model_path} in {time.perf_counter() - start:.1f}s")
+        return self._llama
+
+    def _serve(self):
+        while True:
+            request = self._requests.get()
+            if request.cancelled.is_set():
+                continue
+            try:
+                llama = self._load()
+                stream = llama.create_chat_completion(messages=request.messages, stream=True, **request.params)
+                completion = ""
+                for part in stream:
+                    if request.cancelled.is_set():
+                        break
+                    delta = part["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        completion += delta
+                        request.chunks.put(("chunk", delta))
+                if request.cancelled.is_set():
+                    continue  # the caller is gone and has recorded its usage already
+                # Tokenized here, as llama.cpp contexts must not be used from two threads at once
+                prompt_text = "\n".join(m["content"] for m in request.messages)
+                usage = (
+                    len(llama.tokenize(prompt_text.encode("utf-8"), add_bos=False)),
+                    len(llama.tokenize(completion.encode("utf-8"), add_bos=False)) if completion else 0
+                )
+                request.chunks.put(("done", usage))
+            except Exception as e:
+                logger.error(f"Local model generation failed: {e}")
+                request.chunks.put(("error", e))
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def local_runner():
+    """The process-wide runner, created on first use"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = LocalModelRunner(local_model_path())
+        return _runner
+
+
+class LocalChatModel:
+    """The subset of the langchain chat model interface the agents use, served by llama.cpp"""
+
+    local = True
+
+    def __init__(self, temperature=0.7, max_tokens=LOCAL_MODEL_MAX_TOKENS, **params):
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.params = params
+        self.runner = local_runner()
+        self.model_name = self.runner.model_name
+
+    def bind(self, **kwargs):
+        """Copy with extra generation parameters, e.g. response_format={"type": "json_object"}"""
+        return LocalChatModel(self.temperature, self.max_tokens, **{**self.params, **kwargs})
+
+    def stream(self, messages, **kwargs):
+        """Stream the reply from the shared worker queue.
+
+        Honours the caller's ``llm_deadline`` until the first token and its call guards throughout;
+        either one ending the wait withdraws the request, so the worker skips or stops it.
+        """
+        check_call_guards()
+        chat_messages = to_chat_messages(messages)
+        params = {"temperature": self.temperature, "max_tokens": self.max_tokens, **self.params, **kwargs}
+        request = self.runner.submit(chat_messages, **params)
+        completion = ""
+        usage = None
+        try:
+            while True:
+                remaining = time_left() if not completion else None
+                if remaining is not None and remaining <= 0:
+                    raise DeadlineExceeded(f"No answer from {self.model_name} within the deadline")
+                try:
+                    kind, payload = request.chunks.get(
+                        timeout=GUARD_CHECK_INTERVAL if remaining is None else min(GUARD_CHECK_INTERVAL, remaining)
+                    )
+                except queue.Empty:
+                    check_call_guards()
+                    continue
+                if kind == "error":
+                    raise payload
+                if kind == "done":
+                    usage = payload
+                    break
+                completion += payload
+                yield AIMessageChunk(content=payload)
+        finally:
+            request.cancelled.set()
+            self._record_usage(chat_messages, completion, usage, time.monotonic() - request.enqueued_at)
+
+    def invoke(self, messages, **kwargs):
+        return AIMessage(content="".join(chunk.content for chunk in self.stream(messages, **kwargs)))
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        # Requests from one caller queue behind each other like those from different sessions
+        results = []
+        for messages in inputs:
+            try:
+                results.append(self.invoke(messages))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def _record_usage(self, chat_messages, completion, usage, seconds):
+        """Local calls cost nothing but still count towards tokens, latency and the session budget.
+
+        ``usage`` is the worker's (prompt, completion) token count; a call abandoned before the
+        worker finished is estimated from its length instead.
+        """
+        if usage is not None:
+            prompt_tokens, completion_tokens = usage
+        else:
+            prompt_text = "\n".join(m["content"] for m in chat_messages)
+            prompt_tokens, completion_tokens = len(prompt_text) // 4, len(completion) // 4
+        usage_ledger.record(self.model_name, prompt_tokens, completion_tokens)
+        tracer.add_to_current("llm_calls")
+        tracer.add_to_current("tokens_in", prompt_tokens)
+        tracer.add_to_current("tokens_out", completion_tokens)
+        tracer.record("local_llm", duration_ms=seconds * 1000, model=self.model_name)
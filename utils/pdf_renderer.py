@@ -0,0 +1,288 @@
+import io
+import logging
+import os
+import re
+import shutil
+import subprocess
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+from config.settings import (
+    PDF_RENDER_WORKERS,
+    PDF_RENDER_TIMEOUT,
+    REPORT_FONT_FILES
+)
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Optional pure-Python HTML renderer used when wkhtmltopdf is missing
+try:
+    from xhtml2pdf import pisa
+    XHTML2PDF_AVAILABLE = True
+except ImportError:
+    XHTML2PDF_AVAILABLE = False
+
+WKHTMLTOPDF_OPTIONS = [
+    "--quiet",
+    "--page-size", "A4",
+    "--margin-top", "8mm",
+    "--margin-right", "8mm",
+    "--margin-bottom", "8mm",
+    "--margin-left", "8mm",
+    "--encoding", "UTF-8",
+    "--no-outline",
+    "--enable-local-file-access",
+    "--print-media-type",
+    "--disable-smart-shrinking",
+    "--load-error-handling", "ignore",
+    "--load-media-error-handling", "ignore",
+    "--disable-javascript",  # reports contain no scripts, so no forced delay either
+]
+
+_REMOTE_FONT_LINK = re.compile(r'<link[^>]+fonts\.(?:googleapis|gstatic)\.com[^>]*>\s*', re.IGNORECASE)
+
+
+def find_wkhtmltopdf():
+    """Locate the wkhtmltopdf binary (WKHTMLTOPDF_PATH, common install paths, then PATH)"""
+    custom = os.getenv("WKHTMLTOPDF_PATH")
+    if custom and os.path.exists(custom):
+        return custom
+    common_paths = [
+        r"C:/Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe",
+        "/usr/local/bin/wkhtmltopdf",
+        "/usr/bin/wkhtmltopdf"
+    ]
+    for path in common_paths:
+        if os.path.exists(path):
+            return path
+    return shutil.which("wkhtmltopdf")
+
+
+_font_faces = None
+
+
+def _local_font_faces():
+    """@font-face rules for the bundled font files, resolved from the project root, and
+    whether every file in REPORT_FONT_FILES was found.
+
+    Built once per process; a missing file is logged, and the render keeps loading that
+    family from Google Fonts.
+    """
+    global _font_faces
+    if _font_faces is None:
+        rules = []
+        complete = True
+        for family, files in REPORT_FONT_FILES.items():
+            for weight, path in files.items():
+                path = path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+                if not os.path.exists(path):
+                    logger.warning(f"Report font '{family}' {weight} not found at {path}; PDFs will load it from Google Fonts")
+                    complete = False
+                    continue
+                url = "file://" + path.replace(os.sep, "/")
+                rules.append(f"@font-face {{ font-family: '{family}'; font-weight: {weight}; src: url('{url}'); }}")
+        _font_faces = ("\n".join(rules), complete)
+    return _font_faces
+
+
+def prepare_html_for_pdf(html_content):
+    """Add local @font-face rules for the bundled report fonts.
+
+    The remote Google Fonts link is dropped only when every font has a local file, so
+    rendering needs no network; otherwise it stays for the families that are missing.
+    """
+    font_faces, complete = _local_font_faces()
+    if complete:
+        html_content = _REMOTE_FONT_LINK.sub("", html_content)
+    if font_faces and "<style>" in html_content:
+        html_content = html_content.replace("<style>", f"<style>\n{font_faces}\n", 1)
+    return html_content
+
+
+class _TextExtractor(HTMLParser):
+    """Collect readable text blocks from report HTML for the plain PDF fallback"""
+
+    BLOCK_TAGS = {"p", "div", "li", "h1", "h2", "h3", "h4", "br", "tr", "ul"}
+    SKIP_TAGS = {"style", "script", "head", "title"}
+
+    def __init__(self):
+        super().__init__()
+        self.blocks = []
+        self._current = []
+        self._skip_depth = 0
+        self._heading = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+            self._heading = tag in ("h1", "h2", "h3", "h4")
+            if tag == "li":
+                self._current.append("• ")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def _flush(self):
+        text = re.sub(r"\s+", " ", "".join(self._current)).strip()
+        if text and text != "•":
+            self.blocks.append((text, self._heading))
+        self._current = []
+        self._heading = False
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def _pdf_escape(text):
+    text = text.replace("•", "-").replace("→", "->").replace("’", "'").replace("“", '"').replace("”", '"')
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_text_pdf(html_content, line_width=95, lines_per_page=62):
+    """Dependency-free fallback: lay out the report text as a simple multi-page PDF"""
+    extractor = _TextExtractor()
+    extractor.feed(html_content)
+    extractor.close()
+
+    lines = []
+    for text, is_heading in extractor.blocks:
+        if is_heading:
+            lines.append(("", False))
+            lines.append((text, True))
+        else:
+            for wrapped in textwrap.wrap(text, line_width) or [""]:
+                lines.append((wrapped, False))
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Objects: 1 catalog, 2 pages, 3 regular font, 4 bold font, then (page, content) pairs
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    page_refs = []
+    for page_lines in pages:
+        stream = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+        for text, is_heading in page_lines:
+            font = "/F2 12 Tf" if is_heading else "/F1 10 Tf"
+            stream.append(f"{font} ({_pdf_escape(text)}) Tj T*")
+        stream.append("ET")
+        content = "\n".join(stream).encode("latin-1")
+        page_number = len(objects) + 1
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {page_number + 1} 0 R >>".encode("latin-1")
+        )
+        objects.append(b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream")
+        page_refs.append(f"{page_number} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>".encode("latin-1")
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref_offset = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode())
+    output.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+    return output.getvalue()
+
+
+class PdfRenderService:
+    """Process-wide PDF renderer shared by all sessions.
+
+    Streams HTML to wkhtmltopdf over stdin/stdout (no temp files), runs every render on a
+    pool of ``max_workers`` threads so concurrent renders stay bounded, and falls back to
+    in-process rendering when the binary is absent.
+    """
+
+    def __init__(self, max_workers=PDF_RENDER_WORKERS, timeout=PDF_RENDER_TIMEOUT):
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.wkhtmltopdf_path = find_wkhtmltopdf()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-render")
+
+    @property
+    def backend(self):
+        """Name of the renderer that will be used"""
+        if self.wkhtmltopdf_path:
+            return "wkhtmltopdf"
+        return "xhtml2pdf" if XHTML2PDF_AVAILABLE else "text"
+
+    def warm_up(self):
+        """Render a tiny document in the background at app startup.
+
+        This loads the report fonts (reporting any that are missing) and the renderer's code
+        before the first report needs them. wkhtmltopdf still starts a new process per render.
+        """
+        return self.submit("<html><head><style></style></head><body><p>warm-up</p></body></html>")
+
+    def submit(self, html_content):
+        """Render asynchronously on the shared pool; returns a Future of PDF bytes"""
+        return self._executor.submit(self._render, html_content)
+
+    def render(self, html_content):
+        """Render HTML to PDF bytes, waiting for a free render thread"""
+        return self.submit(html_content).result()
+
+    def _render(self, html_content):
+        html_content = prepare_html_for_pdf(html_content)
+        if self.wkhtmltopdf_path:
+            try:
+                return self._render_wkhtmltopdf(html_content)
+            except Exception as e:
+                logger.warning(f"wkhtmltopdf render failed, using in-process fallback: {e}")
+        return self._render_in_process(html_content)
+
+    def _render_wkhtmltopdf(self, html_content):
+        """Pipe HTML in and PDF out of a wkhtmltopdf process"""
+        command = [self.wkhtmltopdf_path] + WKHTMLTOPDF_OPTIONS + ["-", "-"]
+        result = subprocess.run(
+            command,
+            input=html_content.encode("utf-8"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=self.timeout,
+            check=False
+        )
+        if not result.stdout.startswith(b"%PDF"):
+            error = result.stderr.decode("utf-8", "replace").strip()
+            raise RuntimeError(f"wkhtmltopdf exited with {result.returncode}: {error[:300]}")
+        return result.stdout
+
+    def _render_in_process(self, html_content):
+        """xhtml2pdf when installed, otherwise the plain text layout"""
+        if XHTML2PDF_AVAILABLE:
+            output = io.BytesIO()
+            status = pisa.CreatePDF(html_content, dest=output, encoding="utf-8")
+            if not status.err:
+                return output.getvalue()
+            logger.warning("xhtml2pdf reported errors, using plain text PDF")
+        return render_text_pdf(html_content)
+
+
+# Global instance
+pdf_renderer = PdfRenderService()
+
+
+def render_pdf(html_content):
+    """Module-level entry point (picklable for process pools)"""
+    return pdf_renderer.render(html_content)
@@ -0,0 +1,378 @@
+"""Token buckets and the process-wide limiters for outbound LLM requests.
+
+Every call made through ``utils.llm.create_chat_llm`` is admitted by the limiter of its provider
+(``rate_limiter_for``) against that provider's requests-per-minute and tokens-per-minute budget,
+so traffic to a hedge provider never uses up the primary provider's quota. Waiting calls are
+served by priority class, so student-triggered replies go ahead of autonomous mentor turns,
+which go ahead of reports and other background work:
+
+    with llm_priority("interactive"):
+        reply = agent.chat(...)
+
+The LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE and LLM_RATE_BURST_SECONDS environment
+variables override the settings of the same name; a rate of 0 turns that budget off.
+``configure_rate_limits`` changes the budgets at runtime, for all providers or one.
+"""
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from config.settings import (
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_RATE_BURST_SECONDS,
+    LLM_EXPECTED_COMPLETION_TOKENS,
+    LLM_QUEUE_TIMEOUT
+)
+from utils.tracing import BaseCallbackHandler, token_usage, tracer
+from utils.usage import estimate_tokens
+
+# Lower rank is served first
+PRIORITIES = {"interactive": 0, "agent": 1, "batch": 2}
+DEFAULT_PRIORITY = "agent"
+GUARD_CHECK_INTERVAL = 0.25  # seconds between cancellation checks of a queued call
+
+_priority = contextvars.ContextVar("llm_priority", default=DEFAULT_PRIORITY)
+_call_guards = contextvars.ContextVar("llm_call_guards", default=())
+
+
+@contextmanager
+def llm_priority(name):
+    """Priority class for LLM calls made inside the block"""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority {name!r}, expected one of {', '.join(PRIORITIES)}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+@contextmanager
+def llm_call_guard(guard):
+    """LLM calls made inside the block are checked against ``guard`` before they go out.
+
+    ``guard.raise_if_cancelled()`` runs before a call queues for the limiter, repeatedly while it
+    waits, and once more after admission, so a cancelled call never reaches the provider. Guards
+    with an ``admitted()`` method are told when their call is admitted.
+    """
+    token = _call_guards.set(_call_guards.get() + (guard,))
+    try:
+        yield
+    finally:
+        _call_guards.reset(token)
+
+
+@contextmanager
+def detached_call_guards():
+    """LLM calls made inside the block ignore the guards of the enclosing context, for background
+    work that should outlive the generation that scheduled it"""
+    token = _call_guards.set(())
+    try:
+        yield
+    finally:
+        _call_guards.reset(token)
+
+
+def check_call_guards():
+    """Raise if any guard of the current context says its call must not be sent"""
+    for guard in _call_guards.get():
+        guard.raise_if_cancelled()
+
+
+class TokenBucket:
+    """``rate`` tokens per second, bursts up to ``capacity``; not thread-safe on its own"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    @classmethod
+    def per_minute(cls, per_minute, burst=None):
+        return cls(per_minute / 60.0, burst)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, tokens):
+        """Seconds until ``tokens`` are available (0.0 if they are now)"""
+        self._refill()
+        tokens = min(tokens, self.capacity)
+        return 0.0 if self.tokens >= tokens else (tokens - self.tokens) / self.rate
+
+    def take(self, tokens):
+        self.tokens -= min(tokens, self.capacity)
+
+
+def _env_rate(name, default):
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+class RateLimitTimeout(Exception):
+    """A call waited longer than the queue timeout for rate-limit capacity"""
+
+
+class QueueStats:
+    __slots__ = ("queued", "admitted", "timeouts", "waits")
+
+    def __init__(self, window=500):
+        self.queued = 0
+        self.admitted = 0
+        self.timeouts = 0
+        self.waits = deque(maxlen=window)  # seconds, most recent admissions
+
+    def to_dict(self):
+        waits = sorted(self.waits)
+        return {
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "timeouts": self.timeouts,
+            "mean_wait_ms": 1000 * sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait_ms": 1000 * waits[min(len(waits) - 1, int(0.95 * len(waits)))] if waits else 0.0,
+            "max_wait_ms": 1000 * waits[-1] if waits else 0.0,
+        }
+
+
+class RateLimiter:
+    """Requests/min and tokens/min buckets shared by all threads, admitting waiters by priority.
+
+    Only the highest-priority, longest-waiting caller may take capacity, so a burst of background
+    calls cannot starve a student's reply. Token costs are estimated up front and corrected with
+    ``settle`` once the provider reports actual usage.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, burst_seconds=None, timeout=LLM_QUEUE_TIMEOUT,
+                 name="default"):
+        self.name = name
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (rank, seq)
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._stats = {name: QueueStats() for name in PRIORITIES}
+        self.requests_per_minute = _env_rate("LLM_REQUESTS_PER_MINUTE", LLM_REQUESTS_PER_MINUTE)
+        self.tokens_per_minute = _env_rate("LLM_TOKENS_PER_MINUTE", LLM_TOKENS_PER_MINUTE)
+        self.burst_seconds = _env_rate("LLM_RATE_BURST_SECONDS", LLM_RATE_BURST_SECONDS)
+        self.configure(requests_per_minute, tokens_per_minute, burst_seconds)
+
+    def configure(self, requests_per_minute=None, tokens_per_minute=None, burst_seconds=None):
+        """Replace the budgets, e.g. from a command line; None keeps a setting, a rate of 0 turns that budget off"""
+        with self._cond:
+            if requests_per_minute is not None:
+                self.requests_per_minute = requests_per_minute
+            if tokens_per_minute is not None:
+                self.tokens_per_minute = tokens_per_minute
+            if burst_seconds is not None:
+                self.burst_seconds = burst_seconds
+            rpm, tpm = self.requests_per_minute, self.tokens_per_minute
+            self.requests = TokenBucket.per_minute(rpm, rpm * self.burst_seconds / 60) if rpm else None
+            self.tokens = TokenBucket.per_minute(tpm, tpm * self.burst_seconds / 60) if tpm else None
+            self._cond.notify_all()
+
+    @property
+    def enabled(self):
+        return self.requests is not None or self.tokens is not None
+
+    def _wait_time(self, tokens):
+        delay = max(0.0, self._paused_until - time.monotonic())
+        if self.requests is not None:
+            delay = max(delay, self.requests.wait_time(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.wait_time(tokens))
+        return delay
+
+    def acquire(self, tokens=1, priority=None, timeout=None, check=None):
+        """Block until the call may go out; returns the seconds spent waiting.
+
+        ``check`` is called while waiting and may raise to abandon the wait.
+        """
+        if not self.enabled:
+            return 0.0
+        priority = priority or current_priority()
+        timeout = self.timeout if timeout is None else timeout
+        stats = self._stats[priority]
+        entry = (PRIORITIES[priority], next(self._seq))
+        start = time.monotonic()
+
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            stats.queued += 1
+            admitted = False
+            try:
+                while True:
+                    delay = self._wait_time(tokens) if self._waiting[0] == entry else None
+                    if delay == 0.0:
+                        heapq.heappop(self._waiting)
+                        admitted = True
+                        if self.requests is not None:
+                            self.requests.take(1)
+                        if self.tokens is not None:
+                            self.tokens.take(tokens)
+                        waited = time.monotonic() - start
+                        stats.admitted += 1
+                        stats.waits.append(waited)
+                        return waited
+
+                    remaining = timeout - (time.monotonic() - start) if timeout else None
+                    if remaining is not None and remaining <= 0:
+                        stats.timeouts += 1
+                        raise RateLimitTimeout(f"{priority} LLM call waited over {timeout}s for rate-limit capacity")
+                    if check is not None:
+                        check()
+                    # Non-head waiters sleep until notified; the head sleeps until capacity refills
+                    poll = 1.0 if check is None else GUARD_CHECK_INTERVAL
+                    self._cond.wait(min(x for x in (delay, remaining, poll) if x is not None))
+            finally:
+                # However the wait ended, a waiter that was not admitted must not stay at the head
+                if not admitted:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                stats.queued -= 1
+                self._cond.notify_all()
+
+    def settle(self, tokens):
+        """Correct the tokens bucket by actual minus estimated usage of a finished call"""
+        if self.tokens is None or not tokens:
+            return
+        with self._cond:
+            self.tokens._refill()
+            self.tokens.tokens = min(self.tokens.capacity, self.tokens.tokens - tokens)
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Hold all admissions, e.g. after the provider answered 429 with Retry-After"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self):
+        """Queueing metrics per priority class"""
+        with self._cond:
+            return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+
+_limiters = {}
+_limiter_budgets = {}  # provider name, or None for every provider -> budgets given to configure_rate_limits
+_limiters_lock = threading.Lock()
+
+
+def rate_limiter_for(api_base):
+    """The shared limiter of the provider behind an endpoint; each provider has its own budget"""
+    name = provider_name(api_base)
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = RateLimiter(name=name)
+            for key in (None, name):
+                if key in _limiter_budgets:
+                    limiter.configure(**_limiter_budgets[key])
+        return limiter
+
+
+def all_rate_limiters():
+    with _limiters_lock:
+        return list(_limiters.values())
+
+
+def configure_rate_limits(provider=None, **budgets):
+    """Change the budgets (``RateLimiter.configure`` arguments) of one provider, named as by
+    ``provider_name``, or with None of every provider; also applies to limiters built later"""
+    with _limiters_lock:
+        _limiter_budgets[provider] = {**_limiter_budgets.get(provider, {}), **budgets}
+        for name, limiter in _limiters.items():
+            if provider is None:
+                limiter.configure(**budgets)
+                # A provider's own budget still takes precedence over the common one
+                limiter.configure(**_limiter_budgets.get(name, {}))
+            elif name == provider:
+                limiter.configure(**budgets)
+
+
+def _retry_after(error):
+    """Seconds a 429 error asks us to wait, or None if it is not a rate-limit error"""
+    if getattr(error, "status_code", None) != 429:
+        return None
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 1.0))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+if BaseCallbackHandler is not None:
+    class RateLimitCallbackHandler(BaseCallbackHandler):
+        """Holds each chat-model call at its start until its provider's limiter admits it"""
+
+        raise_error = True  # a queue timeout must fail the call rather than be logged and ignored
+        holds_calls = True  # lets wrappers tell whether a model's calls queue here first
+
+        def __init__(self, limiter):
+            self.limiter = limiter
+            self._estimates = {}
+            self._lock = threading.Lock()
+
+        def on_chat_model_start(self, serialized, messages, *, run_id=None, **kwargs):
+            guards = _call_guards.get()
+            check_call_guards()
+            if self.limiter.enabled:
+                prompt_chars = sum(len(str(message.content)) for batch in messages for message in batch)
+                estimate = estimate_tokens(prompt_chars) + LLM_EXPECTED_COMPLETION_TOKENS
+                priority = current_priority()
+                waited = self.limiter.acquire(estimate, priority, check=check_call_guards if guards else None)
+                if waited > 0.001:
+                    tracer.record("rate_limit.wait", duration_ms=waited * 1000, priority=priority)
+                check_call_guards()
+                with self._lock:
+                    self._estimates[run_id] = estimate
+            for guard in guards:
+                if hasattr(guard, "admitted"):
+                    guard.admitted()
+
+        def on_llm_end(self, response, *, run_id=None, **kwargs):
+            with self._lock:
+                estimate = self._estimates.pop(run_id, None)
+            prompt_tokens, completion_tokens = token_usage(response)
+            if estimate is not None and (prompt_tokens or completion_tokens):
+                self.limiter.settle(prompt_tokens + completion_tokens - estimate)
+
+        def on_llm_error(self, error, *, run_id=None, **kwargs):
+            with self._lock:
+                self._estimates.pop(run_id, None)
+            retry_after = _retry_after(error)
+            if retry_after:
+                self.limiter.pause(retry_after)
+
+
+_handlers = {}
+
+
+def rate_limit_callback(api_base):
+    """Callback handler admitting calls to ``api_base`` through its provider's limiter, or None
+    without langchain_core"""
+    if BaseCallbackHandler is None:
+        return None
+    limiter = rate_limiter_for(api_base)
+    with _limiters_lock:
+        if limiter.name not in _handlers:
+            _handlers[limiter.name] = RateLimitCallbackHandler(limiter)
+        return _handlers[limiter.name]
+
+
+def provider_name(api_base):
+    """Short provider key for an OpenAI-compatible base URL, e.g. 'openrouter.ai'"""
+    host = urlparse(api_base or "").hostname or "default"
+    return host[4:] if host.startswith("api.") else host
@@ -0,0 +1,248 @@
+"""Lightweight span tracing for roundtable turns and report generation.
+
+Spans are kept in an in-memory ring buffer (shared by all sessions in the process) and can be
+exported as OpenTelemetry-style JSON lines:
+
+    with tracer.span("retrieval", trace_id=turn_id) as span:
+        chunks = vectordb.similarity_search(query)
+        span.set(documents=len(chunks))
+
+LLM token usage is attached to whichever span is open when a call finishes, via
+``TracingCallbackHandler`` (installed on every model by utils.llm.create_chat_llm).
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+from config.settings import TRACING_ENABLED, TRACE_BUFFER_SIZE, TRACE_EXPORT_PATH
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except ImportError:
+    BaseCallbackHandler = None
+
+logger = logging.getLogger(__name__)
+
+COUNTER_ATTRIBUTES = ("tokens_in", "tokens_out", "retries", "cache_hits", "llm_calls", "aborted_streams", "hedges", "hedge_wins")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def new_trace_id():
+    return uuid.uuid4().hex
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "error")
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    @property
+    def duration_ms(self):
+        end = self.end if self.end is not None else time.time()
+        return (end - self.start) * 1000
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, key, amount=1):
+        """Increment a counter attribute such as tokens_in or retries"""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self):
+        """OpenTelemetry-style span record"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": int(self.start * 1e9),
+            "endTimeUnixNano": int((self.end or time.time()) * 1e9),
+            "durationMs": round(self.duration_ms, 3),
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    """Records finished spans into a ring buffer and optionally appends them to a JSONL file"""
+
+    def __init__(self, max_spans=TRACE_BUFFER_SIZE, export_path=TRACE_EXPORT_PATH, enabled=TRACING_ENABLED):
+        self.enabled = enabled
+        self.export_path = export_path
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, trace_id=None, **attributes):
+        """Time a block; nested spans inherit the trace id of the enclosing span"""
+        if not self.enabled:
+            yield Span(name, trace_id)
+            return
+        parent = _current_span.get()
+        if parent is not None and attributes.get("session_id") is None and "session_id" in parent.attributes:
+            attributes["session_id"] = parent.attributes["session_id"]
+        span = Span(
+            name,
+            trace_id or (parent.trace_id if parent else new_trace_id()),
+            parent.span_id if parent else None,
+            attributes
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end = time.time()
+            self._finish(span)
+
+    def record(self, name, duration_ms=0.0, trace_id=None, **attributes):
+        """Add an already-measured span, e.g. a pacing sleep or a rerun marker"""
+        if not self.enabled:
+            return
+        parent = _current_span.get()
+        span = Span(name, trace_id or (parent.trace_id if parent else new_trace_id()),
+                    parent.span_id if parent else None, attributes)
+        span.end = time.time()
+        span.start = span.end - duration_ms / 1000
+        self._finish(span)
+
+    def current_span(self):
+        return _current_span.get()
+
+    def add_to_current(self, key, amount=1):
+        span = _current_span.get()
+        if span is not None:
+            span.add(key, amount)
+
+    def _finish(self, span):
+        with self._lock:
+            self._spans.append(span)
+        if self.export_path:
+            try:
+                self.export_jsonl(self.export_path, [span])
+            except OSError as e:
+                logger.warning(f"Trace export failed: {e}")
+
+    def spans(self, name=None, session_id=None):
+        with self._lock:
+            spans = list(self._spans)
+        if name is not None:
+            spans = [s for s in spans if s.name == name]
+        if session_id is not None:
+            spans = [s for s in spans if s.attributes.get("session_id") == session_id]
+        return spans
+
+    def stage_stats(self, session_id=None):
+        """Per-stage latency percentiles and summed counters"""
+        by_name = {}
+        for span in self.spans(session_id=session_id):
+            by_name.setdefault(span.name, []).append(span)
+
+        stats = {}
+        for name, spans in sorted(by_name.items()):
+            durations = sorted(s.duration_ms for s in spans)
+            entry = {
+                "count": len(spans),
+                "p50_ms": percentile(durations, 0.50),
+                "p95_ms": percentile(durations, 0.95),
+                "mean_ms": sum(durations) / len(durations),
+                "errors": sum(1 for s in spans if s.error),
+            }
+            for key in COUNTER_ATTRIBUTES:
+                total = sum(s.attributes.get(key, 0) for s in spans)
+                if total:
+                    entry[key] = total
+            stats[name] = entry
+        return stats
+
+    def export_jsonl(self, path, spans=None):
+        """Append spans (default: the whole buffer) as JSON lines; returns the number written"""
+        spans = self.spans() if spans is None else spans
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+        return len(spans)
+
+    def to_jsonl(self, spans=None):
+        spans = self.spans() if spans is None else spans
+        return "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+tracer = Tracer()
+
+
+def traced(name):
+    """Decorator form of tracer.span"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def token_usage(response):
+    """(prompt_tokens, completion_tokens) from a langchain LLMResult, if the provider reported them"""
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    prompt = completion = 0
+    for generations in getattr(response, "generations", []) or []:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt += metadata.get("input_tokens", 0)
+            completion += metadata.get("output_tokens", 0)
+    return prompt, completion
+
+
+if BaseCallbackHandler is not None:
+    class TracingCallbackHandler(BaseCallbackHandler):
+        """Adds LLM call counts and token usage to the span open when the call finishes"""
+
+        def on_llm_end(self, response, **kwargs):
+            span = _current_span.get()
+            if span is None:
+                return
+            prompt_tokens, completion_tokens = token_usage(response)
+            span.add("llm_calls")
+            span.add("tokens_in", prompt_tokens)
+            span.add("tokens_out", completion_tokens)
+
+    tracing_callback = TracingCallbackHandler()
+else:
+    tracing_callback = None
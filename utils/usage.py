@@ -0,0 +1,250 @@
+"""Token and cost accounting for every LLM call.
+
+Calls are attributed to whatever ``usage_scope`` is active when they finish (session, student,
+mentor), aggregated in memory for budgets and the performance panel, and appended to a JSONL
+usage log. Summarize a log from the command line with:
+
+    python -m utils.usage logs/usage.jsonl --by agent
+"""
+import argparse
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from config.settings import (
+    USAGE_LOG_PATH,
+    MODEL_PRICES,
+    SESSION_TOKEN_BUDGET,
+    BUDGET_RETRY_CUTOFF,
+    LLM_MODEL
+)
+from utils.tracing import BaseCallbackHandler, token_usage
+
+logger = logging.getLogger(__name__)
+
+_usage_scope = contextvars.ContextVar("usage_scope", default={})
+
+
+@contextmanager
+def usage_scope(**attributes):
+    """Attribute LLM calls made inside the block, e.g. usage_scope(session_id=..., agent="Career Guide")
+
+    Nested scopes add to (and override) the enclosing one.
+    """
+    token = _usage_scope.set({**_usage_scope.get(), **{k: v for k, v in attributes.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _usage_scope.reset(token)
+
+
+def current_usage_scope():
+    return dict(_usage_scope.get())
+
+
+def call_cost(model, prompt_tokens, completion_tokens):
+    """USD cost of one call, or 0.0 for models without a configured price"""
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def estimate_tokens(chars):
+    """Rough token count for text of the given length (about four characters per token)"""
+    return (chars + 3) // 4
+
+
+class UsageTotals:
+    __slots__ = ("calls", "prompt_tokens", "completion_tokens", "cost")
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens, completion_tokens, cost):
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost += cost
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cost": round(self.cost, 6),
+        }
+
+
+class UsageLedger:
+    """In-memory usage aggregates by session, mentor and student, plus the persistent log"""
+
+    GROUPS = ("session_id", "agent", "gvc_id", "model")
+
+    def __init__(self, log_path=USAGE_LOG_PATH, session_budget=SESSION_TOKEN_BUDGET):
+        self.log_path = log_path
+        self.session_budget = session_budget
+        self._totals = {group: {} for group in self.GROUPS}
+        self._session_agents = {}
+        self._lock = threading.Lock()
+
+    def record(self, model, prompt_tokens, completion_tokens, scope=None):
+        scope = current_usage_scope() if scope is None else scope
+        cost = call_cost(model, prompt_tokens, completion_tokens)
+        entry = {"model": model, **scope}
+        with self._lock:
+            for group in self.GROUPS:
+                key = entry.get(group) or "unattributed"
+                self._totals[group].setdefault(key, UsageTotals()).add(prompt_tokens, completion_tokens, cost)
+            session_id = scope.get("session_id")
+            if session_id:
+                agents = self._session_agents.setdefault(session_id, {})
+                agents.setdefault(scope.get("agent") or "unattributed", UsageTotals()).add(
+                    prompt_tokens, completion_tokens, cost
+                )
+        if self.log_path:
+            self._append_log({
+                "ts": time.time(),
+                **entry,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cost": round(cost, 8),
+            })
+        return cost
+
+    def _append_log(self, record):
+        try:
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            line = json.dumps(record, default=str) + "\n"
+            with self._lock:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            logger.warning(f"Usage log write failed: {e}")
+
+    def totals(self, group, key):
+        with self._lock:
+            totals = self._totals[group].get(key)
+            return totals.to_dict() if totals else UsageTotals().to_dict()
+
+    def breakdown(self, group):
+        with self._lock:
+            return {key: totals.to_dict() for key, totals in self._totals[group].items()}
+
+    def session_breakdown(self, session_id):
+        """Per-mentor usage within one session"""
+        with self._lock:
+            return {agent: totals.to_dict() for agent, totals in self._session_agents.get(session_id, {}).items()}
+
+    def budget_status(self, session_id):
+        """Budget state of a session: ok, tight (past BUDGET_RETRY_CUTOFF of the budget) or exceeded"""
+        if not session_id or not self.session_budget:
+            return "ok"
+        used = self.totals("session_id", session_id)["total_tokens"]
+        if used >= self.session_budget:
+            return "exceeded"
+        if used >= self.session_budget * BUDGET_RETRY_CUTOFF:
+            return "tight"
+        return "ok"
+
+    def reset_session(self, session_id):
+        with self._lock:
+            self._totals["session_id"].pop(session_id, None)
+            self._session_agents.pop(session_id, None)
+
+
+usage_ledger = UsageLedger()
+
+
+if BaseCallbackHandler is not None:
+    class UsageCallbackHandler(BaseCallbackHandler):
+        """Records token usage for every LLM call.
+
+        Uses provider-reported usage when there is any; streamed and cancelled calls usually have
+        none, so their usage is estimated from the characters sent and received.
+        """
+
+        def __init__(self):
+            self._runs = {}
+            self._lock = threading.Lock()
+
+        def on_chat_model_start(self, serialized, messages, *, run_id=None, **kwargs):
+            prompt_chars = sum(len(str(message.content)) for batch in messages for message in batch)
+            params = kwargs.get("invocation_params") or {}
+            model = params.get("model_name") or params.get("model") or LLM_MODEL
+            with self._lock:
+                self._runs[run_id] = [prompt_chars, 0, model]
+
+        def on_llm_new_token(self, token, *, run_id=None, **kwargs):
+            with self._lock:
+                run = self._runs.get(run_id)
+                if run is not None:
+                    run[1] += len(token)
+
+        def on_llm_end(self, response, *, run_id=None, **kwargs):
+            prompt_tokens, completion_tokens = token_usage(response)
+            run = self._pop_run(run_id)
+            if not prompt_tokens and not completion_tokens and run:
+                prompt_tokens, completion_tokens = estimate_tokens(run[0]), estimate_tokens(run[1])
+            # Streamed calls have no llm_output; the model they were started on is the one billed
+            model = (getattr(response, "llm_output", None) or {}).get("model_name") or (run[2] if run else LLM_MODEL)
+            usage_ledger.record(model, prompt_tokens, completion_tokens)
+
+        def on_llm_error(self, error, *, run_id=None, **kwargs):
+            # Aborted streams are still billed for what was generated before the cancel
+            run = self._pop_run(run_id)
+            if run:
+                usage_ledger.record(run[2], estimate_tokens(run[0]), estimate_tokens(run[1]))
+
+        def _pop_run(self, run_id):
+            """[prompt_chars, completion_chars, model] tracked for a call"""
+            with self._lock:
+                return self._runs.pop(run_id, None)
+
+    usage_callback = UsageCallbackHandler()
+else:
+    usage_callback = None
+
+
+def summarize_log(path, by="agent"):
+    """Aggregate a usage log file by one field"""
+    summary = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            totals = summary.setdefault(record.get(by) or "unattributed", UsageTotals())
+            totals.add(record.get("prompt_tokens", 0), record.get("completion_tokens", 0), record.get("cost", 0.0))
+    return {key: totals.to_dict() for key, totals in summary.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize the LLM usage log")
+    parser.add_argument("path", nargs="?", default=USAGE_LOG_PATH)
+    parser.add_argument("--by", default="agent", choices=["agent", "session_id", "gvc_id", "model"])
+    args = parser.parse_args(argv)
+
+    summary = summarize_log(args.path, args.by)
+    print(f"{args.by:<40}{'calls':>8}{'prompt':>12}{'completion':>12}{'cost $':>10}")
+    for key, totals in sorted(summary.items(), key=lambda item: -item[1]["total_tokens"]):
+        print(f"{str(key):<40}{totals['calls']:>8}{totals['prompt_tokens']:>12}"
+              f"{totals['completion_tokens']:>12}{totals['cost']:>10.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,8 @@ import streamlit as st
 import sys
 import os
 
+from utils.tracing import tracer
+
 # SQLite3 fix for ChromaDB - must be done before importing chromadb
 try:
     # Try to replace sqlite3 with pysqlite3-binary for compatibility
@@ -65,15 +67,18 @@ def load_vectorstore():
         st.info("Continuing without vector search...")
         return None, None
 
-def get_context_chunks(query, k=10):
+def get_context_chunks(query, k=10, vectordb=None):
     """Get context chunks from vector store with comprehensive fallback"""
     try:
-        vectordb, _ = load_vectorstore()
+        if vectordb is None:
+            vectordb, _ = load_vectorstore()
         if vectordb is None:
             # Graceful fallback message
             return f"📄 Context search unavailable for query: '{query[:50]}...'\n\nVector database is not accessible. Install pysqlite3-binary to enable context search."
         
-        docs_and_scores = vectordb.similarity_search_with_score(query, k=k)
+        with tracer.span("retrieval.chroma", k=k) as span:
+            docs_and_scores = vectordb.similarity_search_with_score(query, k=k)
+            span.set(documents=len(docs_and_scores))
         if not docs_and_scores:
             return f"No relevant context found for: '{query}'"
         